@@ -0,0 +1,134 @@
+import re
+from functools import lru_cache
+
+import pyap
+
+
+# A US street address always has a house number and commas between its
+# parts, so lines without both are never handed to pyap.
+_HAS_DIGIT = re.compile(r"\d")
+
+_COUNTRY_SUFFIX = re.compile(r"\s*,\s*(UNITED STATES( OF AMERICA)?|USA?)\s*$")
+_ZIP = re.compile(r"\b(\d{5})-\d{4}\b")
+_PUNCTUATION = re.compile(r"[.#]")
+_SPACES = re.compile(r"\s+")
+_COMMAS = re.compile(r"\s*,\s*")
+
+# USPS standard suffix abbreviations (Publication 28) for the words that
+# show up spelled out in postings. Directions are left alone, since "North"
+# is as often a street name as a direction.
+_SUFFIXES = {
+    "ALLEY": "ALY",
+    "AVENUE": "AVE",
+    "BOULEVARD": "BLVD",
+    "CIRCLE": "CIR",
+    "COURT": "CT",
+    "DRIVE": "DR",
+    "EXPRESSWAY": "EXPY",
+    "FREEWAY": "FWY",
+    "HIGHWAY": "HWY",
+    "LANE": "LN",
+    "PARKWAY": "PKWY",
+    "PLACE": "PL",
+    "PLAZA": "PLZ",
+    "ROAD": "RD",
+    "ROUTE": "RTE",
+    "SQUARE": "SQ",
+    "STREET": "ST",
+    "SUITE": "STE",
+    "TERRACE": "TER",
+    "TRAIL": "TRL",
+    "TURNPIKE": "TPKE",
+}
+
+
+@lru_cache(maxsize=8192)
+def parse_addresses(text, country_):
+    """
+    Runs pyap over one candidate line. Postings repeat the same office
+    lines, so results are cached on the exact text.
+
+    Args:
+        text (str): Candidate line.
+        country_ (str): Country code for parsing addresses (e.g., 'US').
+
+    Returns:
+        tuple: Full addresses found in the line.
+    """
+    return tuple(
+        str(addr.full_address) for addr in pyap.parse(text, country=country_)
+    )
+
+
+def find_addresses(description, country_):
+    """
+    Finds the addresses in a job description. Only lines with a digit and
+    a comma are parsed, which skips the prose that makes up most of a
+    posting.
+
+    Args:
+        description (str): Visible text of the job-description element.
+        country_ (str): Country code for parsing addresses (e.g., 'US').
+
+    Returns:
+        list: Full addresses, in the order they appear.
+    """
+    addresses = []
+    for line in description.splitlines():
+        if "," in line and _HAS_DIGIT.search(line):
+            addresses.extend(parse_addresses(line, country_))
+    return addresses
+
+
+@lru_cache(maxsize=8192)
+def normalize_address(address):
+    """
+    Builds the canonical form of an address so that spelling variants of
+    the same place group together, e.g. "702 S.W. 8th ST., Bentonville,
+    AR 72716" and "702 Sw 8Th St, Bentonville, AR 72716" both become
+    "702 SW 8TH ST, BENTONVILLE, AR 72716". The form is upper case without
+    periods, street suffixes use USPS abbreviations, ZIP+4 codes are cut
+    to five digits and a trailing country name is dropped.
+
+    Args:
+        address (str): Address as found in a posting.
+
+    Returns:
+        str: The canonical address.
+    """
+    canonical = _SPACES.sub(" ", address.upper()).strip()
+    canonical = _COUNTRY_SUFFIX.sub("", canonical)
+    canonical = _ZIP.sub(r"\1", canonical)
+    canonical = _PUNCTUATION.sub("", canonical)
+    parts = [part for part in _COMMAS.split(canonical) if part]
+    if parts:
+        # Suffixes are only abbreviated in the street part, not the city
+        parts[0] = " ".join(_SUFFIXES.get(word, word) for word in parts[0].split())
+    return ", ".join(parts)
+
+
+def canonical_addresses(addresses):
+    """
+    Args:
+        addresses (list): Addresses of one job, possibly stored by an older
+            run before they were normalized.
+
+    Returns:
+        list: Their distinct canonical forms, in order.
+    """
+    return list(dict.fromkeys(normalize_address(addr) for addr in addresses))
+
+
+def address_cache_stats():
+    """
+    Returns:
+        dict: Hits and misses of the pyap and normalizer caches.
+    """
+    parse_info = parse_addresses.cache_info()
+    normalize_info = normalize_address.cache_info()
+    return {
+        "parse_hits": parse_info.hits,
+        "parse_misses": parse_info.misses,
+        "normalize_hits": normalize_info.hits,
+        "normalize_misses": normalize_info.misses,
+    }
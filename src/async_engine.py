@@ -0,0 +1,526 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+import aiohttp
+
+from detail_fetcher import DEFAULT_HEADERS, extract_detail_html
+from listing_fetcher import (
+    CAREERS_URL,
+    build_listing_url,
+    listing_cache_key,
+    parse_cached_listing,
+    parse_listing_html,
+    parse_result_count,
+)
+from metrics import Metrics
+from parse_pool import ParsePool
+from proxy_pool import ProxyPool
+from records import JobStore
+from scheduler import LastPageTracker
+
+# Extra passes over detail pages whose fetch failed every attempt, once the
+# rest of the run is done and the proxy scores have settled
+FAILED_JOB_ROUNDS = 1
+
+# Listing pages in flight at once. Later pages only start as earlier ones
+# finish, so pages past the last one with results are not fetched.
+LISTING_PAGES_AHEAD = 16
+
+
+class ProxyLimiter:
+    """
+    Picks proxies from a health-scored ProxyPool and caps the number of
+    in-flight requests per proxy, so a large global concurrency does not
+    pile hundreds of connections onto a single free proxy.
+    """
+
+    def __init__(self, proxy_pool, per_proxy_limit=4):
+        """
+        Initializes the ProxyLimiter instance.
+
+        Args:
+            proxy_pool (ProxyPool): Shared proxy pool.
+            per_proxy_limit (int): Max concurrent requests per proxy.
+        """
+        self.proxy_pool = proxy_pool
+        self.per_proxy_limit = per_proxy_limit
+        self._semaphores = {}
+
+    def next_proxy(self):
+        """
+        Picks the next proxy, skipping proxies that are already at their
+        limit when another one has free capacity.
+
+        Returns:
+            str: A proxy URL, or None when the pool is empty.
+        """
+        proxy = self.proxy_pool.get()
+        for _ in range(min(len(self.proxy_pool), 8)):
+            if not self.semaphore(proxy).locked():
+                break
+            proxy = self.proxy_pool.get()
+        return proxy
+
+    def semaphore(self, proxy):
+        """
+        Args:
+            proxy (str): A proxy URL, or None for direct connections.
+
+        Returns:
+            asyncio.Semaphore: The semaphore guarding that proxy.
+        """
+        if proxy not in self._semaphores:
+            limit = self.per_proxy_limit if proxy else 1 << 30
+            self._semaphores[proxy] = asyncio.Semaphore(limit)
+        return self._semaphores[proxy]
+
+
+class AsyncScraper:
+    """
+    Browserless asyncio scraper. Listing and detail pages are fetched with
+    one shared aiohttp session under a global semaphore, so a single process
+    can keep thousands of detail requests in flight. Detail fetches for a
+    listing page start as soon as that page is parsed, and every job is
+    written out as soon as its details are in.
+    """
+
+    def __init__(
+        self,
+        proxy_pool,
+        concurrency=500,
+        per_proxy_limit=4,
+        retries=5,
+        timeout=20,
+        country="US",
+        base_url=CAREERS_URL,
+        job_index=None,
+        parse_pool=None,
+        metrics=None,
+        page_cache=None,
+    ):
+        """
+        Initializes the AsyncScraper instance.
+
+        Args:
+            proxy_pool (ProxyPool): Shared, health-scored proxy pool.
+            concurrency (int): Max requests in flight across all proxies.
+            per_proxy_limit (int): Max requests in flight per proxy.
+            retries (int): Number of retries for failed requests.
+            timeout (int): Seconds to wait for each response.
+            country (str): Country code for parsing addresses (e.g., 'US').
+            base_url (str): Results endpoint, overridable for local testing.
+            job_index (JobIndex): Index of previously scraped jobs, used to
+                skip detail fetches for known postings.
+            parse_pool (ParsePool): Processes that parse job descriptions,
+                a worker thread is used when omitted.
+            metrics (Metrics): Registry for fetch timings and counters.
+            page_cache (PageCache): Cache of listing and detail pages,
+                checked before every fetch.
+        """
+        self.proxy_pool = proxy_pool
+        self.concurrency = concurrency
+        self.per_proxy_limit = per_proxy_limit
+        self.retries = retries
+        self.timeout = timeout
+        self.country = country
+        self.base_url = base_url
+        self.job_index = job_index
+        self.parse_pool = parse_pool if parse_pool else ParsePool(workers=0)
+        self.metrics = metrics if metrics else Metrics()
+        self.page_cache = page_cache
+
+    async def run(
+        self,
+        total_pages,
+        query="",
+        expand="department,brand,type,rate",
+        job_career_area="all",
+        employment_type=None,
+        job_writer=None,
+        checkpoint=None,
+        job_db=None,
+    ):
+        """
+        Scrapes the listing pages and every job found on them.
+
+        Args:
+            total_pages (int): Total number of pages to scrape.
+            query (str): Search query for the Walmart careers page.
+            expand (str): Additional parameters for expanding search results.
+            job_career_area (str): Job career area filter.
+            employment_type (str): Employment type filter.
+            job_writer (JobStreamWriter): When given, jobs are streamed to
+                it instead of being collected, and jobs it already holds
+                are skipped.
+            checkpoint (Checkpoint): Records finished pages and jobs; pages
+                and jobs it already holds are skipped.
+            job_db (JobDatabase): Database every scraped job is also
+                written to, in batches as they arrive.
+
+        Returns:
+            JobStore: The scraped jobs, grouped by address and by location.
+        """
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._proxies = ProxyLimiter(self.proxy_pool, self.per_proxy_limit)
+        store = JobStore()
+        needs_browser = []
+        failed = []
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=0)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout, headers=DEFAULT_HEADERS
+        ) as session:
+            # Pages are keyed by their listing URL, like in the threads
+            # engine, so both read the same checkpoint format
+            page_numbers = {
+                build_listing_url(
+                    query,
+                    page,
+                    expand,
+                    job_career_area,
+                    employment_type,
+                    self.base_url,
+                ): page
+                for page in range(1, total_pages + 1)
+            }
+            pages = list(page_numbers)
+            pending_jobs = []
+            if checkpoint:
+                pages = checkpoint.pending_pages(pages)
+                pending_jobs = checkpoint.pending_jobs()
+            pages = deque(pages)
+            last_pages = LastPageTracker()
+            skipped_pages = 0
+            # Every task puts itself here when it is done, so listing pages
+            # and jobs are handled as they finish, in one loop
+            finished = asyncio.Queue()
+            listing_tasks = {}
+            detail_tasks = {}
+            scheduled = set()
+
+            def start_listings():
+                nonlocal skipped_pages
+                while pages and len(listing_tasks) < LISTING_PAGES_AHEAD:
+                    page_url = pages.popleft()
+                    if last_pages.past_end(None, page_numbers[page_url]):
+                        skipped_pages += 1
+                        continue
+                    task = asyncio.create_task(self._scrape_listing(session, page_url))
+                    task.add_done_callback(finished.put_nowait)
+                    listing_tasks[task] = page_url
+
+            def start_job(job):
+                task = asyncio.create_task(self._scrape_job(session, job))
+                task.add_done_callback(finished.put_nowait)
+                detail_tasks[task] = job
+
+            def schedule(job):
+                # Listings can repeat a job, e.g. on neighbouring pages
+                if job["link"] in scheduled:
+                    return
+                scheduled.add(job["link"])
+                if job_writer and job_writer.is_done(job["link"]):
+                    if checkpoint:
+                        checkpoint.mark_job(job["link"])
+                    return
+                start_job(job)
+
+            def listing_done(task, page_url):
+                try:
+                    _, jobs, total = task.result()
+                except Exception as e:
+                    logging.error(f"Failed to scrape listing {page_url}: {e!r}")
+                    return
+                if jobs is None:
+                    # Failed, not empty: says nothing about the last page
+                    return
+                last_pages.report(None, page_numbers[page_url], jobs, total)
+                # Failed and empty pages are retried on resume
+                if checkpoint and jobs:
+                    checkpoint.mark_page(page_url, [job for _, job in jobs])
+                for _, job in jobs:
+                    schedule(job)
+
+            def job_done(task, job):
+                try:
+                    _, outcome, job_details = task.result()
+                except Exception as e:
+                    logging.error(f"Failed to scrape job {job['link']}: {e!r}")
+                    self.metrics.count("jobs", outcome="failed")
+                    outcome = "failed"
+                if outcome == "failed":
+                    failed.append(job)
+                    return
+                if outcome == "browser":
+                    needs_browser.append(job["link"])
+                    return
+                if checkpoint:
+                    checkpoint.mark_job(job["link"])
+                if job_db:
+                    job_db.write(job, job_details)
+                if job_writer:
+                    job_writer.write(job, job_details)
+                    return
+                store.add(job, job_details)
+
+            for job in pending_jobs:
+                schedule(job)
+            start_listings()
+            for attempt in range(FAILED_JOB_ROUNDS + 1):
+                if attempt:
+                    if not failed:
+                        break
+                    logging.info(f"Retrying {len(failed)} failed jobs")
+                    for job in failed:
+                        start_job(job)
+                    failed = []
+                while listing_tasks or detail_tasks:
+                    task = await finished.get()
+                    if task in listing_tasks:
+                        listing_done(task, listing_tasks.pop(task))
+                        start_listings()
+                    else:
+                        job_done(task, detail_tasks.pop(task))
+                if not attempt and skipped_pages:
+                    logging.info(
+                        f"Skipped {skipped_pages} pages past the last results page"
+                    )
+
+        if needs_browser:
+            logging.warning(
+                f"{len(needs_browser)} jobs had no static job data and were "
+                f"skipped, use the threads engine for them."
+            )
+        if failed:
+            # Not marked in the checkpoint, --resume fetches them again
+            logging.error(
+                f"{len(failed)} jobs failed after {FAILED_JOB_ROUNDS + 1} "
+                f"rounds of {self.retries} attempts"
+            )
+        return store
+
+    async def _fetch_text(self, session, url):
+        """
+        Fetches a page with retries, switching proxy on every attempt. The
+        proxy's semaphore is taken before the global one, so requests queued
+        behind a busy proxy do not hold global slots. The backoff sleep
+        happens outside the semaphores so it frees its slot.
+
+        Returns:
+            str: Response body, or None if every attempt failed.
+        """
+        for attempt in range(self.retries):
+            proxy = self._proxies.next_proxy()
+            try:
+                async with self._proxies.semaphore(proxy), self._semaphore:
+                    started = time.monotonic()
+                    with self.metrics.time("fetch", proxy=proxy):
+                        async with session.get(url, proxy=proxy) as res:
+                            res.raise_for_status()
+                            page_html = await res.text()
+                self.proxy_pool.report_success(proxy, time.monotonic() - started)
+                self.metrics.count("attempts", outcome="ok", proxy=proxy)
+                return page_html
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logging.warning(
+                    f"Attempt {attempt + 1} failed for {url} via {proxy}: {e!r}"
+                )
+                self.proxy_pool.report_failure(proxy)
+                self.metrics.count("attempts", outcome="failed", proxy=proxy)
+                if attempt < self.retries - 1:
+                    await asyncio.sleep(2**attempt)
+        logging.error(f"Failed to fetch {url} after {self.retries} retries.")
+        return None
+
+    async def _cached(self, key):
+        # The cache is file and SQLite backed, keep it off the event loop
+        if not self.page_cache:
+            return None
+        return await asyncio.to_thread(self.page_cache.get, key)
+
+    async def _store(self, key, body):
+        if self.page_cache:
+            await asyncio.to_thread(self.page_cache.put, key, body)
+
+    async def _scrape_listing(self, session, page_url):
+        """
+        Returns:
+            tuple: (page_url, jobs, total) with the (location, job) tuples
+            of the page, None if it could not be fetched, and the result
+            count it reports, None when not shown.
+        """
+        cache_key = listing_cache_key(page_url)
+        cached = await self._cached(cache_key)
+        if cached is not None:
+            listing = parse_cached_listing(cached, page_url)
+            if listing and listing[0]:
+                self.metrics.count("pages", outcome="ok")
+                return (page_url, *listing)
+        page_html = await self._fetch_text(session, page_url)
+        if page_html is None:
+            return page_url, None, None
+        jobs = parse_listing_html(page_html, page_url)
+        if jobs:
+            await self._store(cache_key, page_html)
+        self.metrics.count("pages", outcome="ok" if jobs else "empty")
+        if not jobs:
+            logging.warning(f"No job listings found on {page_url}")
+        logging.info(f"Listed {len(jobs)} jobs from {page_url}")
+        return page_url, jobs, parse_result_count(page_html)
+
+    async def _scrape_job(self, session, job):
+        """
+        Returns:
+            tuple: (job, outcome, job_details). The outcome is "ok", "failed"
+            when the page could not be fetched or parsed, which is worth a
+            retry, or "browser" when the page has no static job data.
+        """
+        if self.job_index:
+            job_details = self.job_index.lookup(job)
+            if job_details:
+                self.metrics.count("index_hits")
+                return job, "ok", job_details
+
+        page_html = await self._cached(job["link"])
+        cached = page_html is not None
+        if not cached:
+            page_html = await self._fetch_text(session, job["link"])
+        if page_html is None:
+            self.metrics.count("jobs", outcome="failed")
+            return job, "failed", None
+        # Parsing is CPU bound, keep it off the event loop. The soup is
+        # built in a thread and the descriptions go to the parse pool.
+        extracted = await asyncio.to_thread(extract_detail_html, page_html)
+        if extracted is None:
+            self.metrics.count("jobs", outcome="no_static_data")
+            return job, "browser", None
+        if not cached:
+            await self._store(job["link"], page_html)
+        fields, description = extracted
+        job_details = await self.parse_pool.build_job_details_async(
+            fields, description, self.country
+        )
+        self.metrics.count("jobs", outcome="ok" if job_details else "failed")
+        if not job_details:
+            return job, "failed", None
+        if self.job_index:
+            self.job_index.record(job, job_details)
+        logging.info(f"Extracted details for job: {job['title']}")
+        return job, "ok", job_details
+
+
+def aio_scrape(
+    total_pages,
+    concurrency,
+    proxy_pool,
+    query="",
+    date_sort=False,
+    expand="department,brand,type,rate",
+    job_career_area="all",
+    employment_type=None,
+    retries=5,
+    country="US",
+    per_proxy_limit=4,
+    proxy_stats_path=None,
+    job_index=None,
+    job_writer=None,
+    checkpoint=None,
+    base_url=CAREERS_URL,
+    parse_workers=None,
+    metrics=None,
+    metrics_path=None,
+    live_metrics=0,
+    page_cache=None,
+    job_db=None,
+):
+    """
+    Synchronous entry point for the asyncio engine, taking the same
+    arguments as a_scrape (with `concurrency` in place of `num_scrapers`).
+
+    Args:
+        total_pages (int): Total number of pages to scrape.
+        concurrency (int): Max requests in flight across all proxies.
+        proxy_pool (list): List of proxies to use for scraping, or a
+            ProxyPool, e.g. one filled and kept up to date by a
+            ProxyValidator.
+        query (str): Search query for the Walmart careers page.
+        date_sort (bool): Unsupported without a browser, ignored.
+        expand (str): Additional parameters for expanding search results.
+        job_career_area (str): Job career area filter.
+        employment_type (str): Employment type filter.
+        retries (int): Number of retries for failed requests.
+        country (str): Country code for parsing addresses (e.g., 'US').
+        per_proxy_limit (int): Max requests in flight per proxy.
+        proxy_stats_path (str): Where to write per-proxy stats as JSON.
+        job_index (JobIndex): Index of previously scraped jobs.
+        job_writer (JobStreamWriter): Stream that jobs are written to
+            instead of being collected.
+        checkpoint (Checkpoint): Records finished pages and jobs.
+        base_url (str): Results endpoint, overridable for local testing.
+        parse_workers (int): Processes that parse job descriptions,
+            defaults to the number of CPUs. 0 parses in a worker thread.
+        metrics (Metrics): Registry for timings and counters.
+        metrics_path (str): Where to write the metrics as JSON, with a
+            Prometheus text copy next to it.
+        live_metrics (float): Seconds between live summary log lines, 0
+            turns them off.
+        page_cache (PageCache): Cache of listing and detail pages, shared
+            with the threads engine.
+        job_db (JobDatabase): Database every scraped job is also written
+            to.
+
+    Returns:
+        JobStore: The scraped jobs, grouped by address and by location.
+    """
+    if date_sort:
+        logging.warning("date_sort needs the browser UI, ignored by asyncio engine")
+    proxies = proxy_pool
+    if not isinstance(proxies, ProxyPool):
+        proxies = ProxyPool(proxy_pool)
+    if not metrics:
+        metrics = Metrics()
+    if live_metrics:
+        metrics.start_live(live_metrics)
+    parse_pool = ParsePool(parse_workers, metrics)
+    scraper = AsyncScraper(
+        proxies,
+        concurrency,
+        per_proxy_limit,
+        retries,
+        country=country,
+        base_url=base_url,
+        job_index=job_index,
+        parse_pool=parse_pool,
+        metrics=metrics,
+        page_cache=page_cache,
+    )
+    try:
+        result = asyncio.run(
+            scraper.run(
+                total_pages,
+                query,
+                expand,
+                job_career_area,
+                employment_type,
+                job_writer,
+                checkpoint,
+                job_db,
+            )
+        )
+    finally:
+        parse_pool.close()
+        metrics.stop_live()
+    if page_cache:
+        cache_stats = page_cache.stats()
+        logging.info(f"Page cache stats: {cache_stats}")
+        for counter in ("hits", "misses"):
+            metrics.count(f"page_cache_{counter}", cache_stats[counter])
+    logging.info(f"Metrics: {metrics.summary()}")
+    if metrics_path:
+        metrics.dump(metrics_path)
+    if proxy_stats_path:
+        proxies.export(proxy_stats_path)
+    return result
@@ -1,9 +1,24 @@
 import logging
 import concurrent.futures
-from collections import defaultdict
-from queue import Queue
 
 from scrape import Scraper
+from tab_browser import TabBrowser
+from driver_pool import DEFAULT_PROFILE, DriverPool
+from detail_fetcher import HttpDetailFetcher
+from dom_extract import ExtractionStats
+from metrics import Metrics
+from concurrency import AdaptiveLimiter
+from parse_pool import ParsePool
+from listing_fetcher import (
+    CAREERS_URL,
+    ApiListingFetcher,
+    build_listing_url,
+    query_label,
+)
+from scheduler import WorkScheduler
+from retry import RetryQueue
+from records import JobStore
+from proxy_pool import ProxyPool
 
 
 def a_scrape(
@@ -17,16 +32,73 @@ def a_scrape(
     employment_type=None,
     retries=5,
     country="US",
+    max_driver_uses=200,
+    http_details=True,
+    api_listings=False,
+    detail_scrapers=None,
+    queue_size=100,
+    proxy_stats_path=None,
+    job_index=None,
+    job_writer=None,
+    checkpoint=None,
+    base_url=CAREERS_URL,
+    driver_pool=None,
+    extraction_stats=None,
+    parse_workers=None,
+    metrics=None,
+    metrics_path=None,
+    live_metrics=0,
+    adaptive=True,
+    dead_letter_path=None,
+    page_cache=None,
+    queries=None,
+    browser_profile=DEFAULT_PROFILE,
+    detail_tabs=0,
+    job_db=None,
 ):
     """
-    Scrapes asynchronously. `num_scrapers` sets the max number of workers
-    (capped to 61 on Windows). Divides the pages between the workers, who
-    handle all the jobs on their assigned pages to divide the work evenly.
+    Scrapes asynchronously as a two stage pipeline. `num_scrapers` listing
+    workers take pages one at a time from a shared scheduler and push every
+    job they find onto a bounded queue, which `detail_scrapers` detail
+    workers consume. Detail work starts as soon as the first listing page
+    lands, and listing workers block once the queue is full so memory stays
+    flat. Listing workers that run out of pages help with the remaining
+    jobs, and per-worker utilization is logged at the end. Thread counts
+    are capped to 61 on Windows. Failed pages and jobs are put back on a
+    delay queue with jittered backoff, so the worker moves on at once, and
+    each gets `retries` attempts before it is dead-lettered.
+
+    With `adaptive` set, the worker counts are ceilings. Listing and detail
+    fetches each go through an AdaptiveLimiter that raises their
+    parallelism while error rate and latency hold and halves it when they
+    rise, so the run settles at what the proxies and the server sustain.
+
+    Proxies come from a health-scored ProxyPool that quarantines dead
+    proxies and prefers fast ones. Workers lease browsers from a shared
+    DriverPool, so warm Chrome instances are reused across the listing and
+    detail phases. Job detail pages are fetched over plain HTTP when
+    `http_details` is set, falling back to the browser for pages that need
+    JavaScript. Likewise, listing pages come from the site's JSON search
+    endpoint when `api_listings` is set, sorted on the server, and from the
+    browser when the endpoint is unavailable. With a `page_cache`, pages
+    fetched within its TTL by any path are parsed from disk instead.
+    With `detail_tabs` set, detail pages that need the browser are loaded
+    in tabs of a few shared TabBrowsers, so one Chrome serves several
+    detail workers at once instead of one each.
+
+    In batch mode, `queries` lists several searches that share the
+    scheduler, proxies, browsers and caches of one run. Their listing pages
+    are interleaved, each job link is scraped once however many searches
+    list it, and every job is tagged with the labels of the searches that
+    matched it (see listing_fetcher.query_label).
 
     Args:
-        total_pages (int): Total number of pages to scrape.
-        num_scrapers (int): Number of concurrent scrapers to use.
-        proxy_pool (list): List of proxies to use for scraping.
+        total_pages (int): Most pages to scrape per search. Scraping stops
+            earlier at the last page of results.
+        num_scrapers (int): Number of concurrent listing scrapers to use.
+        proxy_pool (list): List of proxies to use for scraping, or a
+            ProxyPool, e.g. one filled and kept up to date by a
+            ProxyValidator.
         query (str): Search query for the Walmart careers page.
         date_sort (bool): Whether to sort results by date.
         expand (str): Additional parameters for expanding search results.
@@ -34,122 +106,378 @@ def a_scrape(
         employment_type (str): Employment type filter.
         retries (int): Number of retries for failed requests.
         country (str): Country code for parsing addresses (e.g., 'US').
+        max_driver_uses (int): Page loads before a browser is recycled.
+        http_details (bool): Whether to try the HTTP fast path for details.
+        api_listings (bool): Whether to read listing pages from the JSON
+            search endpoint before falling back to the browser. Off by
+            default, the endpoint's path and response shape are not
+            confirmed against the live site.
+        detail_scrapers (int): Number of concurrent detail scrapers,
+            defaults to `num_scrapers`.
+        queue_size (int): Max jobs waiting between the two stages.
+        proxy_stats_path (str): Where to write per-proxy stats as JSON.
+        job_index (JobIndex): Index of previously scraped jobs, used to
+            skip detail fetches for known postings.
+        job_writer (JobStreamWriter): When given, every job is streamed to
+            it as soon as it is scraped instead of being collected, jobs it
+            already holds are skipped, and the returned store is empty.
+        checkpoint (Checkpoint): Records finished pages and jobs; pages and
+            jobs it already holds are skipped.
+        base_url (str): Results endpoint, overridable for local testing.
+        driver_pool (DriverPool): Browser pool to use instead of a new one,
+            e.g. to read its stats after the run. It is closed at the end.
+        extraction_stats (ExtractionStats): Collects per-page extraction
+            timings, created for the run when omitted.
+        parse_workers (int): Processes that parse job descriptions,
+            defaults to the number of CPUs. 0 parses in the scraper threads.
+        metrics (Metrics): Registry for per stage, proxy and worker timings
+            and counters, created for the run when omitted.
+        metrics_path (str): Where to write the metrics as JSON, with a
+            Prometheus text copy next to it.
+        live_metrics (float): Seconds between live summary log lines, 0
+            turns them off.
+        adaptive (bool): Whether to size listing and detail concurrency
+            from observed latency and error rate, up to the worker counts.
+        dead_letter_path (str): Where to write the pages and jobs that
+            failed `retries` times, as JSON.
+        page_cache (PageCache): Cache of listing and detail pages shared
+            by the browser and HTTP paths. Its hits and misses are added to
+            the metrics.
+        queries (list): (query, job_career_area, employment_type) specs to
+            scrape in one batch, in place of `query`, `job_career_area` and
+            `employment_type`. `total_pages` applies to each of them.
+        browser_profile (DriverProfile): Launch settings of the browsers,
+            e.g. DriverProfile.lean() to block non-essential resources. Not
+            used when `driver_pool` is given.
+        detail_tabs (int): Tabs per browser for detail pages, 0 gives every
+            worker its own browser. One TabBrowser is started per
+            `detail_tabs` detail workers.
+        job_db (JobDatabase): Database every scraped job is also written
+            to, in batches as they arrive.
 
     Returns:
-        tuple: A tuple containing:
-            - result_formatted (dict): Jobs grouped by address.
-            - result_bad (dict): Jobs with missing or unknown addresses.
+        JobStore: The scraped jobs, grouped by address and by location.
     """
-    proxy_queue = Queue()
-    for proxy in proxy_pool:
-        proxy_queue.put(proxy)
-
-    def get_proxy():
-        """
-        Thread-safe function to get a proxy from the pool.
-        Passed as a function into scrapers.
-
-        Returns:
-            str: A proxy URL in the format protocol://ip:port.
-        """
-        proxy = proxy_queue.get()
-        proxy_queue.put(proxy)
-        return proxy
-
-    # Divide pages evenly among scrapers
-    pages_per_scraper = total_pages // num_scrapers
-    page_ranges = [
-        (i * pages_per_scraper + 1, (i + 1) * pages_per_scraper)
-        for i in range(num_scrapers)
-    ]
-
-    # Handle any remainder pages
-    if total_pages % num_scrapers != 0:
-        page_ranges[-1] = (page_ranges[-1][0], total_pages)
-
-    result_formatted = defaultdict(list)
-    result_bad = defaultdict(list)
+    # Shared, health-scored proxy pool. Scrapers report every attempt so
+    # dead proxies are quarantined instead of coming back round-robin.
+    proxies = proxy_pool
+    if not isinstance(proxies, ProxyPool):
+        proxies = ProxyPool(proxy_pool)
+
+    if not detail_scrapers:
+        detail_scrapers = num_scrapers
+
+    if not queries:
+        queries = [(query, job_career_area, employment_type)]
+    # Jobs are only tagged when there is more than one search to tell apart
+    tagged = len(queries) > 1
+
+    # Pages are handed out one at a time by URL, no static page ranges.
+    # The searches of a batch take turns so they all make progress, and
+    # `total_pages` is only a ceiling: the scheduler drops the pages past
+    # each search's last page once its first pages are in.
+    page_queries = {}
+    page_positions = {}
+    for page in range(1, total_pages + 1):
+        for spec_query, spec_area, spec_type in queries:
+            page_url = build_listing_url(
+                spec_query, page, expand, spec_area, spec_type, base_url
+            )
+            label = query_label(spec_query, spec_area, spec_type)
+            page_queries[page_url] = label if tagged else None
+            page_positions[page_url] = (label, page)
+    pages = list(page_queries)
+    pending_jobs = []
+    if checkpoint:
+        pages = checkpoint.pending_pages(pages)
+        pending_jobs = checkpoint.pending_jobs()
+    retry_queue = RetryQueue(max_attempts=retries)
+    scheduler = WorkScheduler(
+        pages, num_scrapers, queue_size, pending_jobs, retry_queue, page_positions
+    )
+
+    store = JobStore()
+    if not driver_pool:
+        driver_pool = DriverPool(max_uses=max_driver_uses, profile=browser_profile)
+    if not metrics:
+        metrics = Metrics()
+    if live_metrics:
+        metrics.start_live(live_metrics)
+    # Description parsing is CPU bound, so it runs in its own processes
+    # instead of competing with the scraper threads for the GIL
+    parse_pool = ParsePool(parse_workers, metrics)
+    http_fetcher = None
+    if http_details:
+        http_fetcher = HttpDetailFetcher(parse_pool=parse_pool, page_cache=page_cache)
+    listing_fetcher = None
+    if api_listings:
+        listing_fetcher = ApiListingFetcher(page_cache=page_cache)
+    if not extraction_stats:
+        extraction_stats = ExtractionStats()
+    limiters = {}
+    if adaptive:
+        # Listing workers help with details once pages run out, so both
+        # pools count towards the detail ceiling
+        limiters = {
+            "listing": AdaptiveLimiter("listing", num_scrapers),
+            "detail": AdaptiveLimiter("detail", num_scrapers + detail_scrapers),
+        }
+
+    tab_browsers = []
+    if detail_tabs:
+        # Tab browsers switch between tabs that are still loading, so they
+        # get their own pool of browsers that return from page loads at once
+        tab_driver_pool = DriverPool(
+            max_uses=driver_pool.max_uses, profile=driver_pool.profile.for_tabs()
+        )
+        count = -(-detail_scrapers // detail_tabs)
+        tab_browsers = [
+            TabBrowser(
+                tab_driver_pool,
+                proxies.get,
+                detail_tabs,
+                proxy_pool=proxies,
+                page_cache=page_cache,
+                metrics=metrics,
+                name=f"tabs-{i}",
+            )
+            for i in range(count)
+        ]
+
+    def make_scraper(name, index):
+        return Scraper(
+            proxies.get,
+            query,
+            date_sort,
+            expand,
+            job_career_area,
+            employment_type,
+            retries,
+            country,
+            driver_pool,
+            http_fetcher,
+            proxies,
+            job_index,
+            base_url,
+            extraction_stats,
+            parse_pool,
+            metrics,
+            name,
+            limiters,
+            listing_fetcher,
+            page_cache,
+            tab_browsers[index % len(tab_browsers)] if tab_browsers else None,
+        )
+
+    workers = [(f"listing-{i}", True) for i in range(num_scrapers)]
+    workers += [(f"detail-{i}", False) for i in range(detail_scrapers)]
+    worker_stats = {name: scheduler.register(name) for name, _ in workers}
 
     # Use ThreadPoolExecutor for concurrent scraping
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_scrapers) as executor:
-        future_to_scraper = {
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(workers)) as executor:
+        future_to_worker = {
             executor.submit(
-                run_scraper,
-                get_proxy,
-                start_page,
-                end_page,
-                query,
-                date_sort,
-                expand,
-                job_career_area,
-                employment_type,
-                retries,
-                country,
-            ): (start_page, end_page)
-            for start_page, end_page in page_ranges
+                run_worker,
+                make_scraper(name, index),
+                scheduler,
+                worker_stats[name],
+                listing,
+                job_writer,
+                checkpoint,
+                page_queries,
+                job_db,
+            ): name
+            for index, (name, listing) in enumerate(workers)
         }
 
-        for future in concurrent.futures.as_completed(future_to_scraper):
-            start_page, end_page = future_to_scraper[future]
+        for future in concurrent.futures.as_completed(future_to_worker):
+            name = future_to_worker[future]
             try:
-                formatted, bad = future.result()
-                logging.info(f"Scraper finished {start_page} to {end_page}")
-
-                for item in formatted:
-                    result_formatted[item["address"]].extend(item["jobs"])
-
-                for item in bad:
-                    result_bad[item["location"]].extend(item["jobs"])
+                store.merge(future.result())
+                logging.info(f"Scraper {name} finished")
 
             except Exception as e:
-                logging.error(
-                    f"Scraper failed for {start_page} to {end_page}, message: {e}"
-                )
+                logging.error(f"Scraper {name} failed, message: {e}")
 
-    return dict(result_formatted), dict(result_bad)
+    scheduler.report()
+    logging.info(
+        f"Skipped {scheduler.skipped_pages} pages past the last results page"
+    )
+    if tagged:
+        job_queries = scheduler.job_queries()
+        store.tag_queries(job_queries)
+        shared = sum(1 for labels in job_queries.values() if len(labels) > 1)
+        logging.info(
+            f"Batch of {len(queries)} queries: {len(job_queries)} unique jobs, "
+            f"{shared} listed by more than one query"
+        )
+    logging.info(f"Retry stats: {retry_queue.stats()}")
+    if dead_letter_path:
+        retry_queue.export(dead_letter_path)
+    for tab_browser in tab_browsers:
+        tab_browser.close()
+        logging.info(f"Tab browser {tab_browser.name} stats: {tab_browser.stats()}")
+    if tab_browsers:
+        tab_driver_pool.close()
+    driver_pool.close()
+    parse_pool.close()
+    pool_stats = driver_pool.stats()
+    logging.info(f"Driver pool stats: {pool_stats}")
+    for counter, value in pool_stats.items():
+        metrics.count(f"driver_{counter}", value)
+    logging.info(f"Page extraction times: {extraction_stats.stats()}")
+    for kind, limiter in limiters.items():
+        logging.info(f"Concurrency {kind} stats: {limiter.stats()}")
+    if http_fetcher:
+        logging.info(f"HTTP detail stats: {http_fetcher.stats()}")
+    if listing_fetcher:
+        logging.info(f"Search endpoint stats: {listing_fetcher.stats()}")
+    if page_cache:
+        cache_stats = page_cache.stats()
+        logging.info(f"Page cache stats: {cache_stats}")
+        for counter in ("hits", "misses"):
+            metrics.count(f"page_cache_{counter}", cache_stats[counter])
+    if proxy_stats_path:
+        proxies.export(proxy_stats_path)
+    metrics.stop_live()
+    logging.info(f"Metrics: {metrics.summary()}")
+    if metrics_path:
+        metrics.dump(metrics_path)
 
+    store.log_counts()
+    return store
 
-def run_scraper(
-    get_proxy,
-    start_page,
-    end_page,
-    query="",
-    date_sort=False,
-    expand="department,brand,type,rate",
-    job_career_area="all",
-    employment_type=None,
-    retries=5,
-    country="US",
+
+def run_worker(
+    scraper,
+    scheduler,
+    stats,
+    listing=True,
+    job_writer=None,
+    checkpoint=None,
+    page_queries=None,
+    job_db=None,
 ):
     """
-    Runs a single scraper instance for a given page range.
+    Runs a single scraper against the shared scheduler. Listing workers
+    take pages until none are left and then help with job details; detail
+    workers only take jobs. Either kind exits once the job queue is done.
+    A failed attempt hands its page or job back to the scheduler's retry
+    queue instead of sleeping in the worker.
 
     Args:
-        get_proxy (function): Function to retrieve a proxy.
-        start_page (int): Starting page number for the scraper.
-        end_page (int): Ending page number for the scraper.
-        query (str): Search query for the Walmart careers page.
-        date_sort (bool): Whether to sort results by date.
-        expand (str): Additional parameters for expanding search results.
-        job_career_area (str): Job career area filter.
-        employment_type (str): Employment type filter.
-        retries (int): Number of retries for failed requests.
-        country (str): Country code for parsing addresses (e.g., 'US').
+        scraper (Scraper): Scraper owned by this worker.
+        scheduler (WorkScheduler): Shared page and job queues.
+        stats (WorkerStats): This worker's counters.
+        listing (bool): Whether the worker starts on listing pages.
+        job_writer (JobStreamWriter): Stream that scraped jobs are written
+            to instead of being collected.
+        checkpoint (Checkpoint): Records finished pages and jobs.
+        page_queries (dict): Listing URL to the label its jobs are tagged
+            with, or None for untagged pages.
+        job_db (JobDatabase): Database scraped jobs are also written to.
 
     Returns:
-        tuple: A tuple containing:
-            - formatted_data (list): Jobs grouped by address.
-            - bad_data (list): Jobs with missing or unknown addresses.
+        JobStore: The jobs this worker scraped.
     """
-    scraper = Scraper(
-        get_proxy,
-        query,
-        date_sort,
-        expand,
-        job_career_area,
-        employment_type,
-        retries,
-        country,
-    )
-    formatted_data, bad_data = scraper.get_jobs(start_page, end_page)
-    return formatted_data, bad_data
+    store = JobStore()
+    try:
+        if listing:
+            try:
+                page = scheduler.next_page()
+                while page is not None:
+                    page_url = page
+                    try:
+                        with scheduler.track(stats, "pages"), scraper.metrics.time(
+                            "listing_page", worker=stats.name
+                        ):
+                            jobs, total = scraper.attempt_listing_page(
+                                page_url, scraper.date_sort
+                            )
+                    except Exception as e:
+                        # The page waits out its backoff in the scheduler
+                        # while this worker moves on
+                        logging.warning(f"Listing page {page} failed: {e}")
+                        if scheduler.retry_page(page, e):
+                            scraper.metrics.count(
+                                "retries",
+                                kind="page",
+                                worker=stats.name,
+                            )
+                        else:
+                            scraper.metrics.count(
+                                "pages",
+                                outcome="failed",
+                                worker=stats.name,
+                            )
+                        page = scheduler.next_page()
+                        continue
+                    scraper.metrics.count(
+                        "pages",
+                        outcome="ok" if jobs else "empty",
+                        worker=stats.name,
+                    )
+                    # Later pages of the search are dropped once its end is
+                    # known
+                    scheduler.report_page(page, jobs, total)
+                    label = page_queries.get(page) if page_queries else None
+                    if label:
+                        for _, job in jobs:
+                            job["queries"] = [label]
+                    # Failed and empty pages are retried on resume
+                    if checkpoint and jobs:
+                        checkpoint.mark_page(page, [job for _, job in jobs])
+                    for _, job in jobs:
+                        if not scheduler.put_job(job):
+                            scraper.metrics.count(
+                                "duplicate_jobs", worker=stats.name
+                            )
+                    page = scheduler.next_page()
+            finally:
+                scheduler.finish_listing()
+
+        job = scheduler.next_job()
+        while job is not None:
+            try:
+                if job_writer and job_writer.is_done(job["link"]):
+                    if checkpoint:
+                        checkpoint.mark_job(job["link"])
+                    job = scheduler.next_job()
+                    continue
+                try:
+                    with scheduler.track(stats, "jobs"), scraper.metrics.time(
+                        "job", worker=stats.name
+                    ):
+                        job_details = scraper.attempt_job(job, scraper.country)
+                except Exception as e:
+                    logging.warning(f"Attempt failed for job: {job['link']}: {e}")
+                    if scheduler.retry_job(job, e):
+                        scraper.metrics.count("retries", kind="job", worker=stats.name)
+                    else:
+                        scraper.metrics.count(
+                            "jobs",
+                            outcome="failed",
+                            worker=stats.name,
+                        )
+                    job = scheduler.next_job()
+                    continue
+                scraper.metrics.count(
+                    "jobs",
+                    outcome="ok" if job_details else "failed",
+                    worker=stats.name,
+                )
+                if job_details and job_db:
+                    job_db.write(job, job_details)
+                if job_details and job_writer:
+                    job_writer.write(job, job_details)
+                elif job_details:
+                    scraper.add_job(store, job, job_details)
+                if job_details and checkpoint:
+                    checkpoint.mark_job(job["link"])
+            except Exception as e:
+                logging.error(f"Failed to process job {job.get('link')}: {e}")
+            job = scheduler.next_job()
+    finally:
+        scraper.release_driver()
+        scheduler.finish(stats)
+    return store
@@ -0,0 +1,315 @@
+import os
+import json
+import time
+import logging
+import argparse
+import tempfile
+
+from async_scraper import a_scrape
+from async_engine import aio_scrape
+from dom_extract import ExtractionStats
+from driver_pool import DEFAULT_PROFILE, DriverPool, DriverProfile
+from metrics import Metrics
+from mock_site import MOCK_HOST, MockCareersSite, MockSiteConfig
+from proxy_check import ProxyValidator
+from proxy_pool import ProxyPool
+
+
+def percentile(values, fraction):
+    """
+    Returns:
+        float: Nearest-rank percentile of sorted values, or None if empty.
+    """
+    if not values:
+        return None
+    rank = max(0, min(len(values) - 1, round(fraction * len(values)) - 1))
+    return values[rank]
+
+
+def run_benchmark(
+    engine="threads",
+    pages=10,
+    jobs_per_page=25,
+    workers=4,
+    detail_workers=None,
+    concurrency=100,
+    latency=0.05,
+    error_rate=0.0,
+    proxies=8,
+    dead_proxies=0,
+    drop_rate=0.0,
+    retries=5,
+    http_details=True,
+    api_listings=False,
+    search_api=True,
+    lean_browser=False,
+    detail_tabs=0,
+    check_proxies=False,
+    parse_workers=None,
+    seed=0,
+):
+    """
+    Runs one engine end to end against a local MockCareersSite and
+    measures it. No request leaves the machine: listing and detail pages
+    are served by mock proxies on 127.0.0.1.
+
+    Args:
+        engine (str): "threads" for a_scrape, "asyncio" for aio_scrape.
+        pages (int): Results pages to list and scrape.
+        jobs_per_page (int): Jobs per results page.
+        workers (int): Listing workers for the threads engine.
+        detail_workers (int): Detail workers for the threads engine.
+        concurrency (int): Request limit for the asyncio engine.
+        latency (float): Mean seconds the mock site takes per request.
+        error_rate (float): Probability of a 503 from the site.
+        proxies (int): Healthy mock proxies.
+        dead_proxies (int): Extra proxies that refuse every connection.
+        drop_rate (float): Probability a healthy proxy drops a connection.
+        retries (int): Attempts per page or job.
+        http_details (bool): Whether the threads engine tries the HTTP
+            fast path for job details.
+        api_listings (bool): Whether the threads engine reads listing pages
+            from the JSON search endpoint.
+        search_api (bool): Whether the mock site serves that endpoint, so
+            the browser fallback can be measured.
+        lean_browser (bool): Whether the threads engine starts browsers
+            with the lean profile.
+        detail_tabs (int): Tabs per browser for detail pages in the
+            threads engine, 0 gives every worker its own browser.
+        check_proxies (bool): Whether to probe the proxies first and hand
+            only the live ones to the engine. The probes count towards the
+            run time.
+        parse_workers (int): Processes that parse job descriptions.
+        seed (int): Seed for the injected latency and failures.
+
+    Returns:
+        dict: The benchmark report. `extraction` holds the per-page time
+        spent reading browser-loaded pages, `stages` the p50/p95 of every
+        timed stage.
+    """
+    config = MockSiteConfig(
+        pages=pages,
+        jobs_per_page=jobs_per_page,
+        latency=latency,
+        error_rate=error_rate,
+        search_api=search_api,
+        seed=seed,
+    )
+    site = MockCareersSite(config)
+    proxy_list = [site.start_proxy(drop_rate) for _ in range(proxies)]
+    proxy_list += [site.dead_proxy() for _ in range(dead_proxies)]
+
+    driver_pool = None
+    extraction_stats = ExtractionStats()
+    metrics = Metrics()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        proxy_stats_path = os.path.join(tmp_dir, "proxy_stats.json")
+        started = time.monotonic()
+        proxy_check = None
+        try:
+            if check_proxies:
+                validator = ProxyValidator(site.check_url, timeout=2)
+                pool = ProxyPool([])
+                validator.refresh(pool, proxy_list)
+                proxy_check = {
+                    "seconds": round(time.monotonic() - started, 3),
+                    "live": len(pool),
+                    "probed": len(proxy_list),
+                }
+                proxy_list = pool
+            if engine == "asyncio":
+                store = aio_scrape(
+                    pages,
+                    concurrency,
+                    proxy_list,
+                    retries=retries,
+                    proxy_stats_path=proxy_stats_path,
+                    base_url=site.base_url,
+                    parse_workers=parse_workers,
+                    metrics=metrics,
+                )
+            else:
+                profile = DEFAULT_PROFILE
+                if lean_browser:
+                    profile = DriverProfile.lean(allowed_hosts=(MOCK_HOST,))
+                driver_pool = DriverPool(profile=profile)
+                store = a_scrape(
+                    pages,
+                    workers,
+                    proxy_list,
+                    retries=retries,
+                    http_details=http_details,
+                    api_listings=api_listings,
+                    detail_scrapers=detail_workers,
+                    proxy_stats_path=proxy_stats_path,
+                    base_url=site.base_url,
+                    driver_pool=driver_pool,
+                    extraction_stats=extraction_stats,
+                    parse_workers=parse_workers,
+                    metrics=metrics,
+                    detail_tabs=detail_tabs,
+                )
+        finally:
+            elapsed = time.monotonic() - started
+            site.close()
+        with open(proxy_stats_path, "r", encoding="utf-8") as file:
+            proxy_stats = json.load(file)
+
+    page_stats = site.page_stats()
+    listing_latencies = page_stats["listing"]["latencies"]
+    detail_latencies = page_stats["detail"]["latencies"]
+    pool_stats = driver_pool.stats() if driver_pool else {}
+    return {
+        "engine": engine,
+        "seconds": round(elapsed, 3),
+        "jobs": len(store),
+        "jobs_expected": site.total_jobs(),
+        "jobs_per_sec": round(len(store) / elapsed, 2) if elapsed else None,
+        "page_latency_p50": _round(percentile(listing_latencies, 0.5)),
+        "page_latency_p95": _round(percentile(listing_latencies, 0.95)),
+        "detail_latency_p50": _round(percentile(detail_latencies, 0.5)),
+        "detail_latency_p95": _round(percentile(detail_latencies, 0.95)),
+        "retries": sum(proxy["failures"] for proxy in proxy_stats),
+        "site_retries": (
+            page_stats["listing"]["retries"] + page_stats["detail"]["retries"]
+        ),
+        "failed_pages": page_stats["listing"]["failed"],
+        "failed_jobs": page_stats["detail"]["failed"],
+        "browser_launches": pool_stats.get("launches", 0),
+        "driver_pool": pool_stats,
+        "extraction": extraction_stats.stats(),
+        "stages": _stages(metrics),
+        "browser_bytes": _browser_bytes(metrics),
+        "proxy_check": proxy_check,
+    }
+
+
+def _stages(metrics):
+    stages = {}
+    for histogram in metrics.snapshot()["histograms"]:
+        stage = histogram["labels"].get("stage")
+        if histogram["name"] == "stage_seconds" and stage not in stages:
+            merged = metrics.histogram("stage_seconds", stage=stage)
+            stages[stage] = {
+                "count": merged.count,
+                "p50": _round(merged.quantile(0.5)),
+                "p95": _round(merged.quantile(0.95)),
+            }
+    return stages
+
+
+def _browser_bytes(metrics):
+    report = {}
+    for kind in ("listing", "detail"):
+        for blocking in ("full", "urls", "hosts", "none"):
+            pages = metrics.total("browser_pages", kind=kind, blocking=blocking)
+            if pages:
+                total = metrics.total("page_bytes", kind=kind, blocking=blocking)
+                report.setdefault(kind, {})[blocking] = {
+                    "pages": pages,
+                    "bytes_per_page": round(total / pages),
+                }
+    return report
+
+
+def _round(value):
+    return round(value, 3) if value is not None else None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark a scraping engine against a local mock site."
+    )
+    parser.add_argument("--engine", choices=["threads", "asyncio"], default="threads")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--jobs-per-page", type=int, default=25)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--detail-workers", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Mean site latency in seconds."
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of 503 answers."
+    )
+    parser.add_argument("--proxies", type=int, default=8)
+    parser.add_argument(
+        "--dead-proxies", type=int, default=0, help="Proxies refusing connections."
+    )
+    parser.add_argument(
+        "--drop-rate",
+        type=float,
+        default=0.0,
+        help="Share of connections healthy proxies drop.",
+    )
+    parser.add_argument("--retries", type=int, default=5)
+    parser.add_argument(
+        "--no-http-details",
+        action="store_true",
+        help="Load every job page in the browser (threads engine).",
+    )
+    parser.add_argument(
+        "--api-listings",
+        action="store_true",
+        help="Read listing pages from the search endpoint (threads engine).",
+    )
+    parser.add_argument(
+        "--no-search-api",
+        action="store_true",
+        help="Have the mock site answer the search endpoint with 404s.",
+    )
+    parser.add_argument(
+        "--lean-browser",
+        action="store_true",
+        help="Start browsers with the lean profile (threads engine).",
+    )
+    parser.add_argument(
+        "--detail-tabs",
+        type=int,
+        default=0,
+        help="Tabs per browser for detail pages (threads engine).",
+    )
+    parser.add_argument(
+        "--check-proxies",
+        action="store_true",
+        help="Probe the proxies first and only use the live ones.",
+    )
+    parser.add_argument("--parse-workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the report to this file.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.WARNING,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+    args = parse_args()
+    report = run_benchmark(
+        engine=args.engine,
+        pages=args.pages,
+        jobs_per_page=args.jobs_per_page,
+        workers=args.workers,
+        detail_workers=args.detail_workers,
+        concurrency=args.concurrency,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        proxies=args.proxies,
+        dead_proxies=args.dead_proxies,
+        drop_rate=args.drop_rate,
+        retries=args.retries,
+        http_details=not args.no_http_details,
+        api_listings=args.api_listings,
+        search_api=not args.no_search_api,
+        lean_browser=args.lean_browser,
+        detail_tabs=args.detail_tabs,
+        check_proxies=args.check_proxies,
+        parse_workers=args.parse_workers,
+        seed=args.seed,
+    )
+    output = json.dumps(report, indent=4)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
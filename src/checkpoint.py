@@ -0,0 +1,157 @@
+import os
+import json
+import time
+import logging
+import threading
+
+
+class Checkpoint:
+    """
+    Records which listing pages and job links a run has finished, and
+    periodically saves that state to disk so a restarted run can skip them.
+    Jobs found on finished pages are kept until their details are done, so
+    skipping a page never loses the jobs it listed. The run's start time is
+    kept as well, so a resumed run knows which jobs it changed before the
+    crash.
+    """
+
+    def __init__(self, path, params=None, interval=30):
+        """
+        Initializes an empty Checkpoint.
+
+        Args:
+            path (str): JSON file the checkpoint is saved to.
+            params (dict): Run parameters (query, filters, ...). A saved
+                checkpoint is only resumed if they match.
+            interval (int): Minimum seconds between automatic saves.
+        """
+        self.path = path
+        self.params = params if params else {}
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._last_save = time.monotonic()
+        self.started = time.time()
+        self.pages_done = set()
+        self.jobs = {}
+        self.jobs_done = set()
+
+    @classmethod
+    def load(cls, path, params=None, interval=30):
+        """
+        Loads a saved checkpoint, or starts an empty one if there is none
+        or it was made with different run parameters.
+
+        Args:
+            path (str): JSON file the checkpoint is saved to.
+            params (dict): Parameters of the run being resumed.
+            interval (int): Minimum seconds between automatic saves.
+
+        Returns:
+            Checkpoint: The loaded checkpoint.
+        """
+        checkpoint = cls(path, params, interval)
+        if not os.path.exists(path):
+            logging.info(f"No checkpoint at {path}, starting fresh")
+            return checkpoint
+
+        with open(path, "r", encoding="utf-8") as file:
+            state = json.load(file)
+        if state.get("params") != checkpoint.params:
+            logging.warning(
+                f"Checkpoint {path} was made with {state.get('params')}, "
+                f"starting fresh"
+            )
+            return checkpoint
+
+        checkpoint.started = state.get("started", checkpoint.started)
+        checkpoint.pages_done = set(state["pages_done"])
+        checkpoint.jobs = {job["link"]: job for job in state["jobs"]}
+        checkpoint.jobs_done = set(state["jobs_done"])
+        logging.info(
+            f"Resuming from {path}: {len(checkpoint.pages_done)} pages and "
+            f"{len(checkpoint.jobs_done)} jobs done, "
+            f"{len(checkpoint.pending_jobs())} jobs pending"
+        )
+        return checkpoint
+
+    def pending_pages(self, pages):
+        """
+        Args:
+            pages (iterable): Listing pages the run covers.
+
+        Returns:
+            list: Pages that are not done yet, in order.
+        """
+        with self._lock:
+            return [page for page in pages if page not in self.pages_done]
+
+    def pending_jobs(self):
+        """
+        Returns:
+            list: Jobs listed on finished pages whose details are not done.
+        """
+        with self._lock:
+            return [
+                job for link, job in self.jobs.items()
+                if link not in self.jobs_done
+            ]
+
+    def mark_page(self, page, jobs):
+        """
+        Marks a listing page as done along with the jobs it listed.
+
+        Args:
+            page (str): Listing page URL.
+            jobs (list): Listing entries with "title" and "link".
+        """
+        with self._lock:
+            self.pages_done.add(page)
+            for job in jobs:
+                self.jobs.setdefault(job["link"], job)
+        self._maybe_save()
+
+    def mark_job(self, job_link):
+        """
+        Marks a job's details as done.
+
+        Args:
+            job_link (str): URL of the job details page.
+        """
+        with self._lock:
+            self.jobs_done.add(job_link)
+        self._maybe_save()
+
+    def save(self):
+        """Writes the checkpoint atomically."""
+        with self._lock:
+            state = {
+                "params": self.params,
+                "started": self.started,
+                "pages_done": sorted(self.pages_done),
+                "jobs": list(self.jobs.values()),
+                "jobs_done": sorted(self.jobs_done),
+            }
+            self._last_save = time.monotonic()
+        tmp_path = self.path + ".tmp"
+        with self._save_lock:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(state, file, ensure_ascii=False)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Deletes the saved checkpoint once a run has completed."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _maybe_save(self):
+        with self._lock:
+            now = time.monotonic()
+            due = now - self._last_save >= self.interval
+            if due:
+                # Claim this save so other threads don't start one too
+                self._last_save = now
+        if due:
+            self.save()
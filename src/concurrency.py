@@ -0,0 +1,151 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one kind of fetch. Every attempt holds a
+    slot while it runs. After each `window` finished attempts, the limit
+    grows by one when the error rate stays under `max_error_rate` and the
+    median latency stays within `latency_factor` of the best recent
+    median. Otherwise it is halved. Threads beyond the limit wait for a
+    slot, so the worker pool is a ceiling and the limiter finds the
+    highest parallelism the proxies and the server sustain.
+    """
+
+    def __init__(
+        self,
+        name,
+        maximum,
+        initial=None,
+        minimum=1,
+        window=20,
+        max_error_rate=0.2,
+        latency_factor=2.0,
+    ):
+        """
+        Initializes the AdaptiveLimiter instance.
+
+        Args:
+            name (str): Name used in log messages, e.g. "listing".
+            maximum (int): Upper bound, normally the number of workers.
+            initial (int): Starting limit, defaults to half of `maximum`.
+            minimum (int): Lower bound of the limit.
+            window (int): Finished attempts between two decisions.
+            max_error_rate (float): Share of failed attempts in a window
+                above which the limit is halved.
+            latency_factor (float): How much slower than the best median
+                latency a window may get before the limit is halved.
+        """
+        self.name = name
+        self.maximum = maximum
+        self.minimum = min(minimum, maximum)
+        self.limit = initial if initial else max(self.minimum, maximum // 2)
+        self.window = window
+        self.max_error_rate = max_error_rate
+        self.latency_factor = latency_factor
+        self.baseline = None
+        self.decisions = 0
+        self.lowest = self.limit
+        self.highest = self.limit
+        self._in_flight = 0
+        self._failures = 0
+        self._latencies = []
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        """
+        Holds a slot for one attempt, waiting while the limit is reached.
+        An exception raised inside the block counts as a failed attempt.
+        """
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+        started = time.monotonic()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+            self.record(time.monotonic() - started, failed)
+
+    def record(self, latency, failed=False):
+        """
+        Counts a finished attempt and adjusts the limit once a window is
+        full.
+
+        Args:
+            latency (float): Seconds the attempt took.
+            failed (bool): Whether the attempt failed.
+        """
+        with self._condition:
+            if failed:
+                self._failures += 1
+            self._latencies.append(None if failed else latency)
+            if len(self._latencies) >= self.window:
+                self._decide()
+            self._condition.notify_all()
+
+    def _decide(self):
+        attempts = len(self._latencies)
+        error_rate = self._failures / attempts
+        latencies = sorted(
+            latency for latency in self._latencies if latency is not None
+        )
+        median = latencies[len(latencies) // 2] if latencies else None
+        self._failures = 0
+        self._latencies = []
+
+        previous = self.limit
+        slow = (
+            median is not None
+            and self.baseline is not None
+            and median > self.baseline * self.latency_factor
+        )
+        if error_rate > self.max_error_rate or slow:
+            self.limit = max(self.minimum, self.limit // 2)
+            action = "backing off"
+        else:
+            self.limit = min(self.maximum, self.limit + 1)
+            action = "raising"
+        if median is not None:
+            # The best median creeps up 5% per window, so one unusually fast
+            # window early in the run does not hold the limit down forever
+            if self.baseline is None:
+                self.baseline = median
+            else:
+                self.baseline = min(median, self.baseline * 1.05)
+
+        self.decisions += 1
+        self.lowest = min(self.lowest, self.limit)
+        self.highest = max(self.highest, self.limit)
+        if self.limit != previous:
+            logging.info(
+                f"Concurrency {self.name}: {action} {previous} -> {self.limit} "
+                f"(errors {error_rate:.0%}, median {_seconds(median)}, "
+                f"best {_seconds(self.baseline)})"
+            )
+
+    def stats(self):
+        """
+        Returns:
+            dict: Current, lowest and highest limit and the number of
+            decisions taken.
+        """
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "min_limit": self.lowest,
+                "max_limit": self.highest,
+                "decisions": self.decisions,
+            }
+
+
+def _seconds(value):
+    return f"{value:.2f}s" if value is not None else "n/a"
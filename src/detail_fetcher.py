@@ -0,0 +1,227 @@
+import re
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, Comment, NavigableString, SoupStrainer
+
+from parsing import build_job_details
+from parse_pool import ParsePool
+
+try:
+    import lxml  # noqa: F401
+
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+
+# Only the job-data and job-description blocks are needed, so the rest of
+# the document is skipped while parsing. The pattern is matched against the
+# whole class attribute, so elements with extra classes are kept too.
+_DETAIL_STRAINER = SoupStrainer(
+    class_=re.compile(r"(^|\s)(job-data|job-description)(\s|$)")
+)
+
+# Elements that innerText puts on lines of their own
+_BLOCK_TAGS = frozenset(
+    "address article aside blockquote dd div dl dt fieldset figcaption figure "
+    "footer form h1 h2 h3 h4 h5 h6 header hr li main nav ol p pre section "
+    "table tr ul".split()
+)
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+def extract_detail_html(page_html):
+    """
+    Extracts the raw job-data fields and description from a job details
+    page's static HTML, leaving the CPU-heavy parsing to the caller.
+
+    Args:
+        page_html (str): Raw HTML of the job page.
+
+    Returns:
+        tuple: (fields, description) as taken by parsing.build_job_details,
+        or None when the page does not contain the server-rendered
+        job-data container.
+    """
+    soup = BeautifulSoup(page_html, HTML_PARSER, parse_only=_DETAIL_STRAINER)
+    job_data = soup.find(class_="job-data")
+    job_description = soup.find(class_="job-description")
+    if job_data is None or job_description is None:
+        return None
+
+    fields = []
+    for element in job_data.find_all(class_="job-data__element"):
+        title = element.find(class_="job-data__title")
+        value = element.find(class_="job-data__value")
+        if title is None or value is None:
+            logging.warning("Error extracting job element: missing title/value")
+            continue
+        fields.append(
+            (title.decode_contents().strip(), value.decode_contents().strip())
+        )
+
+    # Mirror the browser path: one line per text block, no blanks
+    lines = _inner_text_lines(job_description, [""])
+    description = "\n".join(" ".join(line.split()) for line in lines if line.strip())
+    return fields, description
+
+
+def _inner_text_lines(element, lines):
+    """
+    Splits an element's text into lines the way innerText does: block
+    elements and <br> break lines, inline elements and source line breaks
+    do not.
+    """
+    for child in element.children:
+        if isinstance(child, NavigableString):
+            if not isinstance(child, Comment):
+                lines[-1] += str(child)
+        elif child.name == "br":
+            lines.append("")
+        elif child.name in ("script", "style", "template"):
+            continue
+        elif child.name in _BLOCK_TAGS:
+            lines.append("")
+            _inner_text_lines(child, lines)
+            lines.append("")
+        else:
+            _inner_text_lines(child, lines)
+    return lines
+
+
+def parse_detail_html(page_html, country_):
+    """
+    Parses a job details page from its static HTML.
+
+    Args:
+        page_html (str): Raw HTML of the job page.
+        country_ (str): Country code for parsing addresses (e.g., 'US').
+
+    Returns:
+        dict: Same shape as Scraper.extract_job_details, or None when the
+        page does not contain the server-rendered job-data container.
+    """
+    extracted = extract_detail_html(page_html)
+    if extracted is None:
+        return None
+    fields, description = extracted
+    return build_job_details(fields, description, country_)
+
+
+def build_session(pool_size, headers):
+    """
+    Args:
+        pool_size (int): Connections kept alive per host.
+        headers (dict): Default request headers.
+
+    Returns:
+        requests.Session: A session with a connection pool of that size.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(headers)
+    return session
+
+
+class HttpDetailFetcher:
+    """
+    Fetches job detail pages over plain HTTP and parses the static HTML,
+    avoiding a browser round-trip for pages that are server rendered.
+    Each thread gets its own pooled requests.Session.
+    """
+
+    def __init__(
+        self, timeout=10, pool_size=16, headers=None, parse_pool=None, page_cache=None
+    ):
+        """
+        Initializes the HttpDetailFetcher instance.
+
+        Args:
+            timeout (int): Seconds to wait for a response.
+            pool_size (int): Connections kept alive per host and session.
+            headers (dict): Request headers, defaults to DEFAULT_HEADERS.
+            parse_pool (ParsePool): Where the extracted fields are parsed,
+                defaults to the calling thread.
+            page_cache (PageCache): Where pages with static job data are
+                stored.
+        """
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.headers = headers if headers else DEFAULT_HEADERS
+        self.parse_pool = parse_pool if parse_pool else ParsePool(workers=0)
+        self.page_cache = page_cache
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fallbacks = 0
+
+    @property
+    def session(self):
+        """requests.Session: The calling thread's pooled session."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = build_session(self.pool_size, self.headers)
+            self._local.session = session
+        return session
+
+    def fetch(self, job_link, country_, proxy_address=None):
+        """
+        Fetches and parses a job page without a browser.
+
+        Args:
+            job_link (str): URL of the job details page.
+            country_ (str): Country code for parsing addresses (e.g., 'US').
+            proxy_address (str): Proxy to route the request through.
+
+        Returns:
+            dict: Job details, or None when the static HTML lacks the
+            job-data container and a browser is needed.
+
+        Raises:
+            requests.RequestException: On network or HTTP errors, so the
+                caller can retry with another proxy.
+        """
+        proxies = None
+        if proxy_address:
+            proxies = {"http": proxy_address, "https": proxy_address}
+        res = self.session.get(job_link, proxies=proxies, timeout=self.timeout)
+        res.raise_for_status()
+
+        extracted = extract_detail_html(res.text)
+        job_details = None
+        if extracted is not None and self.page_cache:
+            self.page_cache.put(job_link, res.text)
+        if extracted is not None:
+            fields, description = extracted
+            job_details = self.parse_pool.build_job_details(
+                fields, description, country_
+            )
+        with self._lock:
+            if job_details is None:
+                self.fallbacks += 1
+            else:
+                self.hits += 1
+        if job_details is None:
+            logging.info(f"No static job data for {job_link}, using browser")
+        return job_details
+
+    def stats(self):
+        """
+        Returns:
+            dict: Pages served over HTTP and pages that needed a browser.
+        """
+        with self._lock:
+            return {"http_hits": self.hits, "browser_fallbacks": self.fallbacks}
@@ -0,0 +1,242 @@
+import time
+import logging
+import threading
+
+
+# Each script reads everything it needs in one WebDriver round-trip instead
+# of one find_element / get_attribute / .text call per field.
+_LISTING_SCRIPT = """
+return Array.from(document.getElementsByClassName("job-listing"), function (row) {
+    var link = row.getElementsByClassName("job-listing__link")[0];
+    var location = row.getElementsByClassName("job-listing__location")[0];
+    return {
+        title: link ? link.innerText : null,
+        link: link ? link.href : null,
+        location: location ? location.innerText : null
+    };
+});
+"""
+
+_DETAIL_SCRIPT = """
+var data = document.getElementsByClassName("job-data")[0];
+var description = document.getElementsByClassName("job-description")[0];
+if (!data || !description) {
+    return null;
+}
+var fields = [];
+Array.from(data.getElementsByClassName("job-data__element"), function (element) {
+    var title = element.getElementsByClassName("job-data__title")[0];
+    var value = element.getElementsByClassName("job-data__value")[0];
+    fields.push(title && value ? [title.innerHTML, value.innerHTML] : null);
+});
+return {fields: fields, description: description.innerText};
+"""
+
+
+_RESULT_COUNT_SCRIPT = """
+var match = document.body.innerText.match(/\\bof\\s+([\\d,]+)\\s+(?:results|jobs)\\b/i);
+return match ? match[1] : null;
+"""
+
+
+def extract_result_count(driver):
+    """
+    Reads the total result count shown on a loaded results page, matched
+    like listing_fetcher.RESULT_COUNT_PATTERN.
+
+    Args:
+        driver (WebDriver): Driver showing the results page.
+
+    Returns:
+        int: Total number of results, or None when the page shows no count.
+    """
+    count = driver.execute_script(_RESULT_COUNT_SCRIPT)
+    return int(count.replace(",", "")) if count else None
+
+
+_TRANSFER_SIZE_SCRIPT = """
+var entries = performance.getEntriesByType("navigation")
+    .concat(performance.getEntriesByType("resource"));
+return entries.reduce(function (total, entry) {
+    return total + (entry.transferSize || 0);
+}, 0);
+"""
+
+
+def extract_transfer_size(driver):
+    """
+    Sums the bytes the loaded page and its resources took over the network,
+    as reported by the browser's resource timing. Cross-origin resources
+    that do not allow timing count as 0.
+
+    Args:
+        driver (WebDriver): Driver showing the page.
+
+    Returns:
+        int: Bytes transferred for the page.
+    """
+    return int(driver.execute_script(_TRANSFER_SIZE_SCRIPT) or 0)
+
+
+def extract_listing_rows(driver, page_url):
+    """
+    Reads every job row of a loaded results page in a single script call.
+
+    Args:
+        driver (WebDriver): Driver showing the results page.
+        page_url (str): URL of the page, used in log messages.
+
+    Returns:
+        list: (location, {"title": ..., "link": ...}) tuples, in page order.
+    """
+    jobs = []
+    for row in driver.execute_script(_LISTING_SCRIPT):
+        title = (row["title"] or "").strip()
+        link = row["link"]
+        location = (row["location"] or "").strip()
+        if not title or not link or not location:
+            logging.error(
+                f"Error during parsing job: Missing or incomplete job data, "
+                f"on page {page_url}"
+            )
+            continue
+        jobs.append((location, {"title": title, "link": link}))
+    return jobs
+
+
+# Marks the document a tab is leaving, so polling never reads the previous
+# job's page while the next one is still loading
+_TAB_NAVIGATE_SCRIPT = """
+document.documentElement.setAttribute("data-tab-stale", "1");
+window.location.href = arguments[0];
+"""
+
+_TAB_POLL_SCRIPT = """
+if (document.documentElement.hasAttribute("data-tab-stale")) {
+    return null;
+}
+var result = (function () {
+%s
+})();
+if (result && arguments[0]) {
+    result.html = document.documentElement.outerHTML;
+}
+return result;
+""" % _DETAIL_SCRIPT
+
+
+def start_tab_navigation(driver, url):
+    """
+    Points the driver's current tab at a URL without waiting for the load.
+
+    Args:
+        driver (WebDriver): Driver switched to the tab.
+        url (str): Page to load.
+    """
+    driver.execute_script(_TAB_NAVIGATE_SCRIPT, url)
+
+
+def poll_detail_fields(driver, include_html=False):
+    """
+    Reads the job data of the current tab if its page has loaded that far,
+    in a single script call.
+
+    Args:
+        driver (WebDriver): Driver switched to the tab.
+        include_html (bool): Whether to return the page's HTML too.
+
+    Returns:
+        tuple: (fields, description, html) as in extract_detail_fields,
+        with html None unless asked for, or None while the job data is not
+        there yet.
+    """
+    result = driver.execute_script(_TAB_POLL_SCRIPT, include_html)
+    if result is None:
+        return None
+    fields, description = _detail_result(result)
+    return fields, description, result.get("html")
+
+
+def extract_detail_fields(driver):
+    """
+    Reads the job-data fields and the description of a loaded job page in
+    a single script call.
+
+    Args:
+        driver (WebDriver): Driver showing the job details page.
+
+    Returns:
+        tuple: (fields, description) where fields are (title, value)
+        innerHTML pairs, or None when the page has no job-data container.
+    """
+    result = driver.execute_script(_DETAIL_SCRIPT)
+    if result is None:
+        return None
+    return _detail_result(result)
+
+
+def _detail_result(result):
+    fields = []
+    for field in result["fields"]:
+        if field is None:
+            logging.warning("Error extracting job element: missing title/value")
+            continue
+        fields.append((field[0].strip(), field[1].strip()))
+
+    # innerText separates blocks with blank lines, WebElement.text does not
+    lines = result["description"].splitlines()
+    description = "\n".join(line.strip() for line in lines if line.strip())
+    return fields, description
+
+
+class ExtractionStats:
+    """Thread-safe per-page extraction timings, split by page kind."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings = {}
+
+    def add(self, kind, seconds):
+        """
+        Records the extraction time of one page.
+
+        Args:
+            kind (str): "listing" or "detail".
+            seconds (float): Time spent extracting the page.
+        """
+        with self._lock:
+            self._timings.setdefault(kind, []).append(seconds)
+
+    def timed(self, kind, extract, *args):
+        """
+        Calls `extract(*args)` and records how long it took.
+
+        Returns:
+            The return value of `extract`.
+        """
+        started = time.monotonic()
+        try:
+            return extract(*args)
+        finally:
+            elapsed = time.monotonic() - started
+            self.add(kind, elapsed)
+            logging.debug(f"Extracted {kind} page in {elapsed * 1000:.1f} ms")
+
+    def stats(self):
+        """
+        Returns:
+            dict: Per kind, the number of pages and the mean, p50 and p95
+            extraction time in milliseconds.
+        """
+        with self._lock:
+            timings = {kind: sorted(values) for kind, values in self._timings.items()}
+        stats = {}
+        for kind, values in timings.items():
+            count = len(values)
+            stats[kind] = {
+                "pages": count,
+                "mean_ms": round(sum(values) / count * 1000, 2),
+                "p50_ms": round(values[count // 2] * 1000, 2),
+                "p95_ms": round(values[min(count - 1, int(count * 0.95))] * 1000, 2),
+            }
+        return stats
@@ -0,0 +1,572 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from itertools import groupby
+
+from addresses import canonical_addresses, normalize_address
+from job_index import parse_job_id
+from parsing import parse_pay_range
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS locations (
+    location_id INTEGER PRIMARY KEY,
+    location TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS addresses (
+    address_id INTEGER PRIMARY KEY,
+    address TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    job_link TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    hourly_rate TEXT,
+    salary TEXT,
+    hourly_min REAL,
+    hourly_max REAL,
+    salary_min REAL,
+    salary_max REAL,
+    location_id INTEGER REFERENCES locations (location_id),
+    listing TEXT,
+    scraped REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_addresses (
+    job_id TEXT NOT NULL REFERENCES jobs (job_id),
+    address_id INTEGER NOT NULL REFERENCES addresses (address_id),
+    PRIMARY KEY (job_id, address_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS job_types (
+    job_id TEXT NOT NULL REFERENCES jobs (job_id),
+    position INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    PRIMARY KEY (job_id, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS job_queries (
+    job_id TEXT NOT NULL REFERENCES jobs (job_id),
+    query TEXT NOT NULL,
+    PRIMARY KEY (job_id, query)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS job_addresses_address ON job_addresses (address_id);
+CREATE INDEX IF NOT EXISTS job_types_type ON job_types (type);
+CREATE INDEX IF NOT EXISTS job_queries_query ON job_queries (query);
+CREATE INDEX IF NOT EXISTS jobs_location ON jobs (location_id);
+CREATE INDEX IF NOT EXISTS jobs_hourly ON jobs (hourly_max, hourly_min);
+CREATE INDEX IF NOT EXISTS jobs_salary ON jobs (salary_max, salary_min);
+
+-- Every job under each of its addresses, or under its location when it
+-- has none: the grouping of walmart_jobs_formatted.json and
+-- walmart_jobs_bad.json
+CREATE VIEW IF NOT EXISTS job_groups AS
+    SELECT 'address' AS kind, addresses.address AS grp, job_addresses.job_id
+    FROM job_addresses JOIN addresses USING (address_id)
+    UNION ALL
+    SELECT 'location', locations.location, jobs.job_id
+    FROM jobs LEFT JOIN locations USING (location_id)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM job_addresses WHERE job_addresses.job_id = jobs.job_id
+    );
+"""
+
+# Columns of a job in the output shape, with its types, queries and
+# addresses gathered by index lookups
+JOB_COLUMNS = """
+    jobs.job_id, jobs.job_link, jobs.title, jobs.description,
+    jobs.hourly_rate, jobs.salary,
+    (SELECT json_group_array(type) FROM
+        (SELECT type FROM job_types WHERE job_types.job_id = jobs.job_id
+         ORDER BY position)) AS types,
+    (SELECT json_group_array(query) FROM job_queries
+        WHERE job_queries.job_id = jobs.job_id) AS queries,
+    (SELECT json_group_array(address) FROM job_addresses
+        JOIN addresses USING (address_id)
+        WHERE job_addresses.job_id = jobs.job_id) AS addresses,
+    (SELECT location FROM locations
+        WHERE locations.location_id = jobs.location_id) AS location,
+    jobs.listing
+"""
+
+PAY_COLUMNS = {
+    "hour": ("hourly_min", "hourly_max"),
+    "year": ("salary_min", "salary_max"),
+}
+
+
+class JobDatabase:
+    """
+    SQLite store of scraped jobs for downstream consumers. Jobs, addresses,
+    locations, employment types and query tags live in normalized, indexed
+    tables, so questions such as "jobs at this address" or "salaries above
+    X" are answered by `find` without loading the dataset. Jobs are written
+    as they arrive but inserted in batches of `batch_size`, one transaction
+    each. The grouped JSON files remain available through `export`, which
+    streams them from the `job_groups` view.
+    """
+
+    def __init__(self, path, batch_size=200):
+        """
+        Initializes the JobDatabase instance, creating the database if
+        needed.
+
+        Args:
+            path (str): SQLite database file.
+            batch_size (int): Jobs buffered before they are inserted.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+        if "listing" not in columns:
+            # Databases made before the search endpoint fields were kept
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN listing TEXT")
+        # Title keywords are matched through a full-text index when SQLite
+        # was built with FTS5, and by scanning the titles otherwise
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(title)"
+            )
+            self.full_text = True
+        except sqlite3.OperationalError:
+            self.full_text = False
+        self._conn.commit()
+        self._pending = []
+        # Buffer size at which `write` inserts, pushed back after a failed
+        # insert so the batch is not retried on every job
+        self._flush_at = batch_size
+        self._ids = {"addresses": {}, "locations": {}}
+        self.written = 0
+        self.batches = 0
+        self.failed_batches = 0
+
+    def count(self):
+        """
+        Returns:
+            int: Number of jobs stored, including buffered ones.
+        """
+        with self._lock:
+            self._flush()
+            return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def write(self, job, job_details):
+        """
+        Buffers a scraped job and inserts the buffer once it holds
+        `batch_size` jobs. A job that is already stored is replaced.
+
+        Args:
+            job (dict): Listing entry with "title", "link" and, in batch
+                runs, "queries". Search endpoint fields under "listing"
+                are stored as JSON.
+            job_details (dict): Output of parsing.build_job_details.
+        """
+        with self._lock:
+            self._pending.append((job, job_details))
+            if len(self._pending) >= self._flush_at:
+                self._flush()
+
+    def flush(self):
+        """Inserts the buffered jobs."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        now = time.time()
+        pending, self._pending = self._pending, []
+        try:
+            with self._conn:
+                for job, job_details in pending:
+                    self._insert(job, job_details, now)
+        except sqlite3.Error as e:
+            # The transaction was rolled back, ids cached during it may not
+            # exist. The batch stays buffered for the next flush.
+            self._ids = {"addresses": {}, "locations": {}}
+            self._pending = pending + self._pending
+            self._flush_at = len(self._pending) + self.batch_size
+            self.failed_batches += 1
+            logging.error(f"Failed to insert {len(pending)} jobs, keeping them: {e}")
+            return
+        self._flush_at = self.batch_size
+        self.written += len(pending)
+        self.batches += 1
+
+    def _insert(self, job, job_details, now):
+        job_id = parse_job_id(job["link"])
+        hourly_min, hourly_max = parse_pay_range(job_details["hourly_rate"])
+        salary_min, salary_max = parse_pay_range(job_details["salary"])
+        location_id = None
+        if job_details["location"]:
+            location_id = self._id("locations", "location", job_details["location"])
+        self._conn.execute(
+            """
+            INSERT INTO jobs (job_id, job_link, title, description, hourly_rate,
+                              salary, hourly_min, hourly_max, salary_min,
+                              salary_max, location_id, listing, scraped)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(job_id) DO UPDATE SET
+                job_link = excluded.job_link,
+                title = excluded.title,
+                description = excluded.description,
+                hourly_rate = excluded.hourly_rate,
+                salary = excluded.salary,
+                hourly_min = excluded.hourly_min,
+                hourly_max = excluded.hourly_max,
+                salary_min = excluded.salary_min,
+                salary_max = excluded.salary_max,
+                location_id = excluded.location_id,
+                listing = COALESCE(excluded.listing, listing),
+                scraped = excluded.scraped
+            """,
+            (
+                job_id,
+                job["link"],
+                job["title"],
+                job_details["description"],
+                job_details["hourly_rate"],
+                job_details["salary"],
+                hourly_min,
+                hourly_max,
+                salary_min,
+                salary_max,
+                location_id,
+                json.dumps(job["listing"], ensure_ascii=False)
+                if job.get("listing")
+                else None,
+                now,
+            ),
+        )
+        for table in ("job_addresses", "job_types"):
+            self._conn.execute(f"DELETE FROM {table} WHERE job_id = ?", (job_id,))
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO job_addresses (job_id, address_id) VALUES (?, ?)",
+            [
+                (job_id, self._id("addresses", "address", address))
+                for address in canonical_addresses(job_details["address"])
+            ],
+        )
+        self._conn.executemany(
+            "INSERT INTO job_types (job_id, position, type) VALUES (?, ?, ?)",
+            [
+                (job_id, position, employment_type)
+                for position, employment_type in enumerate(
+                    job_details["employment_type"]
+                )
+            ],
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO job_queries (job_id, query) VALUES (?, ?)",
+            [(job_id, label) for label in job.get("queries", ())],
+        )
+        if self.full_text:
+            rowid = self._conn.execute(
+                "SELECT rowid FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+            self._conn.execute("DELETE FROM jobs_fts WHERE rowid = ?", (rowid,))
+            self._conn.execute(
+                "INSERT INTO jobs_fts (rowid, title) VALUES (?, ?)",
+                (rowid, job["title"]),
+            )
+
+    def _id(self, table, column, value):
+        ids = self._ids[table]
+        if value not in ids:
+            self._conn.execute(
+                f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)", (value,)
+            )
+            ids[value] = self._conn.execute(
+                f"SELECT rowid FROM {table} WHERE {column} = ?", (value,)
+            ).fetchone()[0]
+        return ids[value]
+
+    def tag_queries(self, queries):
+        """
+        Adds the queries that listed each job once a batch run is done,
+        since a job can be stored before the last query that lists it.
+
+        Args:
+            queries (dict): Job link to query labels, as returned by
+                WorkScheduler.job_queries.
+        """
+        with self._lock:
+            self._flush()
+            with self._conn:
+                self._conn.executemany(
+                    """
+                    INSERT OR IGNORE INTO job_queries (job_id, query)
+                    SELECT job_id, ? FROM jobs WHERE job_id = ?
+                    """,
+                    [
+                        (label, parse_job_id(link))
+                        for link, labels in queries.items()
+                        for label in labels
+                    ],
+                )
+
+    def import_stream(self, ndjson_path):
+        """
+        Inserts the jobs of an NDJSON stream that the database is missing,
+        e.g. the last unflushed batch of a crashed run that --resume will
+        not scrape again.
+
+        Args:
+            ndjson_path (str): NDJSON file written by JobStreamWriter.
+
+        Returns:
+            int: Number of jobs inserted.
+        """
+        with self._lock:
+            self._flush()
+            known = {
+                row[0] for row in self._conn.execute("SELECT job_id FROM jobs")
+            }
+            with open(ndjson_path, "r", encoding="utf-8") as file:
+                for line in file:
+                    record = json.loads(line)
+                    if parse_job_id(record["jobLink"]) in known:
+                        continue
+                    job = {
+                        "link": record["jobLink"],
+                        "title": record["title"],
+                        "queries": record.get("queries", ()),
+                        "listing": record.get("listing"),
+                    }
+                    job_details = {
+                        "description": record["description"],
+                        "hourly_rate": record["hourlyRate"],
+                        "salary": record["salary"],
+                        "employment_type": record["types"],
+                        "address": record["addresses"],
+                        "location": record["location"],
+                    }
+                    self._pending.append((job, job_details))
+            imported = len(self._pending)
+            self._flush()
+        if imported:
+            logging.info(f"Imported {imported} jobs from {ndjson_path}")
+        return imported
+
+    def find(
+        self,
+        address=None,
+        location=None,
+        keyword=None,
+        employment_type=None,
+        min_pay=None,
+        max_pay=None,
+        pay_period="year",
+        query=None,
+        limit=None,
+    ):
+        """
+        Looks jobs up through the indexes. Filters combine with AND, and
+        omitted ones match every job.
+
+        Args:
+            address (str): Address in any spelling, matched by its
+                canonical form.
+            location (str): Location as shown on the job page.
+            keyword (str): Word or phrase in the title, case-insensitive.
+            employment_type (str): e.g. "Full Time".
+            min_pay (float): Jobs whose range reaches at least this much.
+            max_pay (float): Jobs whose range starts at most this high.
+            pay_period (str): "year" compares the salary, "hour" the
+                hourly rate. Jobs without that kind of pay do not match a
+                pay filter.
+            query (str): Label of the batch query that listed the job.
+            limit (int): Most jobs to return.
+
+        Returns:
+            list: Jobs in the output format, with their canonical
+            "addresses" and "location" added, in the order they were
+            stored.
+        """
+        clauses = []
+        params = []
+        if address:
+            clauses.append(
+                "jobs.job_id IN (SELECT job_id FROM job_addresses "
+                "JOIN addresses USING (address_id) WHERE address = ?)"
+            )
+            params.append(normalize_address(address))
+        if location:
+            clauses.append(
+                "jobs.location_id = "
+                "(SELECT location_id FROM locations WHERE location = ?)"
+            )
+            params.append(location)
+        if keyword and self.full_text:
+            clauses.append(
+                "jobs.rowid IN (SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?)"
+            )
+            params.append('"' + keyword.replace('"', '""') + '"')
+        elif keyword:
+            clauses.append("jobs.title LIKE ? ESCAPE '\\'")
+            escaped = keyword.replace("\\", "\\\\").replace("%", "\\%")
+            params.append("%" + escaped.replace("_", "\\_") + "%")
+        if employment_type:
+            clauses.append(
+                "jobs.job_id IN (SELECT job_id FROM job_types WHERE type = ?)"
+            )
+            params.append(employment_type)
+        if min_pay is not None or max_pay is not None:
+            low, high = PAY_COLUMNS[pay_period]
+            if min_pay is not None:
+                clauses.append(f"jobs.{high} >= ?")
+                params.append(min_pay)
+            if max_pay is not None:
+                clauses.append(f"jobs.{low} <= ?")
+                params.append(max_pay)
+        if query:
+            clauses.append(
+                "jobs.job_id IN (SELECT job_id FROM job_queries WHERE query = ?)"
+            )
+            params.append(query)
+
+        sql = f"SELECT {JOB_COLUMNS} FROM jobs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY jobs.rowid"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            self._flush()
+            rows = self._conn.execute(sql, params).fetchall()
+        return [_job_output(row, details=True) for row in rows]
+
+    def groups(self, key):
+        """
+        Args:
+            key (str): "address" or "location".
+
+        Returns:
+            dict: Group to its number of jobs.
+        """
+        with self._lock:
+            self._flush()
+            return dict(
+                self._conn.execute(
+                    "SELECT grp, COUNT(*) FROM job_groups WHERE kind = ? "
+                    "GROUP BY grp ORDER BY grp",
+                    (key,),
+                ).fetchall()
+            )
+
+    def export(self, formatted_path, bad_path):
+        """
+        Writes the jobs grouped by address and by location, in the format
+        of compact_stream. Groups are read from the `job_groups` view one at a
+        time, and the files are written atomically.
+
+        Args:
+            formatted_path (str): Output for jobs grouped by address.
+            bad_path (str): Output for jobs grouped by location.
+
+        Returns:
+            tuple: Number of jobs in the formatted and the bad output.
+        """
+        with self._lock:
+            self._flush()
+            counts = tuple(
+                self._export_groups(key, path)
+                for key, path in (("address", formatted_path), ("location", bad_path))
+            )
+        logging.info(
+            f"Exported {self.path}: {counts[0]} jobs by address, "
+            f"{counts[1]} jobs by location"
+        )
+        return counts
+
+    def _export_groups(self, key, path):
+        rows = self._conn.execute(
+            f"""
+            SELECT job_groups.grp, {JOB_COLUMNS}
+            FROM job_groups JOIN jobs USING (job_id)
+            WHERE job_groups.kind = ?
+            ORDER BY job_groups.grp, jobs.rowid
+            """,
+            (key,),
+        )
+        count = 0
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write("[")
+            for i, (group, group_rows) in enumerate(groupby(rows, lambda r: r[0])):
+                jobs = [_job_output(row[1:]) for row in group_rows]
+                count += len(jobs)
+                entry = json.dumps(
+                    {key: group, "jobs": jobs}, ensure_ascii=False, indent=4
+                )
+                file.write(",\n" if i else "\n")
+                file.write("\n".join("    " + line for line in entry.splitlines()))
+            file.write("\n]" if count else "]")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+        return count
+
+    def stats(self):
+        """
+        Returns:
+            dict: Jobs written, batches inserted and failed inserts in this
+                run.
+        """
+        with self._lock:
+            return {
+                "written": self.written,
+                "batches": self.batches,
+                "failed_batches": self.failed_batches,
+            }
+
+    def close(self):
+        """Inserts the buffered jobs and closes the database."""
+        with self._lock:
+            self._flush()
+            if self._pending:
+                logging.error(
+                    f"{len(self._pending)} jobs were not inserted, they remain "
+                    "in the job stream and are imported on --resume"
+                )
+            self._conn.close()
+        logging.info(f"Job database stats: {self.stats()}")
+
+
+def _job_output(row, details=False):
+    (
+        job_id,
+        job_link,
+        title,
+        description,
+        hourly_rate,
+        salary,
+        types,
+        queries,
+        addresses,
+        location,
+        listing,
+    ) = row
+    output = {
+        "jobLink": job_link,
+        "title": title,
+        "description": description,
+        "hourlyRate": hourly_rate,
+        "salary": salary,
+        "types": json.loads(types),
+    }
+    queries = json.loads(queries)
+    if queries:
+        output["queries"] = sorted(queries)
+    if listing:
+        output["listing"] = json.loads(listing)
+    if details:
+        output["addresses"] = json.loads(addresses)
+        output["location"] = location
+    return output
@@ -0,0 +1,203 @@
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+
+JOB_ID_PATTERN = re.compile(r"/jobs/([A-Za-z]*\d+)")
+
+
+def parse_job_id(job_link):
+    """
+    Extracts the requisition ID (e.g. "WD2147736") from a job link.
+
+    Args:
+        job_link (str): URL of the job details page.
+
+    Returns:
+        str: The job ID, or the link itself when it has no recognizable ID.
+    """
+    match = JOB_ID_PATTERN.search(job_link)
+    return match.group(1) if match else job_link
+
+
+def content_hash(title, job_details):
+    """
+    Returns:
+        str: Stable hash of a job's title and scraped details.
+    """
+    payload = json.dumps([title, job_details], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class JobIndex:
+    """
+    On-disk SQLite index of jobs scraped by previous runs, keyed by job ID.
+    Known postings whose listing title is unchanged and whose details were
+    fetched within `refresh_after` seconds are served from the index instead
+    of the network. The index keeps when each job was last new or changed,
+    so a delta can be written next to the full snapshot.
+    """
+
+    def __init__(self, path, refresh_after=7 * 24 * 3600):
+        """
+        Initializes the JobIndex instance, creating the database if needed.
+
+        Args:
+            path (str): SQLite database file.
+            refresh_after (int): Seconds after which a known posting is
+                fetched again. 0 refreshes everything.
+        """
+        self.path = path
+        self.refresh_after = refresh_after
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                job_link TEXT NOT NULL,
+                title TEXT NOT NULL,
+                details TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                last_fetched REAL NOT NULL,
+                last_changed REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+        if "last_changed" not in columns:
+            # Indexes written before the column existed count as unchanged
+            self._conn.execute(
+                "ALTER TABLE jobs ADD COLUMN last_changed REAL NOT NULL DEFAULT 0"
+            )
+        self._conn.commit()
+        self.new = set()
+        self.changed = set()
+        self.reused = set()
+
+    def lookup(self, job):
+        """
+        Returns the stored details of a known, fresh posting and marks it as
+        seen in this run.
+
+        Args:
+            job (dict): Listing entry with "title" and "link".
+
+        Returns:
+            dict: Stored job details, or None if the job must be fetched.
+        """
+        job_id = parse_job_id(job["link"])
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, details, last_fetched FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            title, details, last_fetched = row
+            if title != job["title"] or now - last_fetched >= self.refresh_after:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET last_seen = ? WHERE job_id = ?", (now, job_id)
+            )
+            self._conn.commit()
+            self.reused.add(job_id)
+        return json.loads(details)
+
+    def record(self, job, job_details):
+        """
+        Stores freshly scraped details and notes whether the posting is new
+        or its content changed since the last fetch.
+
+        Args:
+            job (dict): Listing entry with "title" and "link".
+            job_details (dict): Scraped job details.
+        """
+        job_id = parse_job_id(job["link"])
+        digest = content_hash(job["title"], job_details)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            self._conn.execute(
+                """
+                INSERT INTO jobs (job_id, job_link, title, details, content_hash,
+                                  first_seen, last_seen, last_fetched,
+                                  last_changed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(job_id) DO UPDATE SET
+                    job_link = excluded.job_link,
+                    title = excluded.title,
+                    details = excluded.details,
+                    content_hash = excluded.content_hash,
+                    last_seen = excluded.last_seen,
+                    last_fetched = excluded.last_fetched,
+                    last_changed = CASE
+                        WHEN content_hash = excluded.content_hash
+                        THEN last_changed
+                        ELSE excluded.last_changed
+                    END
+                """,
+                (
+                    job_id,
+                    job["link"],
+                    job["title"],
+                    json.dumps(job_details, ensure_ascii=False),
+                    digest,
+                    now,
+                    now,
+                    now,
+                    now,
+                ),
+            )
+            self._conn.commit()
+            if row is None:
+                self.new.add(job_id)
+            elif row[0] != digest:
+                self.changed.add(job_id)
+
+    def delta_ids(self, since=None):
+        """
+        Args:
+            since (float): Start time of the run, as time.time(). Jobs that
+                are new or changed since then are read from the index, so
+                a resumed run also counts those of the process that
+                crashed.
+
+        Returns:
+            set: IDs of jobs that are new or changed in this run.
+        """
+        with self._lock:
+            if since is None:
+                return self.new | self.changed
+            rows = self._conn.execute(
+                "SELECT job_id FROM jobs WHERE last_changed >= ?", (since,)
+            )
+            return {row[0] for row in rows}
+
+    def stats(self):
+        """
+        Returns:
+            dict: Counts of new, changed and reused jobs in this run.
+        """
+        with self._lock:
+            return {
+                "new": len(self.new),
+                "changed": len(self.changed),
+                "reused": len(self.reused),
+            }
+
+    def close(self):
+        """Logs the run's counts and closes the database."""
+        logging.info(f"Job index stats: {self.stats()}")
+        with self._lock:
+            self._conn.close()
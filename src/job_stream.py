@@ -0,0 +1,221 @@
+import os
+import json
+import logging
+import threading
+
+from addresses import canonical_addresses
+
+
+def stream_record(job, job_details):
+    """
+    Builds the NDJSON record for a scraped job. It carries the output
+    fields plus the addresses and location used for grouping.
+
+    Args:
+        job (dict): Listing entry with "title", "link" and, in batch runs,
+            "queries". The "listing" fields of the search endpoint are
+            kept when present.
+        job_details (dict): Scraped job details.
+
+    Returns:
+        dict: The record.
+    """
+    record = {
+        "jobLink": job["link"],
+        "title": job["title"],
+        "description": job_details["description"],
+        "hourlyRate": job_details["hourly_rate"],
+        "salary": job_details["salary"],
+        "types": job_details["employment_type"],
+        "addresses": job_details["address"],
+        "location": job_details["location"],
+    }
+    if job.get("queries"):
+        record["queries"] = list(job["queries"])
+    if job.get("listing"):
+        record["listing"] = job["listing"]
+    return record
+
+
+class JobStreamWriter:
+    """
+    Appends every scraped job to an NDJSON file the moment it is done, so a
+    crash loses at most the job in flight. Records go to `<path>.part` and
+    the file is atomically renamed to `path` on close. When resuming, a
+    `.part` file left over from a crashed run is continued: a torn trailing
+    line is cut off and the links already written are reported as done.
+    """
+
+    def __init__(self, path, sync_every=50, resume=True):
+        """
+        Initializes the JobStreamWriter instance.
+
+        Args:
+            path (str): Final NDJSON file path.
+            sync_every (int): Records between fsync calls.
+            resume (bool): Continue a leftover `.part` file instead of
+                starting a new one.
+        """
+        self.path = path
+        self.part_path = path + ".part"
+        self.sync_every = sync_every
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self.done = set()
+        self.written = 0
+
+        if resume and os.path.exists(self.part_path):
+            self._resume()
+            self._file = open(self.part_path, "a", encoding="utf-8")
+        else:
+            self._file = open(self.part_path, "w", encoding="utf-8")
+
+    def _resume(self):
+        valid_size = 0
+        with open(self.part_path, "rb") as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self.done.add(record["jobLink"])
+                valid_size += len(line)
+        with open(self.part_path, "r+b") as file:
+            file.truncate(valid_size)
+        logging.info(
+            f"Resuming {self.part_path} with {len(self.done)} jobs already written"
+        )
+
+    def is_done(self, job_link):
+        """
+        Returns:
+            bool: Whether the job was already written, in this or a crashed
+            previous run.
+        """
+        with self._lock:
+            return job_link in self.done
+
+    def write(self, job, job_details):
+        """
+        Appends one job as an NDJSON line and flushes it.
+
+        Args:
+            job (dict): Listing entry with "title" and "link".
+            job_details (dict): Scraped job details.
+        """
+        line = json.dumps(stream_record(job, job_details), ensure_ascii=False)
+        with self._lock:
+            if job["link"] in self.done:
+                return
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.done.add(job["link"])
+            self.written += 1
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every:
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+
+    def close(self):
+        """Syncs the file and atomically publishes it at `path`."""
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            os.replace(self.part_path, self.path)
+        logging.info(f"Wrote {self.written} jobs to {self.path}")
+
+
+def compact_stream(ndjson_path, formatted_path, bad_path, keep=None, queries=None):
+    """
+    Converts an NDJSON job stream into the grouped-by-address and
+    grouped-by-location JSON files, in Unibui's JSON format. The first pass
+    only keeps byte offsets per group, and the second pass reads each
+    group's records back one at a time, so the full dataset is never held
+    in memory. Addresses are grouped by their canonical form. Output files
+    are written atomically.
+
+    Args:
+        ndjson_path (str): NDJSON file written by JobStreamWriter.
+        formatted_path (str): Output for jobs grouped by address.
+        bad_path (str): Output for jobs grouped by location.
+        keep (function): Optional predicate on a record; records for which
+            it returns False are left out (e.g. to write a delta).
+        queries (dict): Job link to the labels of the queries that listed
+            it, merged into the "queries" each record was written with.
+
+    Returns:
+        tuple: Number of jobs in the formatted and the bad output.
+    """
+    # Last record per link wins, in case a job was written twice
+    offsets = {}
+    by_address = {}
+    by_location = {}
+    with open(ndjson_path, "rb") as file:
+        offset = 0
+        for line in file:
+            record = json.loads(line)
+            if keep is None or keep(record):
+                offsets[record["jobLink"]] = (
+                    offset,
+                    record["addresses"],
+                    record["location"],
+                )
+            offset += len(line)
+
+    for offset, addresses, location in offsets.values():
+        if addresses:
+            for address in canonical_addresses(addresses):
+                by_address.setdefault(address, []).append(offset)
+        else:
+            by_location.setdefault(location, []).append(offset)
+
+    with open(ndjson_path, "rb") as source:
+        formatted_count = _write_groups(
+            source, by_address, "address", formatted_path, queries
+        )
+        bad_count = _write_groups(
+            source, by_location, "location", bad_path, queries
+        )
+    logging.info(
+        f"Compacted {ndjson_path}: {formatted_count} jobs by address, "
+        f"{bad_count} jobs by location"
+    )
+    return formatted_count, bad_count
+
+
+def _write_groups(source, groups, key, path, queries=None):
+    count = 0
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        if not groups:
+            file.write("[]")
+        else:
+            file.write("[\n")
+            for i, (group, group_offsets) in enumerate(groups.items()):
+                jobs = []
+                for offset in group_offsets:
+                    source.seek(offset)
+                    record = json.loads(source.readline())
+                    del record["addresses"]
+                    del record["location"]
+                    labels = queries.get(record["jobLink"]) if queries else None
+                    if labels:
+                        record["queries"] = sorted(
+                            set(record.get("queries", ())) | set(labels)
+                        )
+                    jobs.append(record)
+                count += len(jobs)
+                entry = json.dumps(
+                    {key: group, "jobs": jobs}, ensure_ascii=False, indent=4
+                )
+                if i:
+                    file.write(",\n")
+                file.write("\n".join("    " + line for line in entry.splitlines()))
+            file.write("\n]")
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+    return count
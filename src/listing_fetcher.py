@@ -0,0 +1,378 @@
+import re
+import json
+import logging
+import threading
+from urllib.parse import parse_qs, urlencode, urljoin, urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from detail_fetcher import DEFAULT_HEADERS, HTML_PARSER, build_session
+
+
+CAREERS_URL = "https://careers.walmart.com/results"
+
+# JSON endpoint behind the results page, on the same host. It takes the
+# same query parameters and sorts server side.
+SEARCH_API_PATH = "/api/search"
+
+API_HEADERS = {**DEFAULT_HEADERS, "Accept": "application/json"}
+
+# Result count shown above the listings, e.g. "Showing 1-25 of 3,812 jobs"
+RESULT_COUNT_PATTERN = re.compile(r"\bof\s+([\d,]+)\s+(?:results|jobs)\b", re.I)
+
+# Shown instead of listings on a page past the last result
+NO_RESULTS_SELECTOR = ".search-results__no-results"
+
+# Pages in a row without listings that end a search. A single empty page can
+# be a hiccup of the site or the proxy, so it does not end a search alone.
+EMPTY_PAGES_TO_END = 2
+
+# Matched against the whole class attribute, so rows that carry more classes
+# than "job-listing" (e.g. "search-result job-listing") are kept too.
+_LISTING_STRAINER = SoupStrainer(class_=re.compile(r"(^|\s)job-listing(\s|$)"))
+
+
+def build_listing_url(
+    query,
+    page,
+    expand="department,brand,type,rate",
+    job_career_area="all",
+    employment_type=None,
+    base_url=CAREERS_URL,
+):
+    """
+    Builds the URL of a search results page.
+
+    Args:
+        query (str): Search query for the Walmart careers page.
+        page (int): Results page number, starting at 1.
+        expand (str): Additional parameters for expanding search results.
+        job_career_area (str): Job career area filter.
+        employment_type (str): Employment type filter.
+        base_url (str): Results endpoint, overridable for local testing.
+
+    Returns:
+        str: The listing page URL.
+    """
+    payload = (
+        f"?q={query}&page={page}&sort=rank&expand={expand}"
+        f"&jobCareerArea={job_career_area}"
+    )
+    if employment_type:
+        payload += f"&EmploymentType={employment_type}"
+    return base_url + payload
+
+
+def query_label(query, job_career_area="all", employment_type=None):
+    """
+    Names a search for the tags of a batch run, e.g. "IT" or
+    "Data (area: tech, type: FULL_TIME)".
+
+    Args:
+        query (str): Search query for the Walmart careers page.
+        job_career_area (str): Job career area filter.
+        employment_type (str): Employment type filter.
+
+    Returns:
+        str: The label.
+    """
+    filters = []
+    if job_career_area and job_career_area != "all":
+        filters.append(f"area: {job_career_area}")
+    if employment_type:
+        filters.append(f"type: {employment_type}")
+    return f"{query} ({', '.join(filters)})" if filters else query
+
+
+def parse_listing_html(page_html, page_url):
+    """
+    Parses the job rows of a search results page from its static HTML.
+
+    Args:
+        page_html (str): Raw HTML of the results page.
+        page_url (str): URL the page was fetched from, used to resolve
+            relative job links.
+
+    Returns:
+        list: (location, {"title": ..., "link": ...}) tuples, in page order.
+    """
+    soup = BeautifulSoup(page_html, HTML_PARSER, parse_only=_LISTING_STRAINER)
+    jobs = []
+    for job in soup.find_all(class_="job-listing"):
+        listing_data = job.find(class_="job-listing__link")
+        location_data = job.find(class_="job-listing__location")
+        if listing_data is None or location_data is None:
+            logging.error(f"Error during parsing job: incomplete row on {page_url}")
+            continue
+
+        link = listing_data.get("href")
+        title = listing_data.get_text(" ", strip=True)
+        location = location_data.get_text(" ", strip=True)
+        if not title or not link or not location:
+            logging.error(f"Missing or incomplete job data, on {page_url}")
+            continue
+
+        jobs.append((location, {"title": title, "link": urljoin(page_url, link)}))
+    return jobs
+
+
+def parse_result_count(text):
+    """
+    Args:
+        text (str): Text or HTML of a results page.
+
+    Returns:
+        int: Total number of results the page reports, or None when it
+        shows no count.
+    """
+    match = RESULT_COUNT_PATTERN.search(text)
+    return int(match.group(1).replace(",", "")) if match else None
+
+
+def search_result_count(payload):
+    """
+    Args:
+        payload (dict): Decoded search endpoint response.
+
+    Returns:
+        int: Total number of results, or None when the response has none.
+    """
+    if not isinstance(payload, dict):
+        return None
+    for key in ("total", "totalCount", "count"):
+        value = payload.get(key)
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    return None
+
+
+def last_page(total, per_page):
+    """
+    Args:
+        total (int): Total number of results.
+        per_page (int): Results on a full page.
+
+    Returns:
+        int: Number of the last page that lists results, 0 for none.
+    """
+    return -(-total // per_page) if per_page else 0
+
+
+def build_search_api_url(page_url, date_sort=False):
+    """
+    Maps a results page URL onto the search endpoint of the same host.
+
+    Args:
+        page_url (str): Listing page URL from build_listing_url.
+        date_sort (bool): Whether to sort results by post date instead of
+            relevance.
+
+    Returns:
+        str: The search endpoint URL for the same page.
+    """
+    url = urlsplit(page_url)
+    params = parse_qs(url.query, keep_blank_values=True)
+    params["sort"] = ["date" if date_sort else "rank"]
+    query = urlencode(params, doseq=True, safe=",")
+    return urlunsplit((url.scheme, url.netloc, SEARCH_API_PATH, query, ""))
+
+
+def parse_search_json(payload, page_url):
+    """
+    Reads the job rows of a search endpoint response, shaped as
+    {"jobs": [{"title": ..., "url": ..., "location": ..., <expanded
+    fields>}, ...]}. The fields named in the page's `expand` parameter
+    (e.g. department, brand, type, rate) are kept under the job's
+    "listing" key, and go into the job stream and database with it.
+
+    Args:
+        payload (dict): Decoded JSON response.
+        page_url (str): Listing page URL, used to resolve relative job
+            links and to read the `expand` parameter.
+
+    Returns:
+        list: (location, {"title": ..., "link": ..., "listing": {<expanded
+        fields>}}) tuples, in result order, or None when the payload has
+        another shape.
+    """
+    rows = payload.get("jobs") if isinstance(payload, dict) else None
+    if not isinstance(rows, list):
+        return None
+    expand = parse_qs(urlsplit(page_url).query).get("expand", [""])[0]
+    expanded = [field for field in expand.split(",") if field]
+
+    jobs = []
+    for row in rows:
+        title = row.get("title")
+        link = row.get("url")
+        location = row.get("location")
+        if not title or not link or not location:
+            logging.error(f"Missing or incomplete job data, on {page_url}")
+            continue
+        job = {"title": title, "link": urljoin(page_url, link)}
+        listing = {
+            field: row[field] for field in expanded if row.get(field) is not None
+        }
+        if listing:
+            job["listing"] = listing
+        jobs.append((location, job))
+    return jobs
+
+
+def listing_cache_key(page_url, date_sort=False):
+    """
+    Args:
+        page_url (str): Listing page URL from build_listing_url.
+        date_sort (bool): Whether the results are sorted by date.
+
+    Returns:
+        str: PageCache key of the page in that order. The browser and the
+        search endpoint store under the same key, since the URL alone does
+        not carry a sort the browser applies with a click.
+    """
+    return build_search_api_url(page_url, date_sort)
+
+
+def parse_cached_listing(body, page_url):
+    """
+    Reads the job rows of a cached listing page, stored either as search
+    endpoint JSON or as results page HTML.
+
+    Args:
+        body (str): Cached page body.
+        page_url (str): Listing page URL.
+
+    Returns:
+        tuple: (jobs, total) with (location, job) tuples and the reported
+        result count (None when not shown), or None when the body is
+        unreadable.
+    """
+    if body.lstrip().startswith("{"):
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return None
+        jobs = parse_search_json(payload, page_url)
+        if jobs is None:
+            return None
+        return jobs, search_result_count(payload)
+    return parse_listing_html(body, page_url), parse_result_count(body)
+
+
+class ApiListingFetcher:
+    """
+    Fetches listing pages from the careers site's JSON search endpoint
+    over plain HTTP, so listing pages need no browser and date sorting
+    happens on the server instead of through a click in the UI. When the
+    endpoint is missing or answers with anything but the expected JSON, the
+    fetcher turns itself off for the rest of the run and callers fall back
+    to the browser. Any other error status sends just that page to the
+    browser.
+    """
+
+    def __init__(self, timeout=10, pool_size=16, headers=None, page_cache=None):
+        """
+        Initializes the ApiListingFetcher instance.
+
+        Args:
+            timeout (int): Seconds to wait for a response.
+            pool_size (int): Connections kept alive per host and session.
+            headers (dict): Request headers, defaults to API_HEADERS.
+            page_cache (PageCache): Where usable responses are stored,
+                under listing_cache_key.
+        """
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.headers = headers if headers else API_HEADERS
+        self.page_cache = page_cache
+        self.available = True
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fallbacks = 0
+
+    @property
+    def session(self):
+        """requests.Session: The calling thread's pooled session."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = build_session(self.pool_size, self.headers)
+            self._local.session = session
+        return session
+
+    def fetch(self, page_url, date_sort=False, proxy_address=None):
+        """
+        Fetches the job rows of a listing page from the search endpoint.
+
+        Args:
+            page_url (str): Listing page URL from build_listing_url.
+            date_sort (bool): Whether to sort results by post date.
+            proxy_address (str): Proxy to route the request through.
+
+        Returns:
+            tuple: (jobs, total) with (location, job) tuples as returned by
+            parse_search_json and the reported result count (None when the
+            response has none), or None when the endpoint is unavailable or
+            answered with an error status and a browser is needed.
+
+        Raises:
+            requests.RequestException: On network errors, so the caller can
+                retry with another proxy.
+        """
+        if not self.available:
+            self._count(hit=False)
+            return None
+        proxies = None
+        if proxy_address:
+            proxies = {"http": proxy_address, "https": proxy_address}
+        api_url = build_search_api_url(page_url, date_sort)
+        res = self.session.get(api_url, proxies=proxies, timeout=self.timeout)
+        if res.status_code in (404, 405, 410):
+            return self._unavailable(f"HTTP {res.status_code}")
+        if not res.ok:
+            # Blocked, rate limited or failing: this page takes the
+            # browser, the next one tries the endpoint again
+            logging.info(
+                f"Search endpoint answered HTTP {res.status_code}, on {page_url}"
+            )
+            self._count(hit=False)
+            return None
+        try:
+            payload = res.json()
+        except ValueError:
+            payload = None
+        jobs = parse_search_json(payload, page_url)
+        if jobs is None:
+            return self._unavailable("unexpected response")
+        self._count(hit=True)
+        if self.page_cache and jobs:
+            self.page_cache.put(listing_cache_key(page_url, date_sort), res.text)
+        return jobs, search_result_count(payload)
+
+    def _unavailable(self, reason):
+        with self._lock:
+            was_available = self.available
+            self.available = False
+        if was_available:
+            logging.warning(
+                f"Search endpoint unusable ({reason}), listing pages use the "
+                f"browser from now on"
+            )
+        self._count(hit=False)
+        return None
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.fallbacks += 1
+
+    def stats(self):
+        """
+        Returns:
+            dict: Listing pages served by the endpoint and pages that needed
+            a browser.
+        """
+        with self._lock:
+            return {"api_hits": self.hits, "browser_fallbacks": self.fallbacks}
@@ -1,53 +1,365 @@
 import os
-import json
 import logging
+import argparse
 import requests
 
 from scrape import *
 from async_scraper import a_scrape
+from async_engine import aio_scrape
+from job_index import JobIndex, parse_job_id
+from job_db import JobDatabase
+from job_stream import JobStreamWriter, compact_stream
+from checkpoint import Checkpoint
+from page_cache import PageCache
+from driver_pool import DEFAULT_PROFILE, DriverProfile
+from proxy_check import DEFAULT_CHECK_URL, ProxyValidator
+from proxy_pool import ProxyPool
 
 
-# Configure logging to write to both a file and the console
-os.makedirs("logs", exist_ok=True)  # Ensure the logs directory exists
+def configure_logging():
+    """Logs INFO and above to logs/scraper.log and to the console."""
+    os.makedirs("logs", exist_ok=True)  # Ensure the logs directory exists
 
-# Create a file handler to write logs to a file
-file_handler = logging.FileHandler("logs/scraper.log", encoding="utf-8")
-file_handler.setLevel(logging.INFO)  # Log INFO and above to the file
+    # Create a file handler to write logs to a file
+    file_handler = logging.FileHandler("logs/scraper.log", encoding="utf-8")
+    file_handler.setLevel(logging.INFO)  # Log INFO and above to the file
 
-# Create a stream handler to display logs in the console
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO)  # Log INFO and above to the console
+    # Create a stream handler to display logs in the console
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.INFO)  # Log INFO and above to the console
 
-# Define a common log format
-formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-file_handler.setFormatter(formatter)
-console_handler.setFormatter(formatter)
+    # Define a common log format
+    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    file_handler.setFormatter(formatter)
+    console_handler.setFormatter(formatter)
 
-# Configure the root logger
-logging.basicConfig(
-    level=logging.INFO,  # Log INFO and above
-    handlers=[file_handler, console_handler],  # Add both handlers
-)
+    # Configure the root logger
+    logging.basicConfig(
+        level=logging.INFO,  # Log INFO and above
+        handlers=[file_handler, console_handler],  # Add both handlers
+    )
 
 
-def main():
+def main(
+    engine="threads",
+    full_refresh=False,
+    resume=False,
+    parse_workers=None,
+    live_metrics=0,
+    cache_ttl=6 * 3600,
+    queries=None,
+    lean_browser=False,
+    detail_tabs=0,
+    proxy_check_url=DEFAULT_CHECK_URL,
+    api_listings=False,
+    detail_workers=None,
+):
     """
     Main function to execute the scraping process.
     Fetches proxies, performs scraping, and saves the results.
+
+    Args:
+        engine (str): "threads" for the Selenium scrapers, "asyncio" for the
+            browserless asyncio engine.
+        full_refresh (bool): Fetch every job again instead of reusing
+            fresh postings from the job index.
+        resume (bool): Continue an interrupted run from its checkpoint,
+            skipping finished listing pages and jobs.
+        parse_workers (int): Processes that parse job descriptions,
+            defaults to the number of CPUs.
+        live_metrics (float): Seconds between live metrics summary lines,
+            0 turns them off.
+        cache_ttl (int): Seconds fetched pages are served from the page
+            cache, 0 turns the cache off.
+        queries (list): (query, job_career_area, employment_type) specs
+            scraped as one batch by the threads engine, defaults to QUERY
+            alone.
+        lean_browser (bool): Start browsers with the lean profile, which
+            blocks images, fonts, stylesheets and trackers.
+        detail_tabs (int): Tabs per browser for detail pages that need
+            JavaScript, 0 gives every worker its own browser.
+        proxy_check_url (str): URL every proxy is probed with before and
+            during the run, None hands the proxies over unchecked.
+        api_listings (bool): Read listing pages from the JSON search
+            endpoint, falling back to the browser when it fails.
+        detail_workers (int): Detail workers of the threads engine,
+            defaults to DETAIL_THREADS. Each may lease its own browser.
     """
+    # Upper bound per stage, the adaptive limiter finds the operating point.
+    # Every worker may lease a browser, so the two together bound how many
+    # Chrome instances run at once.
     THREADS = 8
+    DETAIL_THREADS = 8
+    CONCURRENCY = 500
+    # Ceiling per query, scraping stops at the last page of results
     PAGES = 160
     QUERY = "IT"
+    PROXY_STATS = "logs/proxy_stats.json"
+    METRICS = "logs/metrics.json"
+    DEAD_LETTERS = "logs/dead_letters.json"
+    JOB_INDEX = "data/seen_jobs.sqlite3"
+    JOB_STREAM = "data/walmart_jobs.ndjson"
+    JOB_DB = "data/walmart_jobs.sqlite3"
+    CHECKPOINT = "data/checkpoint.json"
+    PAGE_CACHE = "data/page_cache"
+    PAGE_CACHE_BYTES = 1 << 30
+    PROXY_CHECK_TIMEOUT = 5
+    PROXY_RECHECK = 600
+
+    if not queries:
+        queries = [(QUERY, "all", None)]
+    if engine == "asyncio" and len(queries) > 1:
+        raise ValueError("Batch runs with several queries need the threads engine")
+
+    os.makedirs("data", exist_ok=True)  # Ensure the data directory exists
+    os.makedirs("logs", exist_ok=True)  # Stats and dead letters go here
+    job_index = JobIndex(JOB_INDEX)
+    if full_refresh:
+        job_index.refresh_after = 0
+    # Jobs are appended to the stream as they finish, --resume picks a
+    # crashed run up from the leftover .part file and the checkpoint
+    job_writer = JobStreamWriter(JOB_STREAM, resume=resume)
+    # Downstream services query this instead of loading the JSON files
+    job_db = JobDatabase(JOB_DB)
+    # The engine is part of the run, a checkpoint of the other one is not
+    # resumed
+    params = {
+        "engine": engine,
+        "pages": PAGES,
+        "queries": [list(spec) for spec in queries],
+    }
+    if resume:
+        checkpoint = Checkpoint.load(CHECKPOINT, params)
+    else:
+        checkpoint = Checkpoint(CHECKPOINT, params)
+    # Saved right away, so the run's start time survives even an early crash
+    checkpoint.save()
+    # Pages fetched by a recent run, e.g. with another query, are read
+    # from disk instead of the network
+    page_cache = None
+    if cache_ttl:
+        page_cache = PageCache(PAGE_CACHE, cache_ttl, PAGE_CACHE_BYTES)
     proxies = get_proxies()
-    formatted_data, bad_data = a_scrape(PAGES, THREADS, proxies, QUERY)
+    validator = None
+    if proxy_check_url and proxies:
+        # Dead proxies are dropped before the scrapers see them, and every
+        # candidate is probed again while the run goes on
+        validator = ProxyValidator(proxy_check_url, PROXY_CHECK_TIMEOUT)
+        pool = ProxyPool([])
+        if validator.refresh(pool, proxies):
+            validator.watch(pool, proxies, PROXY_RECHECK)
+            proxies = pool
+        else:
+            logging.warning("No proxy passed the check, using them unchecked")
+            validator = None
+    job_queries = None
+    try:
+        if engine == "asyncio":
+            query, job_career_area, employment_type = queries[0]
+            aio_scrape(
+                PAGES,
+                CONCURRENCY,
+                proxies,
+                query,
+                job_career_area=job_career_area,
+                employment_type=employment_type,
+                proxy_stats_path=PROXY_STATS,
+                job_index=job_index,
+                job_writer=job_writer,
+                checkpoint=checkpoint,
+                parse_workers=parse_workers,
+                metrics_path=METRICS,
+                live_metrics=live_metrics,
+                page_cache=page_cache,
+                job_db=job_db,
+            )
+        else:
+            store = a_scrape(
+                PAGES,
+                THREADS,
+                proxies,
+                queries=queries,
+                browser_profile=(
+                    DriverProfile.lean() if lean_browser else DEFAULT_PROFILE
+                ),
+                detail_scrapers=detail_workers or DETAIL_THREADS,
+                detail_tabs=detail_tabs,
+                api_listings=api_listings,
+                proxy_stats_path=PROXY_STATS,
+                job_index=job_index,
+                job_writer=job_writer,
+                checkpoint=checkpoint,
+                parse_workers=parse_workers,
+                metrics_path=METRICS,
+                live_metrics=live_metrics,
+                dead_letter_path=DEAD_LETTERS,
+                page_cache=page_cache,
+                job_db=job_db,
+            )
+            # Jobs are streamed before every query has listed them, the
+            # store holds the final tags
+            job_queries = store.queries
+            if job_queries:
+                job_db.tag_queries(job_queries)
+        # Counted from the start of the first attempt, so jobs a crashed run
+        # already streamed stay in the delta after --resume
+        delta_ids = job_index.delta_ids(checkpoint.started)
+    except BaseException:
+        checkpoint.save()
+        logging.error("Run interrupted, resume with --resume")
+        raise
+    finally:
+        if validator:
+            validator.stop()
+            logging.info(f"Proxy check stats: {validator.stats()}")
+        job_index.close()
+        job_db.flush()
+        if page_cache:
+            page_cache.close()
+    job_writer.close()
+    checkpoint.clear()
+    if resume:
+        # The last batch of the crashed run may not have reached the
+        # database, and its jobs were not scraped again
+        job_db.import_stream(JOB_STREAM)
+    job_db.close()
 
-    formatted_count = sum(len(jobs) for jobs in formatted_data.values())
-    bad_count = sum(len(jobs) for jobs in bad_data.values())
+    formatted_count, bad_count = compact_stream(
+        JOB_STREAM,
+        "data/walmart_jobs_formatted.json",
+        "data/walmart_jobs_bad.json",
+        queries=job_queries,
+    )
     logging.info(f"Total jobs in formatted_data: {formatted_count}")
     logging.info(f"Total jobs in bad_data: {bad_count}")
 
-    save(formatted_data, bad_data)
+    delta_count = sum(
+        compact_stream(
+            JOB_STREAM,
+            "data/walmart_jobs_formatted_delta.json",
+            "data/walmart_jobs_bad_delta.json",
+            keep=lambda record: parse_job_id(record["jobLink"]) in delta_ids,
+            queries=job_queries,
+        )
+    )
+    logging.info(f"New or changed jobs: {delta_count}")
+
+
+def parse_args():
+    """
+    Parses command line options.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Scrape Walmart careers.")
+    parser.add_argument(
+        "--engine",
+        choices=["threads", "asyncio"],
+        default="threads",
+        help="Scraping engine to use (default: threads).",
+    )
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="Fetch every job again instead of reusing indexed postings.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run, skipping finished pages and jobs.",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Processes that parse job descriptions (default: CPU count, "
+        "0 parses in the scraper threads).",
+    )
+    parser.add_argument(
+        "--live-metrics",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        help="Log a metrics summary line every SECONDS (default: off).",
+    )
+    parser.add_argument(
+        "--query",
+        action="append",
+        dest="queries",
+        type=parse_query_spec,
+        metavar="QUERY[:AREA[:TYPE]]",
+        help="Search to scrape, optionally with a job career area and "
+        "employment type. Repeat to scrape several searches as one batch "
+        "that fetches shared jobs once (default: IT).",
+    )
+    parser.add_argument(
+        "--lean-browser",
+        action="store_true",
+        help="Block images, fonts, CSS and trackers in the browsers and stop "
+        "waiting for full page loads.",
+    )
+    parser.add_argument(
+        "--detail-workers",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Detail workers of the threads engine, each may run its own "
+        "browser (default: 8).",
+    )
+    parser.add_argument(
+        "--detail-tabs",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Load detail pages that need the browser N at a time in the "
+        "tabs of one browser (default: 0, one browser per worker).",
+    )
+    parser.add_argument(
+        "--api-listings",
+        action="store_true",
+        help="Read listing pages from the JSON search endpoint, falling back "
+        "to the browser when it fails (threads engine).",
+    )
+    parser.add_argument(
+        "--proxy-check-url",
+        default=DEFAULT_CHECK_URL,
+        metavar="URL",
+        help="URL the proxies are probed with before and during the run "
+        f"(default: {DEFAULT_CHECK_URL}).",
+    )
+    parser.add_argument(
+        "--no-proxy-check",
+        action="store_true",
+        help="Hand the fetched proxies to the scrapers unchecked.",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=int,
+        default=6 * 3600,
+        metavar="SECONDS",
+        help="Serve pages fetched within SECONDS from the page cache "
+        "(default: 6 hours, 0 turns the cache off).",
+    )
+    return parser.parse_args()
+
+
+def parse_query_spec(value):
+    """
+    Parses a --query value such as "IT", "IT:technology" or
+    "Data:all:FULL_TIME".
+
+    Args:
+        value (str): The option value.
 
+    Returns:
+        tuple: (query, job_career_area, employment_type).
+    """
+    query, _, rest = value.partition(":")
+    job_career_area, _, employment_type = rest.partition(":")
+    if not query:
+        raise argparse.ArgumentTypeError(f"Missing query in {value!r}")
+    return query, job_career_area or "all", employment_type or None
 
 
 def get_proxies():
@@ -77,63 +389,20 @@ def get_proxies():
         return []
 
 
-def save(formatted_data, bad_data):
-    """
-    Saves formatted and bad (no address) data to separate JSON files, in 
-    Unibui's JSON format.
-
-    Args:
-        formatted_data (list): List of jobs with valid addresses.
-        bad_data (list): List of jobs using location instead of addresses.
-    """
-    os.makedirs("data", exist_ok=True)  # Ensure the data directory exists
-
-    # Transform formatted data into the desired structure
-    formatted_output = [
-        {
-            "address": address,
-            "jobs": [
-                {
-                    "jobLink": job.get("job_link"),
-                    "title": job.get("title"),
-                    "description": job.get("description"),
-                    "hourlyRate": job.get("hourly_rate"),
-                    "salary": job.get("salary"),
-                    "types": job.get("types"),
-                }
-                for job in jobs
-            ],
-        }
-        for address, jobs in formatted_data.items()
-    ]
-
-    # Save formatted data to a JSON file
-    with open("data/walmart_jobs_formatted.json", "w", encoding="utf-8") as file:
-        json.dump(formatted_output, file, ensure_ascii=False, indent=4)
-
-    # Transform bad data into the desired structure
-    bad_output = [
-        {
-            "location": location,
-            "jobs": [
-                {
-                    "jobLink": job.get("job_link"),
-                    "title": job.get("title"),
-                    "description": job.get("description"),
-                    "hourlyRate": job.get("hourly_rate"),
-                    "salary": job.get("salary"),
-                    "types": job.get("types"),
-                }
-                for job in jobs
-            ],
-        }
-        for location, jobs in bad_data.items()
-    ]
-
-    # Save bad data to a separate JSON file
-    with open("data/walmart_jobs_bad.json", "w", encoding="utf-8") as file:
-        json.dump(bad_output, file, ensure_ascii=False, indent=4)
-
-
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    configure_logging()
+    main(
+        args.engine,
+        args.full_refresh,
+        args.resume,
+        args.parse_workers,
+        args.live_metrics,
+        args.cache_ttl,
+        args.queries,
+        args.lean_browser,
+        args.detail_tabs,
+        None if args.no_proxy_check else args.proxy_check_url,
+        args.api_listings,
+        args.detail_workers,
+    )
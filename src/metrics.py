@@ -0,0 +1,301 @@
+import os
+import json
+import time
+import logging
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+
+# Upper bounds, in seconds, of the latency histogram buckets. The last
+# bucket (+Inf) is implicit.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+PROMETHEUS_PREFIX = "jobscp_"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram, in the Prometheus layout."""
+
+    __slots__ = ("counts", "count", "sum", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.count += other.count
+        self.sum += other.sum
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """
+        Returns:
+            float: Upper bound of the bucket holding the q-quantile (the
+            observed max for the last bucket), or None when empty.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": dict(zip([str(le) for le in BUCKETS] + ["+Inf"], self.counts)),
+        }
+
+
+class Metrics:
+    """
+    Thread-safe registry of labelled counters and latency histograms.
+    Stages are timed with `time(stage, **labels)` and recorded in the
+    `stage_seconds` histogram, failures raised inside it are counted in
+    `stage_errors`. Labels such as proxy and worker keep separate series,
+    and summaries merge every series of a name. At the end of a run the
+    registry is dumped as JSON and Prometheus text, and a live summary
+    line can be logged while it runs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._live = None
+        self.started = time.monotonic()
+
+    @staticmethod
+    def _key(name, labels):
+        pairs = [(key, str(value)) for key, value in labels.items() if value is not None]
+        return name, tuple(sorted(pairs))
+
+    def count(self, name, value=1, **labels):
+        """
+        Adds to a counter.
+
+        Args:
+            name (str): Counter name, e.g. "jobs".
+            value (int): Amount to add.
+            **labels: Series labels, e.g. worker="listing-0". None values
+                are left out.
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        """
+        Records a latency in a histogram.
+
+        Args:
+            name (str): Histogram name, e.g. "stage_seconds".
+            seconds (float): Observed latency.
+            **labels: Series labels. None values are left out.
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, stage, **labels):
+        """
+        Times the enclosed block as one run of `stage`.
+
+        Args:
+            stage (str): Stage name, e.g. "page_load".
+            **labels: Extra series labels, e.g. proxy or worker.
+        """
+        started = time.monotonic()
+        try:
+            yield
+        except BaseException:
+            self.count("stage_errors", stage=stage, **labels)
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            self.observe("stage_seconds", elapsed, stage=stage, **labels)
+
+    def total(self, name, **labels):
+        """
+        Returns:
+            int: Sum of every series of a counter that carries the given
+            labels.
+        """
+        wanted = set(self._key(name, labels)[1])
+        with self._lock:
+            return sum(
+                value
+                for (key_name, key_labels), value in self._counters.items()
+                if key_name == name and wanted <= set(key_labels)
+            )
+
+    def histogram(self, name, **labels):
+        """
+        Returns:
+            Histogram: Every series of a histogram that carries the given
+            labels, merged.
+        """
+        wanted = set(self._key(name, labels)[1])
+        merged = Histogram()
+        with self._lock:
+            for (key_name, key_labels), histogram in self._histograms.items():
+                if key_name == name and wanted <= set(key_labels):
+                    merged.merge(histogram)
+        return merged
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: Uptime, every counter and every histogram with its labels.
+        """
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {"name": name, "labels": dict(labels), **histogram.to_dict()}
+                for (name, labels), histogram in sorted(self._histograms.items())
+            ]
+        return {
+            "uptime": round(time.monotonic() - self.started, 3),
+            "counters": counters,
+            "histograms": histograms,
+        }
+
+    def to_prometheus(self):
+        """
+        Returns:
+            str: Every metric in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+        for counter in snapshot["counters"]:
+            name = PROMETHEUS_PREFIX + counter["name"] + "_total"
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_labels(counter['labels'])} {counter['value']}")
+        for histogram in snapshot["histograms"]:
+            name = PROMETHEUS_PREFIX + histogram["name"]
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for le, count in histogram["buckets"].items():
+                cumulative += count
+                labels = _labels({**histogram["labels"], "le": le})
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+            labels = _labels(histogram["labels"])
+            lines.append(f"{name}_sum{labels} {histogram['sum']}")
+            lines.append(f"{name}_count{labels} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """
+        Writes the metrics as JSON to `path` and as Prometheus text next to
+        it, with a `.prom` extension.
+
+        Args:
+            path (str): JSON output path.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.snapshot(), file, indent=4)
+        prom_path = os.path.splitext(path)[0] + ".prom"
+        with open(prom_path, "w", encoding="utf-8") as file:
+            file.write(self.to_prometheus())
+        logging.info(f"Metrics written to {path} and {prom_path}")
+
+    def summary(self):
+        """
+        Returns:
+            str: One line with progress, throughput and the slowest stages.
+        """
+        elapsed = time.monotonic() - self.started
+        jobs = self.total("jobs", outcome="ok")
+        parts = [
+            f"{self.total('pages')} pages",
+            f"{jobs} jobs ({jobs / elapsed if elapsed else 0:.1f}/s)",
+            f"{self.total('attempts', outcome='failed')} retries",
+        ]
+        browser_pages = self.total("browser_pages")
+        if browser_pages:
+            kilobytes = self.total("page_bytes") / browser_pages / 1024
+            parts.append(f"{kilobytes:.0f} KB/browser page")
+        cache_hits = self.total("page_cache_hits")
+        cache_misses = self.total("page_cache_misses")
+        if cache_hits or cache_misses:
+            parts.append(f"cache {cache_hits} hits / {cache_misses} misses")
+        for stage in ("page_load", "http_fetch", "fetch", "parse"):
+            histogram = self.histogram("stage_seconds", stage=stage)
+            if histogram.count:
+                parts.append(
+                    f"{stage} p50 {histogram.quantile(0.5) * 1000:.0f}ms "
+                    f"p95 {histogram.quantile(0.95) * 1000:.0f}ms"
+                )
+        return ", ".join(parts)
+
+    def start_live(self, interval):
+        """
+        Logs the summary line every `interval` seconds until stop_live.
+
+        Args:
+            interval (float): Seconds between summary lines.
+        """
+        stop = threading.Event()
+
+        def report():
+            while not stop.wait(interval):
+                logging.info(f"Metrics: {self.summary()}")
+
+        self._live = stop
+        threading.Thread(target=report, daemon=True).start()
+
+    def stop_live(self):
+        """Stops the live summary, if running."""
+        if self._live:
+            self._live.set()
+            self._live = None
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{key}="{_escape(str(value))}"' for key, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
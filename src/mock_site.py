@@ -0,0 +1,399 @@
+import html
+import json
+import random
+import socket
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+# Hostname the mock site is published under. It is not loopback, so Chrome
+# routes it through the configured proxy instead of bypassing it, and the
+# mock proxies answer for it themselves. Nothing ever resolves it via DNS.
+MOCK_HOST = "careers.mock"
+
+_CITIES = [
+    ("Bentonville", "AR", "72712", "702 SW 8th St"),
+    ("Sunnyvale", "CA", "94086", "680 W California Ave"),
+    ("Hoboken", "NJ", "07030", "221 River St"),
+    ("Dallas", "TX", "75201", "2301 N Field St"),
+    ("Reston", "VA", "20190", "12020 Sunrise Valley Dr"),
+]
+_TITLES = [
+    "Software Engineer III",
+    "Senior Data Engineer",
+    "Staff Site Reliability Engineer",
+    "IT Support Technician",
+    "Network Engineer II",
+]
+_TYPES = ["Full Time", "Part Time", "Regular/Permanent", "Full &amp; Part Time"]
+
+
+class MockSiteConfig:
+    """Shape and failure behaviour of the mock careers site."""
+
+    def __init__(
+        self,
+        pages=10,
+        jobs_per_page=25,
+        latency=0.05,
+        jitter=0.5,
+        error_rate=0.0,
+        search_api=True,
+        seed=0,
+    ):
+        """
+        Initializes the MockSiteConfig instance.
+
+        Args:
+            pages (int): Number of results pages that list jobs. Later pages
+                show a no-results notice, like the real site past the last
+                result.
+            jobs_per_page (int): Job rows on every results page.
+            latency (float): Mean seconds the site takes to answer.
+            jitter (float): Relative spread of the latency, 0.5 gives
+                +/- 50%.
+            error_rate (float): Probability of answering with a 503.
+            search_api (bool): Whether to serve the JSON search endpoint,
+                without it listing pages need a browser.
+            seed (int): Seed for the injected latency and errors.
+        """
+        self.pages = pages
+        self.jobs_per_page = jobs_per_page
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.search_api = search_api
+        self.seed = seed
+
+
+class MockCareersSite:
+    """
+    Local stand-in for careers.walmart.com. It serves `/results?page=N`
+    listing pages, the same rows as JSON from `/api/search?page=N`, and
+    `/us/jobs/<id>` detail pages whose markup matches the selectors used by
+    Scraper and the HTTP fetchers, so the whole pipeline can be driven
+    without network access. `/health` answers proxy checks.
+
+    The site is reached through mock proxies started with `start_proxy`:
+    each one is an HTTP proxy that answers requests for MOCK_HOST itself
+    and can be told to drop a share of its connections. Dead proxies that
+    refuse every connection come from `dead_proxy`. Every request is
+    recorded so page latency and retries can be reported afterwards.
+    """
+
+    def __init__(self, config=None):
+        """
+        Initializes the MockCareersSite instance.
+
+        Args:
+            config (MockSiteConfig): Site behaviour, defaults to a fast
+                site without errors.
+        """
+        self.config = config if config else MockSiteConfig()
+        self.base_url = f"http://{MOCK_HOST}/results"
+        self.check_url = f"http://{MOCK_HOST}/health"
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._servers = []
+        self._attempts = defaultdict(list)
+
+    def start_proxy(self, drop_rate=0.0):
+        """
+        Starts a mock proxy that serves the site.
+
+        Args:
+            drop_rate (float): Probability of closing a connection without
+                answering, like a flaky public proxy.
+
+        Returns:
+            str: Proxy address in the format http://127.0.0.1:port.
+        """
+        site = self
+
+        class Handler(_MockHandler):
+            pass
+
+        Handler.site = site
+        Handler.drop_rate = drop_rate
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        with self._lock:
+            self._servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    @staticmethod
+    def dead_proxy():
+        """
+        Returns:
+            str: Address of a local port nothing listens on, so every
+            connection through it is refused.
+        """
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    def close(self):
+        """Stops every mock proxy."""
+        with self._lock:
+            servers = self._servers
+            self._servers = []
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+    def job_id(self, index):
+        """
+        Returns:
+            str: Requisition ID of the job at the given global index.
+        """
+        return f"WD{1000000 + index}"
+
+    def job_link(self, index):
+        """
+        Returns:
+            str: Absolute URL of the job at the given global index.
+        """
+        slug = _TITLES[index % len(_TITLES)].lower().replace(" ", "-")
+        return f"http://{MOCK_HOST}/us/jobs/{self.job_id(index)}-{slug}"
+
+    def total_jobs(self):
+        """
+        Returns:
+            int: Number of jobs listed across all results pages.
+        """
+        return self.config.pages * self.config.jobs_per_page
+
+    def page_stats(self):
+        """
+        Summarizes the recorded requests per URL. A URL's latency runs from
+        its first attempt to the end of its first successful answer, so it
+        includes every retry and backoff the scraper needed.
+
+        Returns:
+            dict: For "listing" and "detail": the sorted per-URL latencies
+            of URLs that were eventually served, plus the total number of
+            retries (attempts beyond the first).
+        """
+        stats = {
+            kind: {"latencies": [], "retries": 0, "failed": 0}
+            for kind in ("listing", "detail")
+        }
+        with self._lock:
+            attempts = {key: list(value) for key, value in self._attempts.items()}
+        for (kind, _), records in attempts.items():
+            records.sort()
+            stats[kind]["retries"] += len(records) - 1
+            first_start = records[0][0]
+            served = [end for _, end, ok in records if ok]
+            if served:
+                stats[kind]["latencies"].append(min(served) - first_start)
+            else:
+                stats[kind]["failed"] += 1
+        for kind_stats in stats.values():
+            kind_stats["latencies"].sort()
+        return stats
+
+    def record(self, kind, url, started, ok):
+        """Records one attempt at a listing or detail URL."""
+        with self._lock:
+            self._attempts[(kind, url)].append((started, time.monotonic(), ok))
+
+    def delay(self):
+        """Sleeps for the configured latency and returns whether to fail."""
+        config = self.config
+        with self._lock:
+            spread = self._random.uniform(-config.jitter, config.jitter)
+            failed = self._random.random() < config.error_rate
+        time.sleep(max(0.0, config.latency * (1 + spread)))
+        return failed
+
+    def should_drop(self, drop_rate):
+        """
+        Returns:
+            bool: Whether a proxy with `drop_rate` drops this connection.
+        """
+        if not drop_rate:
+            return False
+        with self._lock:
+            return self._random.random() < drop_rate
+
+    def render_listing(self, page):
+        """
+        Returns:
+            str: HTML of a results page.
+        """
+        config = self.config
+        rows = []
+        if 1 <= page <= config.pages:
+            first = (page - 1) * config.jobs_per_page
+            count = (
+                f'<p class="search-results__count">Showing {first + 1}-'
+                f"{first + config.jobs_per_page} of {self.total_jobs():,} jobs</p>"
+            )
+            for index in range(first, first + config.jobs_per_page):
+                city, state, _, _ = _CITIES[index % len(_CITIES)]
+                title = html.escape(_TITLES[index % len(_TITLES)])
+                rows.append(
+                    '<li class="search-result job-listing">'
+                    f'<a class="job-listing__link" href="{self.job_link(index)}">'
+                    f"{title}</a>"
+                    f'<span class="job-listing__location">{city}, {state}</span>'
+                    "</li>"
+                )
+        else:
+            count = '<p class="search-results__no-results">No results found</p>'
+        return (
+            "<!DOCTYPE html><html><head><title>Search results</title></head>"
+            "<body>"
+            '<label class="search__sort__option__label" title="Job Post Date">'
+            "Date</label>"
+            f"{count}"
+            f'<ul class="search-result-list">{"".join(rows)}</ul>'
+            "</body></html>"
+        )
+
+    def render_search(self, page, expand, sort):
+        """
+        Returns:
+            str: JSON body of the search endpoint for a results page, with
+            the fields named in `expand` on every row, or None when the
+            endpoint is turned off. Rows sorted by "date" come newest first.
+        """
+        config = self.config
+        if not config.search_api:
+            return None
+        rows = []
+        if 1 <= page <= config.pages:
+            first = (page - 1) * config.jobs_per_page
+            for index in range(first, first + config.jobs_per_page):
+                city, state, _, _ = _CITIES[index % len(_CITIES)]
+                row = {
+                    "title": _TITLES[index % len(_TITLES)],
+                    "url": self.job_link(index),
+                    "location": f"{city}, {state}",
+                }
+                fields = {
+                    "department": "Information Technology",
+                    "brand": "Walmart",
+                    "type": html.unescape(_TYPES[index % len(_TYPES)]),
+                    "rate": "Hourly" if index % 2 else "Salary",
+                }
+                for field in expand:
+                    if field in fields:
+                        row[field] = fields[field]
+                rows.append(row)
+        if sort == "date":
+            rows.reverse()
+        return json.dumps({"page": page, "total": self.total_jobs(), "jobs": rows})
+
+    def render_detail(self, index):
+        """
+        Returns:
+            str: HTML of a job details page, or None for unknown jobs.
+        """
+        if not 0 <= index < self.total_jobs():
+            return None
+        city, state, zip_code, street = _CITIES[index % len(_CITIES)]
+        employment_type = _TYPES[index % len(_TYPES)]
+        if index % 2:
+            low, high = 18 + index % 10, 30 + index % 10
+            pay = (
+                f"The hourly wage range for this position is "
+                f"${low}.00 to ${high}.00"
+            )
+        else:
+            low, high = 90 + index % 40, 150 + index % 40
+            pay = (
+                f"The annual salary range for this position is "
+                f"${low},000.00-${high},000.00"
+            )
+        return (
+            "<!DOCTYPE html><html><head><title>Job</title></head><body>"
+            '<div class="job-data">'
+            '<div class="job-data__element">'
+            '<span class="job-data__title">Location</span>'
+            f'<span class="job-data__value">{city}, {state}</span></div>'
+            '<div class="job-data__element">'
+            '<span class="job-data__title">Employment Type</span>'
+            f'<span class="job-data__value">{employment_type}</span></div>'
+            "</div>"
+            '<div class="job-description">'
+            f"<p>{html.escape(_TITLES[index % len(_TITLES)])} on the IT team.</p>"
+            f"<p>{pay}</p>"
+            "<p>Primary Location...</p>"
+            f"<p>{street}, {city}, {state} {zip_code}, United States of America</p>"
+            "</div></body></html>"
+        )
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    site = None
+    drop_rate = 0.0
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        started = time.monotonic()
+        url = urlsplit(self.path)
+        if url.hostname not in (None, MOCK_HOST):
+            self._send(502, "Mock proxy only serves " + MOCK_HOST)
+            return
+
+        if url.path == "/health":
+            # Proxy checks, not part of the measured work
+            self._send(200, "ok", "text/plain")
+            return
+        if url.path == "/results":
+            kind = "listing"
+            page = int(parse_qs(url.query).get("page", ["1"])[0])
+            render = lambda: self.site.render_listing(page)  # noqa: E731
+        elif url.path == "/api/search":
+            # Counted as a listing fetch, it is the same page as JSON
+            kind = "listing"
+            params = parse_qs(url.query)
+            page = int(params.get("page", ["1"])[0])
+            expand = params.get("expand", [""])[0].split(",")
+            sort = params.get("sort", ["rank"])[0]
+            render = lambda: self.site.render_search(page, expand, sort)  # noqa: E731
+        elif url.path.startswith("/us/jobs/WD"):
+            kind = "detail"
+            index = int(url.path.split("/")[3][2:].split("-")[0]) - 1000000
+            render = lambda: self.site.render_detail(index)  # noqa: E731
+        else:
+            # favicon and the like, not part of the measured work
+            self._send(404, "Not found")
+            return
+
+        key = url.path + ("?" + url.query if url.query else "")
+        if self.site.should_drop(self.drop_rate):
+            self.site.record(kind, key, started, False)
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+
+        failed = self.site.delay()
+        body = None if failed else render()
+        if failed:
+            self._send(503, "Service unavailable")
+        elif body is None:
+            self._send(404, "Not found")
+        elif kind == "listing" and url.path == "/api/search":
+            self._send(200, body, "application/json")
+        else:
+            self._send(200, body)
+        self.site.record(kind, key, started, body is not None)
+
+    def _send(self, status, body, content_type="text/html"):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,187 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+
+class PageCache:
+    """
+    On-disk cache of fetched pages, keyed by URL. Bodies are stored once per
+    content hash under `directory`, so URLs that serve the same page share a
+    file, and a SQLite index maps every URL to its body, fetch time and last
+    use. Entries older than `ttl` seconds are misses, and the least recently
+    used entries are evicted once the bodies take more than `max_bytes`.
+    The Selenium, HTTP and asyncio fetch paths share one cache, so a page
+    fetched by any of them is served to all of them.
+    """
+
+    def __init__(self, directory, ttl=6 * 3600, max_bytes=1 << 30):
+        """
+        Initializes the PageCache instance, creating the directory and
+        index if needed.
+
+        Args:
+            directory (str): Directory holding the index and the bodies.
+            ttl (int): Seconds a page stays fresh.
+            max_bytes (int): Upper bound on the stored bodies' size.
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(directory, "index.sqlite3"), check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used)"
+        )
+        self._conn.commit()
+        self.total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM "
+            "(SELECT DISTINCT content_hash, size FROM pages)"
+        ).fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _path(self, content_hash):
+        return os.path.join(self.directory, content_hash[:2], content_hash)
+
+    def get(self, url):
+        """
+        Args:
+            url (str): Page URL, or another key the page was stored under.
+
+        Returns:
+            str: The cached body, or None when the page is missing or older
+            than the TTL.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, fetched FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            body = None
+            if row is not None and now - row[1] < self.ttl:
+                try:
+                    with open(self._path(row[0]), "rb") as file:
+                        body = file.read().decode("utf-8")
+                except OSError:
+                    logging.warning(f"Cached body of {url} is missing")
+            if body is None:
+                if row is not None:
+                    self._remove(url, row[0])
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE pages SET last_used = ? WHERE url = ?", (now, url)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return body
+
+    def put(self, url, body):
+        """
+        Stores a page, replacing any older copy of the URL, and evicts the
+        least recently used pages if the cache grew past `max_bytes`.
+
+        Args:
+            url (str): Page URL, or another key to store the page under.
+            body (str): Page body.
+        """
+        data = body.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        now = time.time()
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Written aside and renamed, so readers never see a partial
+                # body
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as file:
+                    file.write(data)
+                os.replace(tmp_path, path)
+                self.total_bytes += len(data)
+            row = self._conn.execute(
+                "SELECT content_hash FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is not None and row[0] != digest:
+                self._remove(url, row[0])
+            self._conn.execute(
+                """
+                INSERT INTO pages (url, content_hash, size, fetched, last_used)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    content_hash = excluded.content_hash,
+                    size = excluded.size,
+                    fetched = excluded.fetched,
+                    last_used = excluded.last_used
+                """,
+                (url, digest, len(data), now, now),
+            )
+            self.stores += 1
+            self._evict()
+            self._conn.commit()
+
+    def _remove(self, url, content_hash):
+        """Drops an entry, and its body once no other URL shares it."""
+        self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+        shared = self._conn.execute(
+            "SELECT 1 FROM pages WHERE content_hash = ? LIMIT 1", (content_hash,)
+        ).fetchone()
+        if shared is None:
+            path = self._path(content_hash)
+            try:
+                self.total_bytes -= os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes:
+            row = self._conn.execute(
+                "SELECT url, content_hash FROM pages ORDER BY last_used LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._remove(*row)
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Returns:
+            dict: Hits, misses, stores and evictions in this run, and the
+            bytes currently stored.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "bytes": self.total_bytes,
+            }
+
+    def close(self):
+        """Logs the run's counts and closes the index."""
+        logging.info(f"Page cache stats: {self.stats()}")
+        with self._lock:
+            self._conn.close()
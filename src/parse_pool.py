@@ -0,0 +1,112 @@
+import os
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from metrics import Metrics
+from parsing import build_job_details
+
+
+class ParsePool:
+    """
+    Runs the CPU-bound part of job parsing (pyap address matching, salary
+    and hourly rate scan, employment type cleanup) in worker processes, so
+    it neither holds the GIL against the fetching threads nor competes with
+    the event loop. Fetchers only extract the raw fields and description
+    and hand them over. With `workers=0` everything is parsed inline.
+    """
+
+    def __init__(self, workers=None, metrics=None):
+        """
+        Initializes the ParsePool instance.
+
+        Args:
+            workers (int): Number of parser processes. Defaults to the
+                number of CPUs, 0 parses in the calling thread.
+            metrics (Metrics): Registry the "parse" stage is timed in,
+                including the hand-off to the worker process.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+        self.metrics = metrics if metrics else Metrics()
+        self._lock = threading.Lock()
+        self._executor = None
+        if workers > 0:
+            # Forking while scraper threads hold locks can deadlock the
+            # child, so workers are always spawned fresh
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logging.info(f"Started parse pool with {workers} processes")
+
+    def build_job_details(self, fields, description, country_):
+        """
+        Parses a job in a worker process, see parsing.build_job_details.
+
+        Args:
+            fields (list): (title, value) innerHTML pairs from the
+                job-data__element blocks.
+            description (str): Visible text of the job-description element.
+            country_ (str): Country code for parsing addresses (e.g., 'US').
+
+        Returns:
+            dict: The job details.
+        """
+        with self.metrics.time("parse"):
+            executor = self._executor
+            if executor is None:
+                return build_job_details(fields, description, country_)
+            try:
+                future = executor.submit(
+                    build_job_details, fields, description, country_
+                )
+                return future.result()
+            except BrokenProcessPool as e:
+                self._broken(executor, e)
+                return build_job_details(fields, description, country_)
+
+    async def build_job_details_async(self, fields, description, country_):
+        """
+        Awaitable version of build_job_details for the asyncio engine.
+
+        Returns:
+            dict: The job details.
+        """
+        with self.metrics.time("parse"):
+            executor = self._executor
+            if executor is None:
+                return await asyncio.to_thread(
+                    build_job_details, fields, description, country_
+                )
+            try:
+                future = executor.submit(
+                    build_job_details, fields, description, country_
+                )
+                return await asyncio.wrap_future(future)
+            except BrokenProcessPool as e:
+                self._broken(executor, e)
+                return await asyncio.to_thread(
+                    build_job_details, fields, description, country_
+                )
+
+    def close(self):
+        """Shuts the worker processes down."""
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _broken(self, executor, error):
+        # A crashed worker breaks the whole executor, finish the run inline
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        logging.error(f"Parse pool failed, parsing inline from now on: {error}")
+        executor.shutdown(wait=False, cancel_futures=True)
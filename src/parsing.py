@@ -0,0 +1,132 @@
+import re
+import html
+
+from addresses import find_addresses, normalize_address
+
+
+def parse_employment_type(value):
+    """
+    Normalizes the raw "Employment Type" value from a job page.
+
+    Args:
+        value (str): innerHTML of the job-data__value element.
+
+    Returns:
+        list: Employment types, e.g. ["Full Time"].
+    """
+    employment_type = []
+    raw_types = html.unescape(value).split("&")
+    for raw in raw_types:
+        cleaned = raw.strip()
+        if cleaned == "Regular/Permanent":
+            cleaned = "Full Time"
+        if cleaned == "Full":
+            cleaned = "Full Time"
+        employment_type.append(cleaned)
+    return employment_type
+
+
+AMOUNT_PATTERN = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def parse_pay_range(value):
+    """
+    Reads the bounds of a salary or hourly rate as extracted from a
+    description, e.g. "16.00 to $23.00*" or "80,000.00-$155,000.00".
+
+    Args:
+        value (str): The extracted range, or None.
+
+    Returns:
+        tuple: (low, high) as floats, the same value twice for a single
+        amount, or (None, None) when there is none.
+    """
+    if not value:
+        return None, None
+    # Footnotes after the asterisk quote other amounts, e.g. premiums
+    amounts = [
+        float(amount.replace(",", ""))
+        for amount in AMOUNT_PATTERN.findall(value.split("*", 1)[0])[:2]
+    ]
+    if not amounts:
+        return None, None
+    return min(amounts), max(amounts)
+
+
+def parse_description(description, country_):
+    """
+    Extracts salary, hourly rate and addresses from a job description.
+
+    Args:
+        description (str): Visible text of the job-description element.
+        country_ (str): Country code for parsing addresses (e.g., 'US').
+
+    Returns:
+        tuple: A tuple containing:
+            - salary (str): Annual salary range, or None.
+            - hourly_rate (str): Hourly wage range, or None.
+            - address (list): Canonical addresses found in the
+              description, see addresses.normalize_address.
+    """
+    salary = None
+    hourly_rate = None
+    address = []
+    # Canonical forms, so spelling variants of one address are kept once
+    for addr in find_addresses(description, country_):
+        canonical = normalize_address(addr)
+        if canonical not in address:
+            address.append(canonical)
+    # Extract salary or hourly rate
+    lines = description.splitlines()
+    for i, text in enumerate(lines):
+        # Check for salary information
+        if "$" in text and "annual salary range" in text:
+            salary = text.split("$", 1)[1].strip()
+        elif "$" in text and "hourly wage range" in text:
+            hourly_rate = text.split("$", 1)[1].strip()
+
+        # Check for "Primary Location..." and get the next line as the address
+        if "Primary Location..." in text:
+            if i + 1 < len(lines):  # Ensure there is a next line
+                full_addr = normalize_address(lines[i + 1])
+                found = False
+                for addr in address:
+                    if addr in full_addr:
+                        found = True
+                if full_addr and not found:
+                    address.append(full_addr)
+    return salary, hourly_rate, address
+
+
+def build_job_details(fields, description, country_):
+    """
+    Builds the job details dict shared by the Selenium and HTTP fetchers.
+
+    Args:
+        fields (list): (title, value) innerHTML pairs from the
+            job-data__element blocks.
+        description (str): Visible text of the job-description element.
+        country_ (str): Country code for parsing addresses (e.g., 'US').
+
+    Returns:
+        dict: location, employment_type, salary, hourly_rate, description
+        and address of the job.
+    """
+    location = None
+    employment_type = []
+    for title, value in fields:
+        if title == "Location":
+            location = value
+        elif title == "Employment Type":
+            employment_type.extend(parse_employment_type(value))
+
+    salary, hourly_rate, address = parse_description(description, country_)
+    return {
+        "location": location,
+        "employment_type": employment_type,
+        "salary": salary,
+        "hourly_rate": hourly_rate,
+        "description": description,
+        "address": address,
+    }
+
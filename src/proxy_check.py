@@ -0,0 +1,162 @@
+import time
+import logging
+import threading
+import concurrent.futures
+
+import requests
+
+# Small page on the scraped site, so a live proxy is one that reaches it
+DEFAULT_CHECK_URL = "https://careers.walmart.com/robots.txt"
+
+
+class ProxyValidator:
+    """
+    Probes proxy candidates before and during a run. Every candidate fetches
+    `check_url` once through a thread pool, with a short timeout, and only
+    the proxies that answer with a non-error status go into the ProxyPool,
+    fastest first and with their probe latency, which ranks them until
+    they have served real requests. `watch` repeats the probes in the
+    background: proxies that stop answering are quarantined, and
+    candidates that come back are added again.
+    """
+
+    def __init__(self, check_url=DEFAULT_CHECK_URL, timeout=5, workers=64):
+        """
+        Initializes the ProxyValidator instance.
+
+        Args:
+            check_url (str): URL every probe fetches.
+            timeout (float): Seconds a probe may take, connect and read.
+            workers (int): Probes running at once.
+        """
+        self.check_url = check_url
+        self.timeout = timeout
+        self.workers = workers
+        self._stop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.rounds = 0
+        self.probes = 0
+        self.live = 0
+
+    def probe(self, proxy):
+        """
+        Fetches the check URL once through a proxy.
+
+        Args:
+            proxy (str): Proxy URL in the format protocol://ip:port.
+
+        Returns:
+            float: Seconds the probe took, or None if the proxy failed.
+        """
+        started = time.monotonic()
+        try:
+            res = requests.get(
+                self.check_url,
+                proxies={"http": proxy, "https": proxy},
+                timeout=self.timeout,
+            )
+        except requests.RequestException:
+            return None
+        if res.status_code >= 400:
+            return None
+        return time.monotonic() - started
+
+    def validate(self, proxies):
+        """
+        Probes every proxy concurrently.
+
+        Args:
+            proxies (list): Proxy URLs to probe.
+
+        Returns:
+            list: (proxy, latency) of the live proxies, fastest first.
+        """
+        proxies = list(dict.fromkeys(proxies))
+        if not proxies:
+            return []
+        workers = min(self.workers, len(proxies))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            latencies = list(executor.map(self.probe, proxies))
+        live = sorted(
+            (
+                (proxy, latency)
+                for proxy, latency in zip(proxies, latencies)
+                if latency is not None
+            ),
+            key=lambda probe: probe[1],
+        )
+        with self._lock:
+            self.rounds += 1
+            self.probes += len(proxies)
+            self.live = len(live)
+        return live
+
+    def refresh(self, pool, proxies):
+        """
+        Probes the candidates and updates the pool: live proxies are added
+        in ranked order with their probe latency, and dead proxies already
+        in the pool are quarantined.
+
+        Args:
+            pool (ProxyPool): Pool to update.
+            proxies (list): Proxy URLs to probe.
+
+        Returns:
+            list: (proxy, latency) of the live proxies, fastest first.
+        """
+        started = time.monotonic()
+        live = self.validate(proxies)
+        for proxy, latency in live:
+            pool.add(proxy, latency)
+        alive = {proxy for proxy, _ in live}
+        for proxy in proxies:
+            if proxy not in alive:
+                pool.quarantine(proxy)
+        median = live[len(live) // 2][1] if live else None
+        logging.info(
+            f"Proxy check: {len(live)} of {len(set(proxies))} proxies live "
+            f"in {time.monotonic() - started:.1f}s"
+            + (f", median {median:.2f}s" if median is not None else "")
+        )
+        return live
+
+    def watch(self, pool, proxies, interval=600):
+        """
+        Re-validates the candidates every `interval` seconds on a
+        background thread, until stop is called.
+
+        Args:
+            pool (ProxyPool): Pool to keep up to date.
+            proxies (list): Proxy URLs to probe, including the ones that
+                were dead at the start.
+            interval (float): Seconds between rounds.
+        """
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                try:
+                    self.refresh(pool, proxies)
+                except Exception as e:
+                    logging.error(f"Proxy check failed: {e}")
+
+        self._stop = stop
+        self._thread = threading.Thread(target=run, name="proxy-check", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the background re-validation, if running."""
+        if self._stop:
+            self._stop.set()
+            self._stop = None
+            self._thread = None
+
+    def stats(self):
+        """
+        Returns:
+            dict: Rounds and probes run, and the live proxies found in the
+            latest round.
+        """
+        with self._lock:
+            return {"rounds": self.rounds, "probes": self.probes, "live": self.live}
@@ -0,0 +1,250 @@
+import json
+import logging
+import random
+import threading
+import time
+
+
+class ProxyStats:
+    """Health counters for a single proxy."""
+
+    __slots__ = (
+        "address",
+        "successes",
+        "failures",
+        "consecutive_failures",
+        "latency",
+        "probe_latency",
+        "quarantined_until",
+        "quarantines",
+    )
+
+    def __init__(self, address):
+        self.address = address
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latency = None  # EWMA of successful request latency (seconds)
+        self.probe_latency = None  # Latency of the last validation probe
+        self.quarantined_until = 0.0
+        self.quarantines = 0
+
+    def success_rate(self):
+        """
+        Returns:
+            float: Laplace-smoothed success rate, 0.5 for untried proxies.
+        """
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+    def score(self, default_latency):
+        """
+        Expected seconds per successful request, lower is better. Untried
+        proxies score as a typical proxy with no failures, or by their probe
+        latency when they were validated, so they get explored ahead of
+        proxies that are known to be slow or flaky.
+        """
+        if self.successes + self.failures == 0:
+            if self.probe_latency is not None:
+                return self.probe_latency
+            return default_latency
+        latency = self.latency if self.latency is not None else default_latency
+        return latency / self.success_rate()
+
+    def to_dict(self):
+        return {
+            "address": self.address,
+            "successes": self.successes,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "success_rate": round(self.success_rate(), 3),
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "probe_latency": (
+                round(self.probe_latency, 3)
+                if self.probe_latency is not None
+                else None
+            ),
+            "quarantines": self.quarantines,
+        }
+
+
+class ProxyPool:
+    """
+    Shared proxy pool that scores proxies by success rate and latency.
+    Proxies that fail `max_failures` times in a row are quarantined for
+    `cooldown` seconds (doubling on every repeat offence), and selection
+    prefers the fastest healthy proxies via power-of-two-choices sampling so
+    load still spreads across the pool. Every method is non-blocking, so the
+    pool is safe to share between threads and asyncio coroutines alike.
+    Calling the pool returns a proxy, so it can be passed as `get_proxy`.
+    """
+
+    def __init__(self, proxies, max_failures=3, cooldown=120, alpha=0.3):
+        """
+        Initializes the ProxyPool instance.
+
+        Args:
+            proxies (list): Proxy URLs in the format protocol://ip:port.
+            max_failures (int): Consecutive failures before quarantine.
+            cooldown (int): Base quarantine length in seconds.
+            alpha (float): EWMA weight given to the newest latency sample.
+        """
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._stats = {}
+        for proxy in proxies:
+            self._stats.setdefault(proxy, ProxyStats(proxy))
+
+    def __len__(self):
+        return len(self._stats)
+
+    def __call__(self):
+        return self.get()
+
+    def get(self):
+        """
+        Picks a healthy proxy, preferring the better of two random samples.
+        When every proxy is quarantined, the one released soonest is used.
+
+        Returns:
+            str: A proxy URL, or None if the pool is empty.
+        """
+        with self._lock:
+            if not self._stats:
+                return None
+            now = time.monotonic()
+            healthy = [
+                stats for stats in self._stats.values()
+                if stats.quarantined_until <= now
+            ]
+            if not healthy:
+                stats = min(
+                    self._stats.values(), key=lambda s: s.quarantined_until
+                )
+                logging.warning(
+                    f"All proxies quarantined, using {stats.address} early"
+                )
+                return stats.address
+
+            if len(healthy) == 1:
+                return healthy[0].address
+            default_latency = self._median_latency()
+            first, second = random.sample(healthy, 2)
+            if first.score(default_latency) <= second.score(default_latency):
+                return first.address
+            return second.address
+
+    def add(self, proxy, probe_latency=None):
+        """
+        Adds a proxy, or updates the probe latency of one already in the
+        pool. A proxy that has not served a request yet and was only
+        quarantined by a failed probe is released.
+
+        Args:
+            proxy (str): Proxy URL in the format protocol://ip:port.
+            probe_latency (float): Seconds a validation probe took.
+        """
+        with self._lock:
+            stats = self._stats.get(proxy)
+            if stats is None:
+                stats = self._stats[proxy] = ProxyStats(proxy)
+            stats.probe_latency = probe_latency
+            if stats.successes + stats.failures == 0:
+                stats.quarantined_until = 0.0
+
+    def quarantine(self, proxy):
+        """
+        Quarantines a proxy that failed a validation probe, as if it had
+        failed `max_failures` requests in a row. Proxies outside the pool
+        and proxies already in quarantine are left alone.
+
+        Args:
+            proxy (str): Proxy URL.
+        """
+        with self._lock:
+            stats = self._stats.get(proxy)
+            if stats is not None and stats.quarantined_until <= time.monotonic():
+                self._quarantine(stats)
+
+    def report_success(self, proxy, latency):
+        """
+        Records a successful request.
+
+        Args:
+            proxy (str): The proxy that was used.
+            latency (float): Seconds the request took.
+        """
+        with self._lock:
+            stats = self._stats.get(proxy)
+            if stats is None:
+                return
+            stats.successes += 1
+            stats.consecutive_failures = 0
+            if stats.latency is None:
+                stats.latency = latency
+            else:
+                stats.latency = (
+                    self.alpha * latency + (1 - self.alpha) * stats.latency
+                )
+
+    def report_failure(self, proxy):
+        """
+        Records a failed request and quarantines the proxy once it has
+        failed `max_failures` times in a row.
+
+        Args:
+            proxy (str): The proxy that was used.
+        """
+        with self._lock:
+            stats = self._stats.get(proxy)
+            if stats is None:
+                return
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            if stats.consecutive_failures >= self.max_failures:
+                self._quarantine(stats)
+
+    def stats(self):
+        """
+        Returns:
+            list: Per-proxy counters, best scoring first.
+        """
+        with self._lock:
+            default_latency = self._median_latency()
+            ranked = sorted(
+                self._stats.values(), key=lambda s: s.score(default_latency)
+            )
+            return [stats.to_dict() for stats in ranked]
+
+    def export(self, path):
+        """
+        Writes per-proxy counters to a JSON file and logs a summary.
+
+        Args:
+            path (str): Output file path.
+        """
+        stats = self.stats()
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(stats, file, indent=4)
+        used = [s for s in stats if s["successes"] or s["failures"]]
+        alive = [s for s in used if s["successes"]]
+        logging.info(
+            f"Proxy stats: {len(alive)} of {len(used)} used proxies succeeded, "
+            f"written to {path}"
+        )
+
+    def _quarantine(self, stats):
+        cooldown = self.cooldown * 2**stats.quarantines
+        stats.quarantined_until = time.monotonic() + cooldown
+        stats.quarantines += 1
+        stats.consecutive_failures = 0
+        logging.info(f"Quarantined proxy {stats.address} for {cooldown} seconds")
+
+    def _median_latency(self):
+        latencies = sorted(
+            s.latency for s in self._stats.values() if s.latency is not None
+        )
+        if not latencies:
+            return 1.0
+        return latencies[len(latencies) // 2]
@@ -0,0 +1,150 @@
+import sys
+import logging
+
+from addresses import canonical_addresses
+from job_index import parse_job_id
+
+
+class JobRecord:
+    """
+    A scraped job as kept in memory by a JobStore. Slots instead of a dict
+    per job, and the employment types are interned since every job repeats
+    the same few values.
+    """
+
+    __slots__ = (
+        "job_id",
+        "job_link",
+        "title",
+        "description",
+        "hourly_rate",
+        "salary",
+        "types",
+        "queries",
+    )
+
+    def __init__(
+        self, job_link, title, description, hourly_rate, salary, types, queries=()
+    ):
+        self.job_id = parse_job_id(job_link)
+        self.job_link = job_link
+        self.title = title
+        self.description = description
+        self.hourly_rate = hourly_rate
+        self.salary = salary
+        self.types = tuple(sys.intern(value) for value in types)
+        self.queries = tuple(sys.intern(label) for label in queries)
+
+    @classmethod
+    def from_details(cls, job, job_details):
+        """
+        Args:
+            job (dict): Listing entry with "title", "link" and, in batch
+                runs, "queries".
+            job_details (dict): Output of parsing.build_job_details.
+
+        Returns:
+            JobRecord: The record for that job.
+        """
+        return cls(
+            job["link"],
+            job["title"],
+            job_details["description"],
+            job_details["hourly_rate"],
+            job_details["salary"],
+            job_details["employment_type"],
+            job.get("queries", ()),
+        )
+
+
+class JobStore:
+    """
+    Scraped jobs, each stored once by job ID. The address and location
+    groups only hold IDs, so a job posted at several addresses does not
+    repeat its description.
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self.by_address = {}
+        self.by_location = {}
+        self.queries = {}
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def add(self, job, job_details):
+        """
+        Stores a job and files it under each of its canonical addresses, or
+        under its location when no address was found. A job that is already
+        stored keeps its groups.
+
+        Args:
+            job (dict): Listing entry with "title" and "link".
+            job_details (dict): Output of parsing.build_job_details.
+
+        Returns:
+            JobRecord: The stored record.
+        """
+        record = JobRecord.from_details(job, job_details)
+        addresses = canonical_addresses(job_details["address"])
+        self._insert(record, addresses, job_details["location"])
+        return record
+
+    def _insert(self, record, addresses, location):
+        known = record.job_id in self.jobs
+        self.jobs[record.job_id] = record
+        if known:
+            return
+        if addresses:
+            for address in addresses:
+                self.by_address.setdefault(address, []).append(record.job_id)
+        else:
+            self.by_location.setdefault(location, []).append(record.job_id)
+
+    def merge(self, other):
+        """
+        Adds every job of another store, e.g. one filled by a single worker.
+        Jobs this store already holds keep their groups.
+
+        Args:
+            other (JobStore): Store to take the jobs from.
+        """
+        added = set()
+        for job_id, record in other.jobs.items():
+            if job_id not in self.jobs:
+                added.add(job_id)
+                self.jobs[job_id] = record
+        for mine, theirs in (
+            (self.by_address, other.by_address),
+            (self.by_location, other.by_location),
+        ):
+            for group, job_ids in theirs.items():
+                new_ids = [job_id for job_id in job_ids if job_id in added]
+                if new_ids:
+                    mine.setdefault(group, []).extend(new_ids)
+
+    def tag_queries(self, queries):
+        """
+        Records which queries listed each job once a batch run is done,
+        since a job's details can be scraped before the last query that
+        lists it. Tags are also kept for jobs that were streamed instead of
+        stored.
+
+        Args:
+            queries (dict): Job link to query labels, as returned by
+                WorkScheduler.job_queries.
+        """
+        for link, labels in queries.items():
+            self.queries[link] = sorted(set(self.queries.get(link, ())) | set(labels))
+        for record in self.jobs.values():
+            labels = self.queries.get(record.job_link)
+            if labels:
+                record.queries = tuple(sys.intern(label) for label in labels)
+
+    def log_counts(self):
+        """Logs the number of jobs, addresses and locations."""
+        logging.info(
+            f"Stored {len(self.jobs)} jobs: {len(self.by_address)} addresses, "
+            f"{len(self.by_location)} locations with missing addresses."
+        )
@@ -0,0 +1,155 @@
+import json
+import heapq
+import random
+import logging
+import threading
+import time
+from itertools import count
+
+
+class RetryQueue:
+    """
+    Delay queue for failed listing pages and job links. A worker whose
+    attempt fails hands the item back with `schedule` and moves straight on
+    to other work instead of sleeping. The item becomes due again after a
+    jittered exponential backoff and is then picked up by whichever worker
+    asks first, usually with a different proxy. Every item has an attempt
+    budget, items that use it up go to a dead-letter list that is written
+    out at the end of the run.
+    """
+
+    def __init__(self, max_attempts=5, base_delay=1.0, max_delay=30.0):
+        """
+        Initializes the RetryQueue instance.
+
+        Args:
+            max_attempts (int): Attempts per item, including the first one.
+            base_delay (float): Backoff after the first failure, doubled
+                after every further failure.
+            max_delay (float): Upper bound of the backoff.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.dead_letters = []
+        self.retried = 0
+        self._attempts = {}
+        self._delayed = {}
+        self._order = count()
+        self._lock = threading.Lock()
+
+    def backoff(self, failures):
+        """
+        Args:
+            failures (int): Failed attempts of the item so far.
+
+        Returns:
+            float: Seconds to wait. Half of the capped exponential delay is
+            fixed, the other half random, so items that failed together do
+            not all come back at the same moment.
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (failures - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def schedule(self, kind, key, item, error=None):
+        """
+        Records a failed attempt and delays the item, or dead-letters it
+        once its attempt budget is used up.
+
+        Args:
+            kind (str): "page" or "job", items of each kind are handed out
+                separately.
+            key (hashable): Identity of the item, e.g. the page number or
+                the job link.
+            item: What pop_due hands out again.
+            error (Exception): Cause of the failure, kept for the
+                dead-letter list.
+
+        Returns:
+            bool: True if the item will be retried, False if it was
+            dead-lettered.
+        """
+        with self._lock:
+            failures = self._attempts.get((kind, key), 0) + 1
+            self._attempts[(kind, key)] = failures
+            if failures >= self.max_attempts:
+                self.dead_letters.append(
+                    {
+                        "kind": kind,
+                        "key": key,
+                        "item": item,
+                        "attempts": failures,
+                        "error": str(error) if error else None,
+                    }
+                )
+                logging.error(
+                    f"Giving up on {kind} {key} after {failures} attempts: {error}"
+                )
+                return False
+            delay = self.backoff(failures)
+            heapq.heappush(
+                self._delayed.setdefault(kind, []),
+                (time.monotonic() + delay, next(self._order), item),
+            )
+            self.retried += 1
+        logging.info(
+            f"Retrying {kind} {key} in {delay:.1f}s "
+            f"(attempt {failures + 1} of {self.max_attempts})"
+        )
+        return True
+
+    def pop_due(self, kind):
+        """
+        Returns:
+            The earliest due item of `kind`, or None if none is due yet.
+        """
+        with self._lock:
+            delayed = self._delayed.get(kind)
+            if delayed and delayed[0][0] <= time.monotonic():
+                return heapq.heappop(delayed)[2]
+        return None
+
+    def wait_time(self, kind):
+        """
+        Returns:
+            float: Seconds until the next item of `kind` is due (0 if one
+            is due already), or None when none is waiting.
+        """
+        with self._lock:
+            delayed = self._delayed.get(kind)
+            if not delayed:
+                return None
+            return max(0.0, delayed[0][0] - time.monotonic())
+
+    def pending(self, kind):
+        """
+        Returns:
+            int: Items of `kind` waiting for their retry.
+        """
+        with self._lock:
+            return len(self._delayed.get(kind, ()))
+
+    def stats(self):
+        """
+        Returns:
+            dict: Retries scheduled, items still waiting and dead letters.
+        """
+        with self._lock:
+            return {
+                "retried": self.retried,
+                "pending": sum(len(delayed) for delayed in self._delayed.values()),
+                "dead_letters": len(self.dead_letters),
+            }
+
+    def export(self, path):
+        """
+        Writes the dead-letter list as JSON.
+
+        Args:
+            path (str): Output path.
+        """
+        with self._lock:
+            dead_letters = list(self.dead_letters)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(dead_letters, file, ensure_ascii=False, indent=4)
+        logging.info(f"{len(dead_letters)} dead letters written to {path}")
@@ -0,0 +1,395 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from queue import Empty, Queue
+
+from listing_fetcher import EMPTY_PAGES_TO_END, last_page
+from retry import RetryQueue
+
+
+# Longest a waiting worker sleeps before checking for due retries and the
+# end of the run again
+POLL_INTERVAL = 0.2
+
+
+class WorkerStats:
+    """Counts the work a single worker did and how long it was busy."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.monotonic()
+        self.finished = None
+        self.busy = 0.0
+        self.pages = 0
+        self.jobs = 0
+
+    def utilization(self):
+        """
+        Returns:
+            float: Fraction of the worker's lifetime spent scraping.
+        """
+        end = self.finished if self.finished else time.monotonic()
+        lifetime = end - self.started
+        return self.busy / lifetime if lifetime > 0 else 0.0
+
+
+class LastPageTracker:
+    """
+    Learns where the results of each search end from its listed pages: from
+    the result count on its first page, from `empty_pages` pages in a row
+    without listings, or from a page whose links were all listed by earlier
+    pages, as the site serves the last page again past the end. Pages may
+    be reported in any order. Both engines use it, so they stop at the same
+    page.
+    """
+
+    def __init__(self, empty_pages=EMPTY_PAGES_TO_END):
+        """
+        Initializes the LastPageTracker instance.
+
+        Args:
+            empty_pages (int): Pages in a row without listings that end a
+                search.
+        """
+        self.empty_pages = empty_pages
+        self._lock = threading.Lock()
+        self._last_pages = {}
+        self._listed = {}
+        self._empty = {}
+        self._highest = {}
+
+    def last_page(self, search):
+        """
+        Args:
+            search: The search, e.g. its query label, or None.
+
+        Returns:
+            int: Number of its last page with results, or None while unknown.
+        """
+        with self._lock:
+            return self._last_pages.get(search)
+
+    def past_end(self, search, number):
+        """
+        Args:
+            search: The search, e.g. its query label, or None.
+            number (int): Page number.
+
+        Returns:
+            bool: Whether the page lies past the known last page.
+        """
+        last = self.last_page(search)
+        return last is not None and number > last
+
+    def end(self, search, last, reason):
+        """
+        Ends a search after `last`. A later call can only move the end
+        earlier.
+
+        Args:
+            search: The search, e.g. its query label, or None.
+            last (int): Number of its last page with results.
+            reason (str): Why, for the log.
+        """
+        with self._lock:
+            current = self._last_pages.get(search)
+            if current is not None and current <= last:
+                return
+            self._last_pages[search] = last
+        name = f"'{search}'" if search is not None else "the search"
+        logging.info(f"Last results page of {name} is {last} ({reason})")
+
+    def report(self, search, number, jobs, total=None):
+        """
+        Learns from a listed page of a search.
+
+        Args:
+            search: The search, e.g. its query label, or None.
+            number (int): Page number.
+            jobs (list): (location, job) tuples listed on the page.
+            total (int): Result count the page reports, None if unknown.
+        """
+        if not jobs:
+            self._report_empty(search, number)
+            return
+        if number == 1 and total is not None:
+            self.end(search, last_page(total, len(jobs)), f"{total} results")
+        with self._lock:
+            self._highest[search] = max(self._highest.get(search, 0), number)
+            listed = self._listed.setdefault(search, {})
+            repeated = all(
+                listed.get(job["link"], number) < number for _, job in jobs
+            )
+            for _, job in jobs:
+                if listed.get(job["link"], number) >= number:
+                    listed[job["link"]] = number
+        if repeated:
+            self.end(search, number - 1, "repeated listings")
+
+    def _report_empty(self, search, number):
+        with self._lock:
+            empty = self._empty.setdefault(search, set())
+            empty.add(number)
+            first = number
+            while first - 1 in empty:
+                first -= 1
+            last = number
+            while last + 1 in empty:
+                last += 1
+            # A later page with listings shows the run was a hiccup
+            ended = last - first + 1 >= self.empty_pages
+            ended = ended and self._highest.get(search, 0) < first
+        if ended:
+            self.end(search, first - 1, f"{last - first + 1} pages without listings")
+
+
+class WorkScheduler:
+    """
+    Hands out listing pages, then job links, one at a time from shared
+    queues. Workers that run out of pages move on to job links, so no
+    worker sits idle while another still has work queued. Jobs go through
+    a bounded queue so listing workers block instead of buffering the
+    whole result set. Failed pages and jobs go to a RetryQueue and are
+    handed out again once their backoff has passed, so a failure never
+    makes a worker sleep while other work is waiting. Listed pages are
+    reported back with `report_page`, and once a LastPageTracker knows the
+    last page of a search its later pages are dropped instead of handed
+    out. A job link is
+    only queued once, so jobs listed by several pages or queries are
+    scraped once and carry the "queries" of every listing that found them.
+    """
+
+    def __init__(
+        self,
+        pages,
+        listing_workers,
+        queue_size=100,
+        jobs=(),
+        retry_queue=None,
+        positions=None,
+    ):
+        """
+        Initializes the WorkScheduler instance.
+
+        Args:
+            pages (iterable): Listing pages to scrape, e.g. page numbers
+                or listing URLs.
+            listing_workers (int): Number of workers that start on pages.
+            queue_size (int): Max jobs waiting to be scraped.
+            jobs (iterable): Jobs already listed (e.g. by a resumed run),
+                handed out before any newly listed ones.
+            retry_queue (RetryQueue): Delay queue for failed pages and
+                jobs, with the attempt budget and dead letters.
+            positions (dict): Page to its (search, page number). Pages
+                missing from it are plain page numbers of a single search.
+        """
+        self._pages = Queue()
+        for page in pages:
+            self._pages.put(page)
+        self._backlog = Queue()
+        self._seen = {}
+        for job in jobs:
+            self._seen[job["link"]] = job
+            self._backlog.put(job)
+        self._jobs = Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._listing_active = listing_workers
+        self._stats = {}
+        self.retries = retry_queue if retry_queue else RetryQueue()
+        self._positions = positions if positions else {}
+        self.last_pages = LastPageTracker()
+        self.skipped_pages = 0
+
+    def register(self, name):
+        """
+        Registers a worker for the utilization report.
+
+        Args:
+            name (str): Worker name used in the utilization report.
+
+        Returns:
+            WorkerStats: Counters for that worker.
+        """
+        with self._lock:
+            stats = WorkerStats(name)
+            self._stats[name] = stats
+            return stats
+
+    def next_page(self):
+        """
+        Once every page is handed out, waits for failed pages that are
+        still due for a retry, since every job hangs off a listing page.
+        Pages past the known last page of their search are skipped.
+
+        Returns:
+            The next listing page, or None once every page is handed out and
+            no failed page is waiting for a retry.
+        """
+        while True:
+            try:
+                page = self._pages.get_nowait()
+            except Empty:
+                page = self.retries.pop_due("page")
+            if page is not None:
+                if self._past_end(page):
+                    with self._lock:
+                        self.skipped_pages += 1
+                    continue
+                return page
+            wait = self.retries.wait_time("page")
+            if wait is None:
+                return None
+            time.sleep(min(wait, POLL_INTERVAL))
+
+    def _position(self, page):
+        return self._positions.get(page, (None, page))
+
+    def _past_end(self, page):
+        search, number = self._position(page)
+        return self.last_pages.past_end(search, number)
+
+    def report_page(self, page, jobs, total=None):
+        """
+        Passes a listed page on to the LastPageTracker.
+
+        Args:
+            page: The page as handed out by next_page.
+            jobs (list): (location, job) tuples listed on the page.
+            total (int): Result count the page reports, None if unknown.
+        """
+        search, number = self._position(page)
+        self.last_pages.report(search, number, jobs, total)
+
+    def retry_page(self, page, error=None):
+        """
+        Hands a failed page back to be retried after a backoff.
+
+        Returns:
+            bool: True if it will be retried, False if it used up its
+            attempts and was dead-lettered.
+        """
+        return self.retries.schedule("page", page, page, error)
+
+    def retry_job(self, job, error=None):
+        """
+        Hands a failed job back to be retried after a backoff.
+
+        Returns:
+            bool: True if it will be retried, False if it used up its
+            attempts and was dead-lettered.
+        """
+        return self.retries.schedule("job", job.get("link"), job, error)
+
+    def put_job(self, job):
+        """
+        Queues a job link, blocking while the queue is full. A link that was
+        already queued is dropped, and its "queries" are added to the queued
+        job's.
+
+        Args:
+            job (dict): Listing entry with "title", "link" and, in batch
+                runs, "queries".
+
+        Returns:
+            bool: Whether the job was queued.
+        """
+        with self._lock:
+            first = self._seen.get(job["link"])
+            if first is None:
+                self._seen[job["link"]] = job
+            else:
+                for label in job.get("queries", ()):
+                    queries = first.setdefault("queries", [])
+                    if label not in queries:
+                        queries.append(label)
+        if first is not None:
+            return False
+        self._jobs.put(job)
+        return True
+
+    def job_queries(self):
+        """
+        Returns:
+            dict: Job link to the labels of the queries that listed it, for
+            every job that carries any.
+        """
+        with self._lock:
+            return {
+                link: list(job["queries"])
+                for link, job in self._seen.items()
+                if job.get("queries")
+            }
+
+    def finish_listing(self):
+        """Marks the calling worker as done with pages."""
+        with self._lock:
+            self._listing_active -= 1
+
+    def next_job(self):
+        """
+        Returns:
+            dict: The next job, or None once all listing pages are done, the
+            job queue is drained and no failed job is waiting for a retry.
+        """
+        while True:
+            try:
+                return self._backlog.get_nowait()
+            except Empty:
+                pass
+            job = self.retries.pop_due("job")
+            if job is not None:
+                return job
+            wait = self.retries.wait_time("job")
+            timeout = POLL_INTERVAL if wait is None else min(wait, POLL_INTERVAL)
+            try:
+                return self._jobs.get(timeout=timeout)
+            except Empty:
+                pass
+            # A worker whose job fails after this check is still running and
+            # picks the retry up itself
+            with self._lock:
+                listing_done = self._listing_active == 0
+            if listing_done and self._jobs.empty() and wait is None:
+                return None
+
+    @contextmanager
+    def track(self, stats, kind):
+        """
+        Times a unit of work and counts it against a worker.
+
+        Args:
+            stats (WorkerStats): The worker's counters.
+            kind (str): "pages" or "jobs".
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            stats.busy += time.monotonic() - start
+            setattr(stats, kind, getattr(stats, kind) + 1)
+
+    def finish(self, stats):
+        """Marks a worker as exited."""
+        stats.finished = time.monotonic()
+
+    def report(self):
+        """
+        Logs and returns per-worker utilization.
+
+        Returns:
+            dict: Worker name to pages, jobs, busy seconds and utilization.
+        """
+        report = {}
+        for name, stats in self._stats.items():
+            report[name] = {
+                "pages": stats.pages,
+                "jobs": stats.jobs,
+                "busy": round(stats.busy, 2),
+                "utilization": round(stats.utilization(), 3),
+            }
+            logging.info(
+                f"{name}: {stats.pages} pages, {stats.jobs} jobs, "
+                f"{stats.utilization():.0%} busy"
+            )
+        return report
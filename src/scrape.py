@@ -1,16 +1,29 @@
 import time
 import logging
-import html
+from contextlib import nullcontext
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-from webdriver_manager.chrome import ChromeDriverManager
-import pyap
+from detail_fetcher import extract_detail_html
+from dom_extract import (
+    ExtractionStats,
+    extract_detail_fields,
+    extract_listing_rows,
+    extract_result_count,
+    extract_transfer_size,
+)
+from driver_pool import DriverPool, build_driver
+from listing_fetcher import (
+    CAREERS_URL,
+    NO_RESULTS_SELECTOR,
+    listing_cache_key,
+    parse_cached_listing,
+)
+from metrics import Metrics
+from parse_pool import ParsePool
+from tab_browser import TabLoadError
 
 
 class Scraper:
@@ -24,6 +37,19 @@ class Scraper:
         employment_type=None,
         retries=5,
         country="US",
+        driver_pool=None,
+        http_fetcher=None,
+        proxy_pool=None,
+        job_index=None,
+        base_url=CAREERS_URL,
+        extraction_stats=None,
+        parse_pool=None,
+        metrics=None,
+        worker=None,
+        limiters=None,
+        listing_fetcher=None,
+        page_cache=None,
+        tab_browser=None,
     ):
         """
         Initializes the Scraper instance.
@@ -37,6 +63,34 @@ class Scraper:
             employment_type (str): Employment type filter.
             retries (int): Number of retries for failed requests.
             country (str): Country code for parsing addresses (e.g., 'US').
+            driver_pool (DriverPool): Shared pool of warm browsers. A private
+                pool is created when omitted.
+            http_fetcher (HttpDetailFetcher): Optional browserless fetcher
+                tried before Selenium for job detail pages.
+            proxy_pool (ProxyPool): Optional pool that is told whether each
+                attempt through a proxy succeeded and how long it took.
+            job_index (JobIndex): Optional index of previously scraped jobs.
+                Fresh known postings are reused instead of fetched.
+            base_url (str): Results endpoint, overridable for local testing.
+            extraction_stats (ExtractionStats): Collects per-page extraction
+                timings, shared by every scraper of a run.
+            parse_pool (ParsePool): Processes that parse extracted job
+                fields. Parsing happens in the scraper thread when omitted.
+            metrics (Metrics): Registry that stage timings and counters
+                are recorded in, shared by every scraper of a run.
+            worker (str): Name of the worker running this scraper, used as
+                a metrics label.
+            limiters (dict): AdaptiveLimiter per fetch kind ("listing",
+                "detail"), shared by every scraper of a run.
+            listing_fetcher (ApiListingFetcher): Reads listing pages from
+                the JSON search endpoint, the browser is used without it or
+                when the endpoint is unavailable.
+            page_cache (PageCache): Cache of listing and detail pages,
+                checked before any fetch and filled by the browser path.
+            tab_browser (TabBrowser): Browser that loads job pages in
+                several tabs at once, shared by a few scrapers. Detail pages
+                that need JavaScript go through it instead of this
+                scraper's own driver.
         """
         self.query = query
         self.date_sort = date_sort
@@ -46,165 +100,277 @@ class Scraper:
         self.retries = retries
         self.country = country
         self.get_proxy = get_proxy
+        self.driver_pool = driver_pool if driver_pool else DriverPool()
+        self.http_fetcher = http_fetcher
+        self.proxy_pool = proxy_pool
+        self.job_index = job_index
+        self.base_url = base_url
+        self.extraction_stats = (
+            extraction_stats if extraction_stats else ExtractionStats()
+        )
+        self.parse_pool = parse_pool if parse_pool else ParsePool(workers=0)
+        self.metrics = metrics if metrics else Metrics()
+        self.worker = worker
+        self.limiters = limiters if limiters else {}
+        self.listing_fetcher = listing_fetcher
+        self.page_cache = page_cache
+        self.tab_browser = tab_browser
+        self.driver = None
+        self.proxy_address = None
+
+    def attempt_listing_page(self, page_url, date_sort):
+        """
+        Makes a single attempt at a listing page, from the page cache, then
+        through the search endpoint when available and the browser
+        otherwise. On failure the current proxy is reported and replaced
+        before the error is raised, and the caller decides when to retry.
 
-    def get_jobs(self, start_page, end_page):
+        Args:
+            page_url (str): URL of the listing page.
+            date_sort (bool): Whether to sort results by date.
+
+        Returns:
+            tuple: (jobs, total) with (location, {"title": ..., "link":
+            ...}) tuples and the result count the page reports, None when
+            it shows none. An empty list means the page is past the last
+            result.
         """
-        Retrieves job postings within a specified range and processes the data.
+        # Cached pages need no proxy, so they are not scored
+        listing = self.cached_listing_page(page_url, date_sort)
+        if listing:
+            return listing
+        started = time.monotonic()
+        try:
+            # Each attempt holds a listing slot of the adaptive limiter
+            with self.slot("listing"):
+                listing = self.fetch_listing_json(page_url, date_sort)
+                if listing is None:
+                    listing = self.load_listing_page(page_url, date_sort)
+                    self.driver = self.driver_pool.record_use(self.driver)
+        except Exception:
+            self.report_proxy(started, failed=True)
+            self.switch_proxy()
+            logging.info(f"Switching to new Proxy: {self.proxy_address}")
+            raise
+        self.report_proxy(started)
+        return listing
 
+    def cached_listing_page(self, page_url, date_sort):
+        """
         Args:
-            start_page (int): The starting index for job postings to retrieve.
-            end_page (int): The ending index for job postings to retrieve.
+            page_url (str): URL of the listing page.
+            date_sort (bool): Whether to sort results by date.
 
         Returns:
-            tuple: A tuple containing:
-                - formatted_data (list): A list of processed job data.
-                - bad_data (list): A list of job data entries that could not
-                  be processed.
-        """
-        jobs_by_location = self.get_walmart_careers(
-            self.query,
-            self.date_sort,
-            self.expand,
-            self.job_career_area,
-            self.employment_type,
-            start_page,
-            end_page,
-            self.retries,
-        )
-        formatted_data, bad_data = self.get_career_info(
-            jobs_by_location, self.country, self.retries
-        )
-        return formatted_data, bad_data
+            tuple: (jobs, total) read from a fresh cached copy of the page,
+            or None without one.
+        """
+        if not self.page_cache:
+            return None
+        body = self.page_cache.get(listing_cache_key(page_url, date_sort))
+        if body is None:
+            return None
+        listing = parse_cached_listing(body, page_url)
+        return listing if listing and listing[0] else None
 
-    def get_walmart_careers(
-        self,
-        query,
-        date_sort,
-        expand,
-        job_career_area,
-        employment_type,
-        start_pages,
-        max_pages,
-        retries,
-    ):
+    def fetch_listing_json(self, page_url, date_sort):
         """
-        Webscraper for Walmart career page. Utilizes the search queries
-        provided to it, along with the proxy pool given. Pages scraped are
-        based on the start and end page indices. Retries are implemented with
-        exponential backoff based on the maximum retries set. Proxy switched
-        when failing to access pages.
+        Reads a listing page from the search endpoint, with server side
+        sorting.
 
         Args:
-            query (str): Search query for the Walmart careers page.
+            page_url (str): URL of the listing page.
             date_sort (bool): Whether to sort results by date.
-            expand (str): Additional parameters for expanding search results.
-            job_career_area (str): Job career area filter.
-            employment_type (str): Employment type filter.
-            start_pages (int): Starting page number.
-            max_pages (int): Maximum page number.
-            retries (int): Number of retries for failed requests.
 
         Returns:
-            dict: Dictionary of jobs grouped by location.
+            tuple: (jobs, total), or None when there is no listing fetcher
+            or the endpoint is unavailable.
         """
-        url = "https://careers.walmart.com/results"
-        jobs_by_location = {}
+        if not self.listing_fetcher or not self.listing_fetcher.available:
+            return None
+        if not self.proxy_address:
+            self.proxy_address = self.get_proxy()
+        with self.metrics.time("api_fetch", proxy=self.proxy_address):
+            return self.listing_fetcher.fetch(
+                page_url, date_sort, self.proxy_address
+            )
 
-        driver = None
-        proxy_address = self.get_proxy()
+    def load_listing_page(self, page_url, date_sort):
+        """
+        Loads a listing page once in this scraper's browser and reads its
+        job rows and result count. A page past the last result shows a
+        no-results notice, which ends the wait right away.
 
-        try:
-            for page in range(start_pages, max_pages + 1):
-                payload = (
-                    f"?q={query}&page={page}&sort=rank&expand={expand}"
-                    f"&jobCareerArea={job_career_area}"
-                )
-                if employment_type:
-                    payload += f"&EmploymentType={employment_type}"
-
-                for attempt in range(retries):
-                    try:
-                        if not driver:
-                            driver = self.proxy_driver(proxy_address)
-                            logging.info(f"Using proxy: {proxy_address}")
-
-                        driver.get(url + payload)
-
-                        if date_sort:
-                            button = WebDriverWait(driver, 10).until(
-                                EC.element_to_be_clickable(
-                                    (
-                                        By.CSS_SELECTOR,
-                                        "label.search__sort__option__label"
-                                        "[title='Job Post Date']",
-                                    )
-                                )
-                            )
-                            button.click()
-
-                        job_list = WebDriverWait(driver, 20).until(
-                            EC.presence_of_all_elements_located(
-                                (By.CLASS_NAME, "job-listing")
-                            )
+        Args:
+            page_url (str): URL of the listing page.
+            date_sort (bool): Whether to sort results by date.
+
+        Returns:
+            tuple: (jobs, total) with (location, {"title": ..., "link": ...})
+            tuples and the reported result count.
+        """
+        driver = self.acquire_driver()
+        relay_bytes = self.driver_pool.bytes_transferred(driver)
+        with self.metrics.time(
+            "page_load", kind="listing", proxy=self.proxy_address
+        ):
+            driver.get(page_url)
+
+        if date_sort:
+            with self.metrics.time("wait", kind="sort"):
+                button = WebDriverWait(driver, self.wait_time(10)).until(
+                    EC.element_to_be_clickable(
+                        (
+                            By.CSS_SELECTOR,
+                            "label.search__sort__option__label"
+                            "[title='Job Post Date']",
                         )
+                    )
+                )
+            button.click()
+
+        with self.metrics.time("wait", kind="listing"):
+            WebDriverWait(driver, self.wait_time(20)).until(
+                EC.any_of(
+                    EC.presence_of_element_located((By.CLASS_NAME, "job-listing")),
+                    EC.presence_of_element_located(
+                        (By.CSS_SELECTOR, NO_RESULTS_SELECTOR)
+                    ),
+                )
+            )
+
+        # Every row is read in one script call
+        with self.metrics.time("extract", kind="listing"):
+            jobs = self.extraction_stats.timed(
+                "listing", extract_listing_rows, driver, page_url
+            )
+            total = extract_result_count(driver)
+        self.record_page_bytes(driver, "listing", relay_bytes)
+        if self.page_cache and jobs:
+            self.page_cache.put(
+                listing_cache_key(page_url, date_sort), driver.page_source
+            )
+        return jobs, total
+
+    def wait_time(self, seconds):
+        """
+        Args:
+            seconds (int): Selector wait once the page has loaded.
+
+        Returns:
+            int: The wait to use with this scraper's browser profile, which
+            also covers the page load when page loads return early.
+        """
+        return seconds + self.driver_pool.profile.load_wait
+
+    def record_page_bytes(self, driver, kind, relay_bytes):
+        """
+        Adds the bytes a browser page load took to the metrics, per kind and
+        proxy. They are measured at the proxy relay when the driver has one
+        and from the page's resource timing otherwise.
+
+        Args:
+            driver (WebDriver): Driver that loaded the page.
+            kind (str): "listing" or "detail".
+            relay_bytes (int): Relay byte count before the load, or None.
+        """
+        if relay_bytes is not None:
+            page_bytes = self.driver_pool.bytes_transferred(driver) - relay_bytes
+        else:
+            try:
+                page_bytes = extract_transfer_size(driver)
+            except Exception as e:
+                logging.debug(f"Could not read transfer size: {e}")
+                return
+        # Labelled with the blocking in effect, so pages the lean profile
+        # only partly applied to are not counted as lean ones
+        blocking = self.driver_pool.blocking(driver)
+        self.metrics.count(
+            "page_bytes",
+            page_bytes,
+            kind=kind,
+            proxy=self.proxy_address,
+            blocking=blocking,
+        )
+        self.metrics.count(
+            "browser_pages", kind=kind, proxy=self.proxy_address, blocking=blocking
+        )
+
+    def slot(self, kind):
+        """
+        Args:
+            kind (str): "listing" or "detail".
+
+        Returns:
+            Context manager holding a slot of the adaptive limiter for
+            `kind` while one attempt runs, or a no-op without limiters.
+        """
+        limiter = self.limiters.get(kind)
+        return limiter.slot() if limiter else nullcontext()
+
+    def acquire_driver(self):
+        """
+        Returns this scraper's WebDriver, leasing one from the pool on first
+        use. The driver stays leased until release_driver is called.
+
+        Returns:
+            WebDriver: A ready-to-use Selenium WebDriver instance.
+        """
+        if not self.proxy_address:
+            self.proxy_address = self.get_proxy()
+        if not self.driver:
+            with self.metrics.time("driver_acquire", worker=self.worker):
+                self.driver = self.driver_pool.acquire(self.proxy_address)
+            logging.info(f"Initialized WebDriver with proxy: {self.proxy_address}")
+        return self.driver
+
+    def switch_proxy(self):
+        """
+        Takes the next proxy from the pool and moves the current WebDriver
+        (if any) onto it.
+        """
+        self.proxy_address = self.get_proxy()
+        if self.driver:
+            with self.metrics.time("proxy_switch", worker=self.worker):
+                self.driver = self.driver_pool.switch_proxy(
+                    self.driver, self.proxy_address
+                )
+
+    def report_proxy(self, started, failed=False):
+        """
+        Reports the outcome of an attempt through the current proxy to the
+        metrics and to the proxy pool, if one was given.
+
+        Args:
+            started (float): time.monotonic() at the start of the attempt.
+            failed (bool): Whether the attempt failed.
+        """
+        self.metrics.count(
+            "attempts",
+            outcome="failed" if failed else "ok",
+            proxy=self.proxy_address,
+            worker=self.worker,
+        )
+        if not self.proxy_pool or not self.proxy_address:
+            return
+        if failed:
+            self.proxy_pool.report_failure(self.proxy_address)
+        else:
+            self.proxy_pool.report_success(
+                self.proxy_address, time.monotonic() - started
+            )
 
-                        for job in job_list:
-                            try:
-                                listing_data = job.find_element(
-                                    By.CLASS_NAME, "job-listing__link"
-                                )
-                                location_data = job.find_element(
-                                    By.CLASS_NAME, "job-listing__location"
-                                )
-
-                                link = listing_data.get_attribute("href")
-                                title = listing_data.text.strip()
-                                location = location_data.text.strip()
-
-                                if not title or not link or not location:
-                                    raise ValueError(
-                                        f"Missing or incomplete job data, "
-                                        f"on page {page}"
-                                    )
-
-                                if location not in jobs_by_location:
-                                    jobs_by_location[location] = []
-
-                                jobs_by_location[location].append(
-                                    {"title": title, "link": link}
-                                )
-                            except Exception as e:
-                                logging.error(f"Error during parsing job: {e}")
-                                continue
-
-                        break
-                    except Exception as e:
-                        logging.warning(f"Attempt {attempt + 1} failed: {e}")
-                        if attempt < retries - 1:
-                            backoff_time = 2**attempt
-                            proxy_address = self.get_proxy()
-                            if driver:
-                                driver.quit()
-                                driver = None
-                            logging.info(f"Switching to new Proxy: {proxy_address}")
-                            logging.info(f"Sleeping for {backoff_time} seconds...")
-                            time.sleep(backoff_time)
-                        else:
-                            logging.error(
-                                f"Failed to access page {page}. Switching proxy."
-                            )
-                            proxy_address = self.get_proxy()
-                            if driver:
-                                driver.quit()
-                                driver = None
-        finally:
-            if driver:
-                driver.quit()
-            return jobs_by_location
+    def release_driver(self):
+        """Returns the leased WebDriver to the pool so it stays warm."""
+        if self.driver:
+            self.driver_pool.release(self.driver)
+            self.driver = None
 
     def proxy_driver(self, proxy_address):
         """
-        Initializes a Selenium WebDriver with optional proxy settings.
+        Initializes a standalone Selenium WebDriver with optional proxy
+        settings. Scraping paths lease drivers from `self.driver_pool`
+        instead, this is kept for one-off use.
 
         Args:
             proxy_address (str): Proxy address to use.
@@ -212,261 +378,180 @@ class Scraper:
         Returns:
             WebDriver: Configured Selenium WebDriver instance.
         """
-        options = Options()
-        options.add_argument("--headless=new")
-        prefs = {
-            "profile.default_content_setting_values.geolocation": 2
-        }
-        options.add_experimental_option("prefs", prefs)
-        if proxy_address:
-            options.add_argument(f"--proxy-server={proxy_address}")
-            logging.info(f"Using proxy: {proxy_address}")
+        with self.metrics.time("driver_launch", proxy=proxy_address):
+            return build_driver(proxy_address, self.driver_pool.profile)
+
+    def attempt_job(self, job, country):
+        """
+        Makes a single attempt at a job's details, serving known postings
+        from the job index. On failure the current proxy is reported and
+        replaced before the error is raised, and the caller decides when to
+        retry.
+
+        Args:
+            job (dict): Listing entry with "title" and "link".
+            country (str): Country code for parsing addresses (e.g., 'US').
+
+        Returns:
+            dict: Job details, or None if the job lacks a title or link.
+        """
+        job_link = job.get("link")  # Extract the job link
+        title = job.get("title")  # Extract the job title
+
+        # Skip jobs with missing data
+        if not job_link or not title:
+            logging.warning(f"Skipping job due to missing data: {job}")
+            return None
+
+        # Known, recently fetched postings are served from the job index
+        if self.job_index:
+            job_details = self.job_index.lookup(job)
+            if job_details:
+                logging.info(f"Reusing indexed details for job: {title}")
+                self.metrics.count("index_hits", worker=self.worker)
+                return job_details
+
+        # Pages fetched within the cache TTL are parsed without a fetch
+        job_details = self.cached_job_details(job_link, country)
+        if job_details:
+            logging.info(f"Using cached page for job: {title}")
+            if self.job_index:
+                self.job_index.record(job, job_details)
+            return job_details
+
+        # Extract job details from the job page
+        logging.info(f"Extracting details for job: {title}")
+        started = time.monotonic()
         try:
-            driver = webdriver.Chrome(
-                service=Service(ChromeDriverManager().install()),
-                options=options,
-            )
-            return driver
-        except Exception as e:
-            logging.error(
-                f"Failed to initialize WebDriver with proxy {proxy_address}: {e}"
-            )
+            # Each attempt holds a detail slot of the adaptive limiter
+            with self.slot("detail"):
+                job_details = self.fetch_job_details(job_link, country)
+        except TabLoadError:
+            # The tab browser loads through its own proxy and has reported
+            # it, this scraper's proxy was not used for the failed load
+            raise
+        except Exception:
+            self.report_proxy(started, failed=True)
+            self.switch_proxy()
             raise
+        self.report_proxy(started)
+        if self.job_index:
+            self.job_index.record(job, job_details)
+        return job_details
+
+    def cached_job_details(self, job_link, country):
+        """
+        Args:
+            job_link (str): URL of the job details page.
+            country (str): Country code for parsing addresses (e.g., 'US').
+
+        Returns:
+            dict: Job details parsed from a fresh cached copy of the page,
+            or None without one.
+        """
+        if not self.page_cache:
+            return None
+        page_html = self.page_cache.get(job_link)
+        if page_html is None:
+            return None
+        extracted = extract_detail_html(page_html)
+        if extracted is None:
+            return None
+        fields, description = extracted
+        return self.parse_pool.build_job_details(fields, description, country)
 
-    def get_career_info(self, jobs_by_location, country, retries=5):
+    def fetch_job_details(self, job_link, country):
         """
-        Processes job listings by extracting detailed information for each job.
-        Uses a proxy pool to handle requests and retries on failure.
+        Fetches a job's details once, trying the static HTML first and only
+        starting a browser when the page needs JavaScript to render. With a
+        tab browser, the page loads in one of its tabs alongside the pages
+        of other scrapers.
 
         Args:
-            jobs_by_location (dict): Dictionary of jobs grouped by location.
-                Obtained from get_walmart_careers.
+            job_link (str): URL of the job details page.
             country (str): Country code for parsing addresses (e.g., 'US').
-                These are specified from the module pyap.
-            retries (int): Number of retries for each job in case of failure.
 
         Returns:
-            tuple: A tuple containing:
-                - formatted_data (list): List of jobs grouped by address.
-                - bad_data (list): List of jobs with missing or unknown
-                  addresses.
+            dict: Job details.
+
+        Raises:
+            ValueError: If the details could not be extracted.
         """
-        jobs_by_address = {}  # Dictionary to store jobs grouped by address
-        unknown_address = {}  # Dictionary to store jobs with missing addresses
-        driver = None  # Initialize the WebDriver
-        proxy_address = self.get_proxy()  # Get the first proxy from the pool
+        job_details = None
+        if self.http_fetcher:
+            if not self.proxy_address:
+                self.proxy_address = self.get_proxy()
+            with self.metrics.time("http_fetch", proxy=self.proxy_address):
+                job_details = self.http_fetcher.fetch(
+                    job_link, country, self.proxy_address
+                )
 
-        try:
-            # Iterate through each location and its associated job list
-            for area, job_list in jobs_by_location.items():
-                for job in job_list:
-                    job_link = job.get("link")  # Extract the job link
-                    title = job.get("title")  # Extract the job title
-
-                    # Skip jobs with missing data
-                    if not job_link or not title:
-                        logging.warning(f"Skipping job due to missing data: {job}")
-                        continue
-
-                    # Retry logic for extracting job details
-                    for attempt in range(retries):
-                        try:
-                            # Initialize the WebDriver if not already initialized
-                            if not driver:
-                                driver = self.proxy_driver(proxy_address)
-                                logging.info(
-                                    f"Initialized WebDriver with proxy: "
-                                    f"{proxy_address}"
-                                )
-
-                            # Extract job details from the job page
-                            logging.info(f"Extracting details for job: {title}")
-                            job_details = self.extract_job_details(
-                                driver, job_link, country
-                            )
-
-                            # If job details could not be extracted, retry
-                            if not job_details:
-                                raise ValueError(f"Failed to extract details.")
-
-                            # Extract the address from the job details
-                            address = job_details["address"]
-                            if address:
-                                # If address is found, group jobs by address
-                                for addr in address:
-                                    if addr not in jobs_by_address:
-                                        jobs_by_address[addr] = []
-                                    jobs_by_address[addr].append(
-                                        {
-                                            "job_link": job_link,
-                                            "title": title,
-                                            "description": job_details["description"],
-                                            "hourly_rate": job_details["hourly_rate"],
-                                            "salary": job_details["salary"],
-                                            "types": job_details["employment_type"],
-                                        }
-                                    )
-                                    logging.info(f"Added job to address: {addr}")
-                            else:
-                                # If no address is found, group jobs by location
-                                location = job_details["location"]
-                                if location not in unknown_address:
-                                    unknown_address[location] = []
-                                unknown_address[location].append(
-                                    {
-                                        "job_link": job_link,
-                                        "title": title,
-                                        "description": job_details["description"],
-                                        "hourly_rate": job_details["hourly_rate"],
-                                        "salary": job_details["salary"],
-                                        "types": job_details["employment_type"],
-                                    }
-                                )
-                                logging.info(f"Added job to location: {location}")
-                            break  # Break out of the retry loop if successful
-                        except Exception as e:
-                            # Log a warning if an attempt fails
-                            logging.warning(
-                                f"Attempt {attempt + 1} failed for job: "
-                                f"{job_link}. Error: {e}"
-                            )
-                            if attempt < retries - 1:
-                                # Wait before retrying (exponential backoff)
-                                backoff_time = 2 ** attempt
-                                proxy_address = self.get_proxy()
-                                if driver:
-                                    driver.quit()
-                                    driver = None
-                                logging.info(
-                                    f"Retrying in {backoff_time} seconds..."
-                                )
-                                time.sleep(backoff_time)
-                            else:
-                                # Log an error if all retries fail
-                                logging.error(
-                                    f"Failed to process job: {job_link} after "
-                                    f"{retries} retries. Skipping."
-                                )
-                                proxy_address = self.get_proxy()
-                                if driver:
-                                    driver.quit()
-                                    driver = None
-                                break
-                logging.info(f"Done with {area}")
-        finally:
-            # Ensure the WebDriver is closed after processing
-            if driver:
-                driver.quit()
-
-            # Format the data for jobs with valid addresses
-            formatted_data = [
-                {"address": address, "jobs": jobs}
-                for address, jobs in jobs_by_address.items()
-            ]
-            # Format the data for jobs with missing or unknown addresses
-            bad_data = [
-                {"location": location, "jobs": jobs}
-                for location, jobs in unknown_address.items()
-            ]
-
-            # Log the results
-            logging.info(
-                f"Formatted data: {len(formatted_data)} addresses processed."
-            )
-            logging.info(
-                f"Bad data: {len(bad_data)} locations with missing addresses."
+        if not job_details and self.tab_browser:
+            with self.metrics.time("extract_job_details", worker=self.worker):
+                fields, description = self.tab_browser.fetch(job_link)
+            job_details = self.parse_pool.build_job_details(
+                fields, description, country
             )
-            return formatted_data, bad_data
+        elif not job_details:
+            driver = self.acquire_driver()
+            with self.metrics.time("extract_job_details", worker=self.worker):
+                job_details = self.extract_job_details(driver, job_link, country)
+            self.driver = self.driver_pool.record_use(self.driver)
+
+        # If job details could not be extracted, retry
+        if not job_details:
+            raise ValueError("Failed to extract details.")
+        return job_details
+
+    def add_job(self, store, job, job_details):
+        """
+        Stores a scraped job, grouped by each of its addresses, or by its
+        location when no address was found.
+
+        Args:
+            store (JobStore): Jobs scraped so far, updated in place.
+            job (dict): Listing entry with "title" and "link".
+            job_details (dict): Output of attempt_job.
+        """
+        store.add(job, job_details)
+        if job_details["address"]:
+            logging.info(f"Added job to addresses: {job_details['address']}")
+        else:
+            logging.info(f"Added job to location: {job_details['location']}")
 
     def extract_job_details(self, driver, jobLink, country_):
         """
         Extracts job details from the job details page.
         """
         try:
+            relay_bytes = self.driver_pool.bytes_transferred(driver)
             # Navigate to the job link
-            driver.get(jobLink)
+            with self.metrics.time(
+                "page_load", kind="detail", proxy=self.proxy_address
+            ):
+                driver.get(jobLink)
 
             # Wait for the job details container to load
-            job_data = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "job-data"))
-            )
-
-            # Initialize fields
-            location = None
-            employment_type = []
-            salary = None
-            hourly_rate = None
-            description = None
-            address = []
-
-            # Extract location, position type, and other details
-            job_elements = job_data.find_elements(By.CLASS_NAME, "job-data__element")
-            for element in job_elements:
-                try:
-                    title = (
-                        element.find_element(By.CLASS_NAME, "job-data__title")
-                        .get_attribute("innerHTML")
-                        .strip()
-                    )
-                    value = (
-                        element.find_element(By.CLASS_NAME, "job-data__value")
-                        .get_attribute("innerHTML")
-                        .strip()
-                    )
+            with self.metrics.time("wait", kind="detail"):
+                WebDriverWait(driver, self.wait_time(5)).until(
+                    EC.presence_of_element_located((By.CLASS_NAME, "job-data"))
+                )
 
-                    if title == "Location":
-                        location = value
-                    elif title == "Employment Type":
-                        raw_types = html.unescape(value).split("&")
-                        for raw in raw_types:
-                            cleaned = raw.strip()
-                            if cleaned == "Regular/Permanent":
-                                cleaned = "Full Time"
-                            if cleaned == "Full":
-                                cleaned = "Full Time"
-                            employment_type.append(cleaned)
-                except Exception as e:
-                    logging.warning(f"Error extracting job element: {e}")
-
-            # Extract job description
-            job_description = driver.find_element(By.CLASS_NAME, "job-description")
-            description = job_description.text
-            address = pyap.parse(description, country=country_)
-            # Convert parsed addresses to a list of full addresses
-            if address:
-                address = [str(addr.full_address) for addr in address]
-            # Extract salary or hourly rate
-            lines = description.splitlines()
-            for i, text in enumerate(lines):
-                # Check for salary information
-                if "$" in text and "annual salary range" in text:
-                    salary = text.split("$", 1)[1].strip()
-                elif "$" in text and "hourly wage range" in text:
-                    hourly_rate = text.split("$", 1)[1].strip()
-
-                # Check for "Primary Location..." and get the next line as the address
-                if "Primary Location..." in text:
-                    if i + 1 < len(lines):  # Ensure there is a next line
-                        full_addr = lines[
-                            i + 1
-                        ].strip()  # Get the next line and strip whitespace
-                        found = False
-                        if address != []:
-                            for addr in address:
-                                if addr in full_addr:
-                                    found = True
-                        if not found:
-                            address.append(full_addr)
-
-            # Return extracted details
-            return {
-                "location": location,
-                "employment_type": employment_type,
-                "salary": salary,
-                "hourly_rate": hourly_rate,
-                "description": description,
-                "address": address,
-            }
+            # Extract location, position type, other details and the job
+            # description in one script call
+            with self.metrics.time("extract", kind="detail"):
+                extracted = self.extraction_stats.timed(
+                    "detail", extract_detail_fields, driver
+                )
+            self.record_page_bytes(driver, "detail", relay_bytes)
+            if extracted is None:
+                raise ValueError("job-data or job-description is missing")
+            fields, description = extracted
+            if self.page_cache:
+                self.page_cache.put(jobLink, driver.page_source)
+
+            # Parse the extracted fields off this thread
+            return self.parse_pool.build_job_details(fields, description, country_)
 
         except Exception as e:
             logging.error(f"Error extracting job details from {jobLink}: {e}")
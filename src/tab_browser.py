@@ -0,0 +1,300 @@
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from queue import Empty, Queue
+
+from dom_extract import poll_detail_fields, start_tab_navigation
+
+
+class TabLoadError(Exception):
+    """
+    A page could not be loaded in a TabBrowser. The browser has already
+    reported its own proxy, so the caller's proxy is not to blame.
+    """
+
+
+class TabBrowser:
+    """
+    One Chrome instance that loads several job pages at once, one per tab.
+    Scraper threads hand links to `fetch` and block on the result, while a
+    single dispatcher thread owns the WebDriver: it points free tabs at
+    queued links without waiting for the load, then polls the busy tabs in
+    turn until their job data is there. Page loads overlap inside one
+    browser process, so detail concurrency costs tabs instead of browsers.
+    All tabs share the browser's proxy. Once as many pages in a row have
+    failed as there are tabs, no new loads start until the busy tabs have
+    finished, and the proxy is switched with every tab idle.
+    """
+
+    def __init__(
+        self,
+        driver_pool,
+        get_proxy,
+        tabs=8,
+        page_timeout=20,
+        poll_interval=0.05,
+        proxy_pool=None,
+        page_cache=None,
+        metrics=None,
+        name="tabs-0",
+    ):
+        """
+        Initializes the TabBrowser instance. The browser is leased from the
+        pool when the first link arrives.
+
+        Args:
+            driver_pool (DriverPool): Pool the browser is leased from.
+            get_proxy (function): Function to retrieve a proxy.
+            tabs (int): Number of pages loading at once.
+            page_timeout (float): Seconds a tab may take to show job data.
+            poll_interval (float): Seconds to sleep when no busy tab has
+                finished in a polling round.
+            proxy_pool (ProxyPool): Optional pool that is told whether each
+                page through the browser's proxy loaded and how long it took.
+            page_cache (PageCache): Optional cache the loaded pages are
+                stored in.
+            metrics (Metrics): Optional registry for page timings and counts.
+            name (str): Name of the dispatcher thread, used in logs and as a
+                metrics label.
+        """
+        self.driver_pool = driver_pool
+        self.get_proxy = get_proxy
+        self.tabs = tabs
+        self.page_timeout = page_timeout
+        self.poll_interval = poll_interval
+        self.proxy_pool = proxy_pool
+        self.page_cache = page_cache
+        self.metrics = metrics
+        self.name = name
+        self._lock = threading.Lock()
+        self._requests = Queue()
+        self._thread = None
+        self._closed = False
+        self.driver = None
+        self.proxy_address = None
+        self._handles = []
+        self._uses = 0
+        self._failures_in_row = 0
+        self._switch_pending = False
+
+        self.pages = 0
+        self.timeouts = 0
+        self.proxy_switches = 0
+        self.crashes = 0
+        self.max_parallel = 0
+
+    def fetch(self, link):
+        """
+        Loads a job page in the next free tab and waits for its job data.
+
+        Args:
+            link (str): URL of the job details page.
+
+        Returns:
+            tuple: (fields, description) as returned by extract_detail_fields.
+
+        Raises:
+            TabLoadError: If the job data did not appear within page_timeout
+                or the browser failed while the page loaded.
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"{self.name} is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=self.name, daemon=True
+                )
+                self._thread.start()
+            self._requests.put((link, future))
+        try:
+            return future.result()
+        except Exception as e:
+            raise TabLoadError(f"{self.name} failed to load {link}: {e}") from e
+
+    def stats(self):
+        """
+        Returns:
+            dict: Pages loaded, timeouts, proxy switches, browser crashes and
+            the most pages that were loading at once.
+        """
+        with self._lock:
+            return {
+                "pages": self.pages,
+                "timeouts": self.timeouts,
+                "proxy_switches": self.proxy_switches,
+                "crashes": self.crashes,
+                "max_parallel": self.max_parallel,
+            }
+
+    def close(self):
+        """Stops the dispatcher and returns the browser to the pool."""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        self._requests.put(None)
+        if thread:
+            thread.join()
+
+    def _run(self):
+        waiting = deque()
+        busy = {}
+        closing = False
+        while not closing or waiting or busy:
+            block = not (waiting or busy)
+            closing = self._take_requests(waiting, block) or closing
+            try:
+                if not busy and self._switch_pending:
+                    self._switch_proxy()
+                if not busy and self._uses >= self.driver_pool.max_uses:
+                    self._recycle()
+                self._start_loads(waiting, busy)
+                if not self._poll(busy):
+                    time.sleep(self.poll_interval)
+            except Exception as e:
+                # The browser crashed, a tab is gone or no browser could be
+                # started: fail every page handed in, the callers retry them
+                logging.warning(f"{self.name}: browser failed: {e}")
+                self._count("crashes")
+                self._reset_driver(broken=True)
+                for link, future, started in busy.values():
+                    self._page_failed(started)
+                    future.set_exception(e)
+                busy.clear()
+                while waiting:
+                    link, future = waiting.popleft()
+                    if future.set_running_or_notify_cancel():
+                        future.set_exception(e)
+        self._reset_driver()
+
+    def _take_requests(self, waiting, block):
+        """Moves queued links to `waiting`, returns True once closed."""
+        try:
+            if block:
+                item = self._requests.get(timeout=0.5)
+            else:
+                item = self._requests.get_nowait()
+            while True:
+                if item is None:
+                    return True
+                waiting.append(item)
+                item = self._requests.get_nowait()
+        except Empty:
+            return False
+
+    def _start_loads(self, waiting, busy):
+        # A pending proxy switch waits for the busy tabs to drain
+        while waiting and len(busy) < self.tabs and not self._switch_pending:
+            handle = self._free_tab(busy)
+            link, future = waiting.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            busy[handle] = (link, future, time.monotonic())
+            self.driver.switch_to.window(handle)
+            start_tab_navigation(self.driver, link)
+        with self._lock:
+            self.max_parallel = max(self.max_parallel, len(busy))
+
+    def _free_tab(self, busy):
+        if self.driver is None:
+            self.proxy_address = self.get_proxy()
+            self.driver = self.driver_pool.acquire(self.proxy_address)
+            self._handles = [self.driver.current_window_handle]
+            logging.info(f"{self.name}: browser ready, proxy {self.proxy_address}")
+        for handle in self._handles:
+            if handle not in busy:
+                return handle
+        self.driver.switch_to.new_window("tab")
+        self.driver_pool.prepare_tab(self.driver)
+        self._handles.append(self.driver.current_window_handle)
+        return self._handles[-1]
+
+    def _poll(self, busy):
+        """Checks every busy tab once, returns True if any finished."""
+        finished = False
+        for handle, (link, future, started) in list(busy.items()):
+            self.driver.switch_to.window(handle)
+            extracted = poll_detail_fields(self.driver, bool(self.page_cache))
+            if extracted is not None:
+                del busy[handle]
+                finished = True
+                fields, description, page_html = extracted
+                if self.page_cache:
+                    self.page_cache.put(link, page_html)
+                self._page_loaded(started)
+                future.set_result((fields, description))
+            elif time.monotonic() - started > self.page_timeout:
+                del busy[handle]
+                finished = True
+                self._count("timeouts")
+                self._page_failed(started)
+                future.set_exception(
+                    TimeoutError(f"No job data on {link} after {self.page_timeout}s")
+                )
+        return finished
+
+    def _page_loaded(self, started):
+        elapsed = time.monotonic() - started
+        self._uses += 1
+        self._failures_in_row = 0
+        self._count("pages")
+        if self.metrics:
+            self.metrics.observe(
+                "stage_seconds", elapsed, stage="tab_load", proxy=self.proxy_address
+            )
+        if self.proxy_pool and self.proxy_address:
+            self.proxy_pool.report_success(self.proxy_address, elapsed)
+
+    def _page_failed(self, started):
+        if self.metrics:
+            self.metrics.count(
+                "stage_errors", stage="tab_load", proxy=self.proxy_address
+            )
+        if self.proxy_pool and self.proxy_address:
+            self.proxy_pool.report_failure(self.proxy_address)
+        self._failures_in_row += 1
+        if self.driver is not None and self._failures_in_row >= self.tabs:
+            # Switching or relaunching now would fail the pages still
+            # loading in the other tabs, _run switches once they are done
+            self._switch_pending = True
+
+    def _switch_proxy(self):
+        self._switch_pending = False
+        self._failures_in_row = 0
+        if self.driver is None:
+            # The browser crashed meanwhile, the next one gets a new proxy
+            return
+        self.proxy_address = self.get_proxy()
+        driver = self.driver_pool.switch_proxy(self.driver, self.proxy_address)
+        if driver is not self.driver:
+            # Relaunched, the extra tabs went with the old browser
+            self.driver = driver
+            self._handles = [driver.current_window_handle]
+        self._count("proxy_switches")
+        logging.info(f"{self.name}: switched proxy to {self.proxy_address}")
+
+    def _recycle(self):
+        logging.info(f"{self.name}: recycling browser after {self._uses} pages")
+        self._reset_driver(broken=True)
+
+    def _reset_driver(self, broken=False):
+        if self.driver is not None:
+            if not broken:
+                # Hand the browser back with a single tab
+                try:
+                    for handle in self._handles[1:]:
+                        self.driver.switch_to.window(handle)
+                        self.driver.close()
+                    self.driver.switch_to.window(self._handles[0])
+                except Exception:
+                    broken = True
+            self.driver_pool.release(self.driver, broken=broken)
+        self.driver = None
+        self._handles = []
+        self._uses = 0
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
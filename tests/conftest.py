@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+sys.path.insert(0, SRC)
+
+
+def read_fixture(name):
+    """
+    Args:
+        name (str): File name in tests/fixtures.
+
+    Returns:
+        str: The captured response body.
+    """
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class CannedServer:
+    """
+    Local HTTP server that answers every path with a canned response, also
+    when it is used as a proxy (the request line then carries the full URL).
+    Routes map a path to (status, body, content_type, delay) and can be
+    changed while the server runs.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.headers = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                server.requests.append(self.path)
+                server.headers.append(dict(self.headers))
+                status, body, content_type, delay = server.routes.get(
+                    path, (404, "Not found", "text/plain", 0)
+                )
+                if delay:
+                    time.sleep(delay)
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+
+    def route(self, path, status=200, body="", content_type="text/html", delay=0):
+        self.routes[path] = (status, body, content_type, delay)
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def canned_server():
+    server = CannedServer()
+    yield server
+    server.close()
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+import async_engine
+from async_engine import LISTING_PAGES_AHEAD, AsyncScraper, aio_scrape
+from detail_fetcher import extract_detail_html
+from mock_site import MockCareersSite, MockSiteConfig
+
+
+@pytest.fixture
+def site():
+    site = MockCareersSite(MockSiteConfig(pages=3, jobs_per_page=4, latency=0, jitter=0))
+    yield site
+    site.close()
+
+
+def test_stops_listing_at_the_last_page(site):
+    total_pages = LISTING_PAGES_AHEAD * 3
+
+    store = aio_scrape(
+        total_pages,
+        10,
+        [site.start_proxy()],
+        "IT",
+        base_url=site.base_url,
+        parse_workers=0,
+    )
+
+    assert len(store.jobs) == site.total_jobs()
+    listing = site.page_stats()["listing"]
+    assert len(listing["latencies"]) + listing["failed"] <= LISTING_PAGES_AHEAD
+
+
+class RecordingWriter:
+    """Job stream stand-in that sets `written` on its first job."""
+
+    def __init__(self):
+        self.links = []
+        self.written = asyncio.Event()
+
+    def is_done(self, job_link):
+        return False
+
+    def write(self, job, job_details):
+        self.links.append(job["link"])
+        self.written.set()
+
+
+def test_jobs_are_written_while_listing_continues(site, monkeypatch):
+    writer = RecordingWriter()
+    scrape_listing = AsyncScraper._scrape_listing
+
+    async def slow_last_page(self, session, page_url):
+        # Holds the listing loop open until a job was written
+        if "page=3" in page_url:
+            await asyncio.wait_for(writer.written.wait(), 5)
+        return await scrape_listing(self, session, page_url)
+
+    monkeypatch.setattr(AsyncScraper, "_scrape_listing", slow_last_page)
+
+    aio_scrape(
+        3,
+        10,
+        [site.start_proxy()],
+        "IT",
+        job_writer=writer,
+        base_url=site.base_url,
+        parse_workers=0,
+    )
+
+    assert len(set(writer.links)) == site.total_jobs()
+
+
+def test_job_that_raises_is_retried(site, monkeypatch):
+    raised = []
+
+    def flaky_extract(page_html):
+        if not raised:
+            raised.append(True)
+            raise ValueError("unexpected markup")
+        return extract_detail_html(page_html)
+
+    monkeypatch.setattr(async_engine, "extract_detail_html", flaky_extract)
+
+    store = aio_scrape(
+        3, 10, [site.start_proxy()], "IT", base_url=site.base_url, parse_workers=0
+    )
+
+    assert raised
+    assert len(store.jobs) == site.total_jobs()
@@ -0,0 +1,40 @@
+from checkpoint import Checkpoint
+from listing_fetcher import build_listing_url
+
+
+def test_resume_skips_finished_listing_urls(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    params = {"engine": "asyncio", "pages": 2, "queries": [["IT", "all", None]]}
+    pages = [build_listing_url("IT", page) for page in (1, 2)]
+    checkpoint = Checkpoint(path, params)
+    checkpoint.mark_page(pages[0], [{"title": "Engineer", "link": "/us/jobs/WD1"}])
+    checkpoint.save()
+
+    resumed = Checkpoint.load(path, params)
+
+    assert resumed.pending_pages(pages) == pages[1:]
+    assert resumed.pending_jobs() == [{"title": "Engineer", "link": "/us/jobs/WD1"}]
+
+
+def test_checkpoint_of_other_engine_is_not_resumed(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    params = {"engine": "threads", "pages": 2, "queries": [["IT", "all", None]]}
+    checkpoint = Checkpoint(path, params)
+    checkpoint.mark_page(build_listing_url("IT", 1), [])
+    checkpoint.save()
+
+    resumed = Checkpoint.load(path, {**params, "engine": "asyncio"})
+
+    assert not resumed.pages_done
+
+
+def test_resume_keeps_the_start_of_the_first_run(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    params = {"engine": "threads", "pages": 2, "queries": [["IT", "all", None]]}
+    checkpoint = Checkpoint(path, params)
+    checkpoint.started = 1000.0
+    checkpoint.save()
+
+    resumed = Checkpoint.load(path, params)
+
+    assert resumed.started == 1000.0
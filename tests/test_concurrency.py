@@ -0,0 +1,67 @@
+import pytest
+
+from concurrency import AdaptiveLimiter
+
+
+def run_window(limiter, latency, failures=0):
+    for i in range(limiter.window):
+        limiter.record(latency, failed=i < failures)
+
+
+def test_healthy_windows_raise_the_limit_by_one():
+    limiter = AdaptiveLimiter("detail", 10, initial=4, window=5)
+
+    run_window(limiter, 0.2)
+    run_window(limiter, 0.2)
+
+    assert limiter.limit == 6
+    assert limiter.baseline == 0.2
+
+
+def test_errors_above_the_rate_halve_the_limit():
+    limiter = AdaptiveLimiter("detail", 10, initial=8, window=5, max_error_rate=0.2)
+
+    run_window(limiter, 0.2, failures=1)
+    assert limiter.limit == 9
+    run_window(limiter, 0.2, failures=2)
+
+    assert limiter.limit == 4
+
+
+def test_slow_window_halves_the_limit():
+    limiter = AdaptiveLimiter("detail", 16, initial=8, window=5, latency_factor=2.0)
+    run_window(limiter, 0.2)
+
+    run_window(limiter, 0.4)
+    assert limiter.limit == 10
+    run_window(limiter, 0.5)
+
+    assert limiter.limit == 5
+
+
+def test_limit_stays_between_floor_and_ceiling():
+    limiter = AdaptiveLimiter("listing", 3, initial=2, minimum=2, window=4)
+
+    for _ in range(3):
+        run_window(limiter, 0.2)
+    assert limiter.limit == 3
+    for _ in range(3):
+        run_window(limiter, 0.2, failures=4)
+
+    assert limiter.limit == 2
+    assert limiter.stats() == {
+        "limit": 2,
+        "min_limit": 2,
+        "max_limit": 3,
+        "decisions": 6,
+    }
+
+
+def test_failed_slot_counts_as_error():
+    limiter = AdaptiveLimiter("detail", 4, initial=2, window=1)
+
+    with pytest.raises(ValueError):
+        with limiter.slot():
+            raise ValueError("blocked")
+
+    assert limiter.limit == 1
@@ -0,0 +1,48 @@
+import json
+
+from conftest import read_fixture
+from detail_fetcher import extract_detail_html, parse_detail_html
+from dom_extract import _detail_result
+from parsing import build_job_details
+
+
+def browser_result():
+    """What _DETAIL_SCRIPT returns for job_detail.html in Chrome."""
+    return json.loads(read_fixture("job_detail_browser.json"))
+
+
+def test_static_html_matches_browser_extraction():
+    extracted = extract_detail_html(read_fixture("job_detail.html"))
+
+    assert extracted == _detail_result(browser_result())
+
+
+def test_static_html_builds_the_same_job_details():
+    fields, description = _detail_result(browser_result())
+
+    assert parse_detail_html(read_fixture("job_detail.html"), "US") == (
+        build_job_details(fields, description, "US")
+    )
+
+
+def test_containers_with_extra_classes_are_found():
+    fields, description = extract_detail_html(read_fixture("job_detail.html"))
+
+    assert ("Location", "Bentonville, AR") in fields
+    assert description.startswith("What you'll do...")
+
+
+def test_inline_markup_stays_on_its_line():
+    page_html = (
+        '<div class="job-data"></div>'
+        '<div class="job-description"><p>Own <b>on</b>-call\n  rotations'
+        "<!-- note --></p>Team<br>Remote</div>"
+    )
+
+    _, description = extract_detail_html(page_html)
+
+    assert description == "Own on-call rotations\nTeam\nRemote"
+
+
+def test_page_without_job_data_needs_the_browser():
+    assert extract_detail_html("<html><body><div id='app'></div></body></html>") is None
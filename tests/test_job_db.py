@@ -0,0 +1,68 @@
+import json
+import sqlite3
+
+from job_db import SCHEMA, JobDatabase
+from job_stream import stream_record
+
+
+def job_entry(number):
+    job = {"title": f"Engineer {number}", "link": f"/us/jobs/WD{number}-engineer"}
+    job_details = {
+        "description": "About the job",
+        "hourly_rate": None,
+        "salary": "$90,000.00 - $120,000.00",
+        "employment_type": ["Full Time"],
+        "address": ["702 SW 8th St, Bentonville, AR 72716"],
+        "location": "Bentonville, AR",
+    }
+    return job, job_details
+
+
+def test_failed_batch_stays_buffered_for_next_flush(tmp_path):
+    job_db = JobDatabase(str(tmp_path / "jobs.db"), batch_size=2)
+    job_db._conn.execute(
+        "CREATE TRIGGER reject BEFORE INSERT ON jobs "
+        "BEGIN SELECT RAISE(ABORT, 'disk full'); END"
+    )
+    job_db.write(*job_entry(1))
+    job_db.write(*job_entry(2))
+    # The failed batch is not retried on every following job
+    job_db.write(*job_entry(3))
+
+    assert job_db.stats() == {"written": 0, "batches": 0, "failed_batches": 1}
+    job_db._conn.execute("DROP TRIGGER reject")
+    assert job_db.count() == 3
+    assert job_db.stats() == {"written": 3, "batches": 1, "failed_batches": 1}
+    job_db.close()
+
+
+def test_search_endpoint_fields_reach_stream_and_database(tmp_path):
+    job, job_details = job_entry(1)
+    job["listing"] = {"department": "Information Technology", "rate": "Salary"}
+    stream_path = str(tmp_path / "jobs.ndjson")
+    with open(stream_path, "w", encoding="utf-8") as file:
+        file.write(json.dumps(stream_record(job, job_details)) + "\n")
+    job_db = JobDatabase(str(tmp_path / "jobs.db"))
+
+    assert job_db.import_stream(stream_path) == 1
+
+    [stored] = job_db.find(location="Bentonville, AR")
+    assert stored["listing"] == job["listing"]
+    # A later fetch without the endpoint keeps the stored fields
+    job_db.write(*job_entry(1))
+    [stored] = job_db.find(location="Bentonville, AR")
+    assert stored["listing"] == job["listing"]
+    job_db.close()
+
+
+def test_database_without_listing_column_is_migrated(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA.replace("    listing TEXT,\n", ""))
+    conn.close()
+
+    job_db = JobDatabase(path)
+    job_db.write(*job_entry(1))
+
+    assert job_db.count() == 1
+    job_db.close()
@@ -0,0 +1,60 @@
+import sqlite3
+
+from job_index import JobIndex
+
+
+def job_entry(number, salary="$90,000.00 - $120,000.00"):
+    job = {"title": f"Engineer {number}", "link": f"/us/jobs/WD{number}-engineer"}
+    job_details = {
+        "description": "About the job",
+        "hourly_rate": None,
+        "salary": salary,
+        "employment_type": ["Full Time"],
+        "address": [],
+        "location": "Bentonville, AR",
+    }
+    return job, job_details
+
+
+def test_delta_since_run_start_spans_a_restart(tmp_path, monkeypatch):
+    path = str(tmp_path / "seen_jobs.sqlite3")
+    now = [1000.0]
+    monkeypatch.setattr("job_index.time.time", lambda: now[0])
+    previous_run = JobIndex(path)
+    previous_run.record(*job_entry(1))
+    previous_run.record(*job_entry(2))
+    previous_run.close()
+
+    now[0] = 2000.0
+    crashed = JobIndex(path)
+    crashed.record(*job_entry(1))
+    crashed.record(*job_entry(2, salary="$100,000.00 - $130,000.00"))
+    crashed.record(*job_entry(3))
+    crashed.close()
+    resumed = JobIndex(path)
+    resumed.record(*job_entry(4))
+
+    assert resumed.delta_ids() == {"WD4"}
+    assert resumed.delta_ids(since=2000.0) == {"WD2", "WD3", "WD4"}
+
+
+def test_index_without_change_times_is_migrated(tmp_path):
+    path = str(tmp_path / "seen_jobs.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE jobs (job_id TEXT PRIMARY KEY, job_link TEXT NOT NULL, "
+        "title TEXT NOT NULL, details TEXT NOT NULL, content_hash TEXT NOT NULL, "
+        "first_seen REAL NOT NULL, last_seen REAL NOT NULL, "
+        "last_fetched REAL NOT NULL)"
+    )
+    conn.execute(
+        "INSERT INTO jobs VALUES ('WD1', '/us/jobs/WD1', 'Engineer 1', '{}', "
+        "'hash', 1, 1, 1)"
+    )
+    conn.commit()
+    conn.close()
+
+    index = JobIndex(path)
+    index.record(*job_entry(2))
+
+    assert index.delta_ids(since=0.5) == {"WD2"}
@@ -0,0 +1,90 @@
+import json
+import os
+
+from job_stream import JobStreamWriter, compact_stream, stream_record
+
+
+def job_entry(number, title="Engineer", addresses=(), location="Bentonville, AR"):
+    job = {"title": f"{title} {number}", "link": f"/us/jobs/WD{number}-engineer"}
+    job_details = {
+        "description": "About the job",
+        "hourly_rate": None,
+        "salary": "$90,000.00 - $120,000.00",
+        "employment_type": ["Full Time"],
+        "address": list(addresses),
+        "location": location,
+    }
+    return job, job_details
+
+
+def test_close_publishes_the_part_file(tmp_path):
+    path = str(tmp_path / "jobs.ndjson")
+    writer = JobStreamWriter(path)
+    writer.write(*job_entry(1))
+
+    assert os.path.exists(path + ".part") and not os.path.exists(path)
+    writer.close()
+
+    assert not os.path.exists(path + ".part")
+    with open(path, encoding="utf-8") as file:
+        assert [json.loads(line)["title"] for line in file] == ["Engineer 1"]
+
+
+def test_resume_cuts_a_torn_last_line(tmp_path):
+    path = str(tmp_path / "jobs.ndjson")
+    writer = JobStreamWriter(path)
+    writer.write(*job_entry(1))
+    writer._file.write('{"jobLink": "/us/jobs/WD2-engin')
+    writer._file.flush()
+    # Crashed without close, the .part file is left behind
+
+    resumed = JobStreamWriter(path)
+
+    assert resumed.is_done("/us/jobs/WD1-engineer")
+    assert not resumed.is_done("/us/jobs/WD2-engineer")
+    resumed.write(*job_entry(1))
+    resumed.write(*job_entry(2))
+    resumed.close()
+    with open(path, encoding="utf-8") as file:
+        assert [json.loads(line)["title"] for line in file] == [
+            "Engineer 1",
+            "Engineer 2",
+        ]
+
+
+def test_without_resume_a_part_file_is_started_over(tmp_path):
+    path = str(tmp_path / "jobs.ndjson")
+    crashed = JobStreamWriter(path)
+    crashed.write(*job_entry(1))
+    crashed._file.close()
+
+    writer = JobStreamWriter(path, resume=False)
+    writer.close()
+
+    with open(path, encoding="utf-8") as file:
+        assert file.read() == ""
+
+
+def test_compaction_keeps_the_latest_record_per_link(tmp_path):
+    path = str(tmp_path / "jobs.ndjson")
+    address = "702 SW 8th St, Bentonville, AR 72716"
+    records = [
+        stream_record(*job_entry(1, addresses=[address])),
+        stream_record(*job_entry(2)),
+        # Written again by a later run, with new data
+        stream_record(*job_entry(1, title="Staff Engineer", addresses=[address])),
+    ]
+    with open(path, "w", encoding="utf-8") as file:
+        file.writelines(json.dumps(record) + "\n" for record in records)
+    formatted_path = str(tmp_path / "formatted.json")
+    bad_path = str(tmp_path / "bad.json")
+
+    counts = compact_stream(path, formatted_path, bad_path)
+
+    assert counts == (1, 1)
+    with open(formatted_path, encoding="utf-8") as file:
+        formatted = json.load(file)
+    assert [job["title"] for job in formatted[0]["jobs"]] == ["Staff Engineer 1"]
+    with open(bad_path, encoding="utf-8") as file:
+        assert json.load(file)[0]["location"] == "Bentonville, AR"
+    assert not os.path.exists(formatted_path + ".tmp")
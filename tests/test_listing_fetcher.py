@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+from conftest import read_fixture
+from listing_fetcher import (
+    ApiListingFetcher,
+    SEARCH_API_PATH,
+    build_listing_url,
+    build_search_api_url,
+    parse_cached_listing,
+    parse_search_json,
+)
+
+
+@pytest.fixture
+def page_url(canned_server):
+    return build_listing_url("IT", 1, base_url=canned_server.url + "/results")
+
+
+def test_parse_search_json_reads_rows_and_expanded_fields(page_url):
+    payload = json.loads(read_fixture("search_page.json"))
+
+    jobs = parse_search_json(payload, page_url)
+
+    assert len(jobs) == 3
+    location, job = jobs[0]
+    assert location == "Bentonville, AR"
+    assert job == {
+        "title": "Software Engineer III",
+        "link": page_url.split("/results")[0]
+        + "/us/jobs/WD1000000-software-engineer-iii",
+        "listing": {
+            "department": "Information Technology",
+            "brand": "Walmart",
+            "type": "Full Time",
+            "rate": "Salary",
+        },
+    }
+
+
+def test_parse_search_json_rejects_other_shapes(page_url):
+    payload = json.loads(read_fixture("search_other_shape.json"))
+
+    assert parse_search_json(payload, page_url) is None
+
+
+def test_build_search_api_url_keeps_query_and_sorts(page_url):
+    url = build_search_api_url(page_url, date_sort=True)
+
+    assert SEARCH_API_PATH + "?" in url
+    assert "q=IT" in url and "page=1" in url and "sort=date" in url
+
+
+def test_fetch_reads_captured_response(canned_server, page_url):
+    canned_server.route(
+        SEARCH_API_PATH, body=read_fixture("search_page.json"),
+        content_type="application/json",
+    )
+    fetcher = ApiListingFetcher(timeout=5)
+
+    jobs, total = fetcher.fetch(page_url)
+
+    assert total == 6
+    assert [job["title"] for _, job in jobs][:2] == [
+        "Software Engineer III",
+        "Senior Data Engineer",
+    ]
+    assert fetcher.stats() == {"api_hits": 1, "browser_fallbacks": 0}
+
+
+@pytest.mark.parametrize("status", [403, 429, 500, 503])
+def test_fetch_error_status_falls_back_for_that_page(canned_server, page_url, status):
+    canned_server.route(SEARCH_API_PATH, status, read_fixture("search_blocked.html"))
+    fetcher = ApiListingFetcher(timeout=5)
+
+    assert fetcher.fetch(page_url) is None
+    # The endpoint stays on, the next page tries it again
+    assert fetcher.available
+    canned_server.route(
+        SEARCH_API_PATH, body=read_fixture("search_page.json"),
+        content_type="application/json",
+    )
+    assert fetcher.fetch(page_url) is not None
+    assert fetcher.stats() == {"api_hits": 1, "browser_fallbacks": 1}
+
+
+@pytest.mark.parametrize(
+    "status, body",
+    [
+        (404, "Not found"),
+        (200, read_fixture("search_blocked.html")),
+        (200, read_fixture("search_other_shape.json")),
+    ],
+)
+def test_fetch_turns_off_when_endpoint_is_unusable(canned_server, page_url, status, body):
+    canned_server.route(SEARCH_API_PATH, status, body)
+    fetcher = ApiListingFetcher(timeout=5)
+
+    assert fetcher.fetch(page_url) is None
+    assert not fetcher.available
+    requests_sent = len(canned_server.requests)
+    assert fetcher.fetch(page_url) is None
+    assert len(canned_server.requests) == requests_sent
+
+
+def test_parse_cached_listing_reads_stored_json(page_url):
+    jobs, total = parse_cached_listing(read_fixture("search_page.json"), page_url)
+
+    assert total == 6
+    assert len(jobs) == 3
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+import page_cache
+from page_cache import PageCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(page_cache.time, "time", lambda: now[0])
+    return now
+
+
+def bodies(directory):
+    return sorted(
+        name
+        for _, _, names in os.walk(directory)
+        for name in names
+        if not name.startswith("index.sqlite3")
+    )
+
+
+def test_pages_expire_after_the_ttl(tmp_path, clock):
+    cache = PageCache(str(tmp_path), ttl=60)
+    cache.put("/us/jobs/WD1", "<html>job</html>")
+
+    clock[0] += 59
+    assert cache.get("/us/jobs/WD1") == "<html>job</html>"
+    clock[0] += 1
+    assert cache.get("/us/jobs/WD1") is None
+
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "stores": 1,
+        "evictions": 0,
+        "bytes": 0,
+    }
+    assert bodies(tmp_path) == []
+
+
+def test_least_recently_used_pages_are_evicted(tmp_path, clock):
+    cache = PageCache(str(tmp_path), max_bytes=20)
+    for number in range(1, 3):
+        cache.put(f"/us/jobs/WD{number}", f"job page {number}")
+        clock[0] += 1
+    # Reading WD1 makes WD2 the least recently used page
+    assert cache.get("/us/jobs/WD1") == "job page 1"
+    clock[0] += 1
+
+    cache.put("/us/jobs/WD3", "job page 3")
+
+    assert cache.get("/us/jobs/WD2") is None
+    assert cache.get("/us/jobs/WD1") == "job page 1"
+    assert cache.get("/us/jobs/WD3") == "job page 3"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 20
+
+
+def test_identical_bodies_are_stored_once(tmp_path, clock):
+    cache = PageCache(str(tmp_path))
+    cache.put("/us/jobs/WD1", "same page")
+    cache.put("/us/jobs/WD1?utm=mail", "same page")
+
+    assert len(bodies(tmp_path)) == 1
+    assert cache.stats()["bytes"] == len("same page")
+
+    # The body stays while another URL still uses it
+    cache.put("/us/jobs/WD1", "new page")
+    assert cache.get("/us/jobs/WD1?utm=mail") == "same page"
+    assert len(bodies(tmp_path)) == 2
+
+
+def test_index_survives_a_restart(tmp_path, clock):
+    cache = PageCache(str(tmp_path))
+    cache.put("/us/jobs/WD1", "job page")
+    cache.close()
+
+    reopened = PageCache(str(tmp_path))
+
+    assert reopened.get("/us/jobs/WD1") == "job page"
+    assert reopened.stats()["bytes"] == len("job page")
@@ -0,0 +1,101 @@
+import socket
+import time
+
+import pytest
+
+from conftest import CannedServer
+from proxy_check import ProxyValidator
+from proxy_pool import ProxyPool
+
+CHECK_URL = "http://careers.example/robots.txt"
+
+
+def closed_port_proxy():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+@pytest.fixture
+def proxies():
+    """Local stand-ins for a good, a failing and a too slow proxy."""
+    servers = {name: CannedServer() for name in ("good", "failing", "slow")}
+    servers["good"].route("/robots.txt", body="User-agent: *")
+    servers["failing"].route("/robots.txt", 502, "Bad gateway")
+    servers["slow"].route("/robots.txt", body="User-agent: *", delay=1)
+    yield servers
+    for server in servers.values():
+        server.close()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def quarantined(pool):
+    return {stats["address"] for stats in pool.stats() if stats["quarantines"]}
+
+
+def test_validate_keeps_live_proxies_fastest_first(proxies):
+    proxies["slow"].route("/robots.txt", body="User-agent: *", delay=0.2)
+    dead = closed_port_proxy()
+    validator = ProxyValidator(CHECK_URL, timeout=2)
+
+    live = validator.validate(
+        [proxies["slow"].url, dead, proxies["good"].url, proxies["failing"].url]
+    )
+
+    assert [proxy for proxy, _ in live] == [proxies["good"].url, proxies["slow"].url]
+    assert live[0][1] < live[1][1]
+    assert validator.stats() == {"rounds": 1, "probes": 4, "live": 2}
+
+
+def test_refresh_adds_live_and_quarantines_dead_proxies(proxies):
+    candidates = [server.url for server in proxies.values()]
+    pool = ProxyPool(candidates)
+    validator = ProxyValidator(CHECK_URL, timeout=0.5)
+
+    live = validator.refresh(pool, candidates)
+
+    assert [proxy for proxy, _ in live] == [proxies["good"].url]
+    assert quarantined(pool) == {proxies["failing"].url, proxies["slow"].url}
+    assert pool.get() == proxies["good"].url
+    good = next(s for s in pool.stats() if s["address"] == proxies["good"].url)
+    assert good["probe_latency"] is not None
+
+
+def test_refresh_fills_an_empty_pool(proxies):
+    pool = ProxyPool([])
+    candidates = [proxies["good"].url, proxies["failing"].url]
+
+    ProxyValidator(CHECK_URL, timeout=0.5).refresh(pool, candidates)
+
+    assert len(pool) == 1
+    assert pool.get() == proxies["good"].url
+
+
+def test_watch_tracks_proxies_that_die_and_recover(proxies):
+    good, failing = proxies["good"].url, proxies["failing"].url
+    pool = ProxyPool([])
+    validator = ProxyValidator(CHECK_URL, timeout=0.5)
+    validator.refresh(pool, [good, failing])
+
+    validator.watch(pool, [good, failing], interval=0.05)
+    try:
+        # The failing proxy comes back and is added in a later round
+        proxies["failing"].route("/robots.txt", body="User-agent: *")
+        assert wait_for(lambda: len(pool) == 2)
+        # The good one goes down and is quarantined
+        proxies["good"].route("/robots.txt", 503, "Unavailable")
+        assert wait_for(lambda: good in quarantined(pool))
+    finally:
+        validator.stop()
+
+    rounds = validator.stats()["rounds"]
+    time.sleep(0.2)
+    assert validator.stats()["rounds"] <= rounds + 1
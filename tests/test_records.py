@@ -0,0 +1,52 @@
+from records import JobStore
+
+
+def job_entry(number, addresses, location="Bentonville, AR"):
+    job = {"title": f"Engineer {number}", "link": f"/us/jobs/WD{number}-engineer"}
+    job_details = {
+        "description": "About the job",
+        "hourly_rate": None,
+        "salary": "$90,000.00 - $120,000.00",
+        "employment_type": ["Full Time"],
+        "address": addresses,
+        "location": location,
+    }
+    return job, job_details
+
+
+def test_job_at_several_addresses_is_stored_once():
+    store = JobStore()
+    addresses = [
+        "702 SW 8th St, Bentonville, AR 72716",
+        "680 W California Ave, Sunnyvale, CA 94086",
+    ]
+
+    store.add(*job_entry(1, addresses))
+    store.add(*job_entry(1, addresses))
+    store.add(*job_entry(2, []))
+
+    assert len(store) == 2
+    assert list(store.by_address.values()) == [["WD1"], ["WD1"]]
+    assert store.by_location == {"Bentonville, AR": ["WD2"]}
+
+
+def test_merge_keeps_the_groups_of_known_jobs():
+    store, other = JobStore(), JobStore()
+    store.add(*job_entry(1, []))
+    other.add(*job_entry(1, [], location="Dallas, TX"))
+    other.add(*job_entry(2, [], location="Dallas, TX"))
+
+    store.merge(other)
+
+    assert store.by_location == {"Bentonville, AR": ["WD1"], "Dallas, TX": ["WD2"]}
+
+
+def test_tag_queries_merges_labels():
+    store = JobStore()
+    job, job_details = job_entry(1, [])
+    store.add({**job, "queries": ["IT"]}, job_details)
+
+    store.tag_queries({job["link"]: ["Data", "IT"], "/us/jobs/WD9-streamed": ["IT"]})
+
+    assert store.jobs["WD1"].queries == ("Data", "IT")
+    assert store.queries["/us/jobs/WD9-streamed"] == ["IT"]
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+import retry
+from retry import RetryQueue
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(retry.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_backoff_doubles_up_to_the_cap_with_half_jitter(monkeypatch):
+    queue = RetryQueue(base_delay=1.0, max_delay=8.0)
+    monkeypatch.setattr(retry.random, "uniform", lambda low, high: high)
+    assert [queue.backoff(failures) for failures in range(1, 6)] == [1, 2, 4, 8, 8]
+
+    monkeypatch.setattr(retry.random, "uniform", lambda low, high: low)
+    assert [queue.backoff(failures) for failures in range(1, 6)] == [0.5, 1, 2, 4, 4]
+
+
+def test_items_come_back_in_due_order(clock, monkeypatch):
+    queue = RetryQueue(max_attempts=5, base_delay=1.0)
+    monkeypatch.setattr(retry.random, "uniform", lambda low, high: 0)
+    queue.schedule("job", "a", "a")
+    queue.schedule("page", 3, 3)
+    assert queue.pop_due("job") is None
+    assert queue.wait_time("job") == 0.5
+    clock[0] += 0.5
+    assert queue.pop_due("job") == "a"
+
+    # The second failure of "a" waits longer than the first one of "b"
+    queue.schedule("job", "a", "a")
+    queue.schedule("job", "b", "b")
+    clock[0] += 0.5
+    assert queue.pop_due("job") == "b"
+    assert queue.pop_due("job") is None
+    clock[0] += 0.5
+    assert queue.pop_due("job") == "a"
+    assert queue.wait_time("job") is None
+    assert queue.pending("page") == 1
+
+
+def test_used_up_attempts_go_to_dead_letters(clock):
+    queue = RetryQueue(max_attempts=3)
+
+    assert queue.schedule("job", "a", {"link": "a"}, ValueError("timeout"))
+    assert queue.schedule("job", "a", {"link": "a"}, ValueError("timeout"))
+    assert not queue.schedule("job", "a", {"link": "a"}, ValueError("blocked"))
+
+    assert queue.dead_letters == [
+        {
+            "kind": "job",
+            "key": "a",
+            "item": {"link": "a"},
+            "attempts": 3,
+            "error": "blocked",
+        }
+    ]
+    assert queue.stats() == {"retried": 2, "pending": 2, "dead_letters": 1}
+
+
+def test_export_writes_dead_letters(tmp_path):
+    queue = RetryQueue(max_attempts=1)
+    queue.schedule("page", 7, 7)
+    path = tmp_path / "dead_letters.json"
+
+    queue.export(str(path))
+
+    assert json.loads(path.read_text(encoding="utf-8")) == [
+        {"kind": "page", "key": 7, "item": 7, "attempts": 1, "error": None}
+    ]
@@ -0,0 +1,60 @@
+from scheduler import LastPageTracker, WorkScheduler
+
+
+def listing(*links):
+    return [("Bentonville, AR", {"title": "Engineer", "link": link}) for link in links]
+
+
+def test_single_empty_page_does_not_end_search():
+    tracker = LastPageTracker(empty_pages=2)
+
+    tracker.report(None, 3, [])
+
+    assert tracker.last_page(None) is None
+    assert not tracker.past_end(None, 10)
+
+
+def test_empty_pages_in_a_row_end_search_in_any_order():
+    tracker = LastPageTracker(empty_pages=2)
+    tracker.report(None, 1, listing("a"))
+
+    tracker.report(None, 6, [])
+    tracker.report(None, 4, [])
+    assert tracker.last_page(None) is None
+    tracker.report(None, 5, [])
+
+    assert tracker.last_page(None) == 3
+    assert tracker.past_end(None, 4)
+
+
+def test_listed_page_after_empty_run_keeps_search_going():
+    tracker = LastPageTracker(empty_pages=2)
+    tracker.report(None, 5, listing("a"))
+
+    tracker.report(None, 2, [])
+    tracker.report(None, 3, [])
+
+    assert tracker.last_page(None) is None
+
+
+def test_result_count_and_repeated_listings_end_search():
+    tracker = LastPageTracker()
+    tracker.report("IT", 1, listing("a", "b"), total=7)
+    assert tracker.last_page("IT") == 4
+
+    tracker.report("IT", 2, listing("c", "d"))
+    tracker.report("IT", 3, listing("c", "d"))
+    assert tracker.last_page("IT") == 2
+    assert tracker.last_page("Data") is None
+
+
+def test_scheduler_skips_pages_past_the_end():
+    scheduler = WorkScheduler(range(1, 6), listing_workers=1)
+    assert scheduler.next_page() == 1
+    assert scheduler.next_page() == 2
+    assert scheduler.next_page() == 3
+    scheduler.report_page(2, [])
+    scheduler.report_page(3, [])
+
+    assert scheduler.next_page() is None
+    assert scheduler.skipped_pages == 2
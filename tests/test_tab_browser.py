@@ -0,0 +1,130 @@
+import threading
+import time
+
+import pytest
+
+from tab_browser import TabBrowser, TabLoadError
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current_window_handle = handle
+
+    def new_window(self, kind):
+        handle = f"tab-{len(self.driver.urls)}"
+        self.driver.urls[handle] = None
+        self.driver.current_window_handle = handle
+
+
+class FakeDriver:
+    """
+    Browser whose tabs show job data once `ready(url)` says so. Loaded
+    pages and proxy switches go to `events` from the dispatcher thread.
+    """
+
+    def __init__(self, ready, events):
+        self.ready = ready
+        self.events = events
+        self.urls = {"tab-0": None}
+        self.current_window_handle = "tab-0"
+        self.switch_to = FakeSwitchTo(self)
+
+    def execute_script(self, script, *args):
+        if "location.href" in script:
+            self.urls[self.current_window_handle] = args[0]
+            return None
+        url = self.urls[self.current_window_handle]
+        if url is None or not self.ready(url):
+            return None
+        self.events.append(("loaded", url))
+        return {"fields": [["Location", url]], "description": "About the job"}
+
+
+class FakeDriverPool:
+    max_uses = 1000
+
+    def __init__(self, ready, events):
+        self.ready = ready
+        self.events = events
+
+    def acquire(self, proxy_address):
+        return FakeDriver(self.ready, self.events)
+
+    def prepare_tab(self, driver):
+        pass
+
+    def switch_proxy(self, driver, proxy_address):
+        self.events.append(("switch", proxy_address))
+        return driver
+
+    def release(self, driver, broken=False):
+        pass
+
+
+class FakeProxyPool:
+    def __init__(self):
+        self.failures = 0
+
+    def report_failure(self, proxy):
+        self.failures += 1
+
+    def report_success(self, proxy, seconds):
+        pass
+
+
+def test_proxy_switch_waits_for_busy_tabs():
+    events = []
+    proxy_pool = FakeProxyPool()
+    proxies = iter(["http://proxy-1", "http://proxy-2"])
+
+    def ready(url):
+        # The slow page finishes only after the second failure asked for a
+        # proxy switch, while it is still loading
+        return url.endswith("slow") and proxy_pool.failures >= 2
+
+    browser = TabBrowser(
+        FakeDriverPool(ready, events),
+        lambda: next(proxies),
+        tabs=2,
+        page_timeout=0.3,
+        poll_interval=0.01,
+        proxy_pool=proxy_pool,
+    )
+    results = {}
+
+    def fetch(link):
+        try:
+            results[link] = browser.fetch(link)
+        except TabLoadError:
+            results[link] = None
+
+    threads = []
+    for link, delay in (("never-1", 0), ("never-2", 0.1), ("slow", 0.15)):
+        time.sleep(delay)
+        thread = threading.Thread(target=fetch, args=(link,))
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join(5)
+    # The switch runs on the dispatcher thread once it is idle
+    for _ in range(100):
+        if ("switch", "http://proxy-2") in events:
+            break
+        time.sleep(0.01)
+    browser.close()
+
+    assert results["never-1"] is None and results["never-2"] is None
+    assert results["slow"] == ([("Location", "slow")], "About the job")
+    assert events == [("loaded", "slow"), ("switch", "http://proxy-2")]
+    assert browser.stats()["proxy_switches"] == 1
+
+
+def test_closed_browser_refuses_links():
+    browser = TabBrowser(FakeDriverPool(lambda url: True, []), lambda: None)
+    browser.close()
+
+    with pytest.raises(RuntimeError):
+        browser.fetch("job")